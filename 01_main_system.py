@@ -5,32 +5,60 @@ Menggabungkan semua modul untuk sistem yang lengkap
 Optimized dengan multi-threading untuk FPS lebih tinggi
 """
 
+import argparse
 import cv2
+import math
+import numpy as np
 import os
+import signal
 import time
 from datetime import datetime
 from threading import Thread, Lock
-from queue import Queue
+from queue import Full, Queue
 import config
 from face_detector_yolo import YOLOFaceDetector
 from face_recognizer_arcface import ArcFaceRecognizer
 from attendance_manager import AttendanceManager
 from unknown_face_collector import UnknownFaceCollector
+from face_pipeline import FacePipeline, detect_stage, recognize_stage
+from camera_stream import CameraStream, CameraScheduler
+from frame_skip_controller import AdaptiveFrameSkip
+from preview_server import PreviewServer
+from overlay_renderer import OverlayRenderer
+from latest_slot import LatestValueSlot
+from metrics import metrics, MetricsServer, MetricsReporter
+from tracing import frame_id, tracer
 
 class AttendanceSystem:
     """Sistem Presensi Otomatis - Optimized dengan Multi-Threading"""
     
-    def __init__(self):
+    # Perintah yang bisa dikirim lewat endpoint kontrol preview
+    COMMANDS = ('stats', 'faster', 'slower', 'auto', 'quit', 'fullscreen')
+    # Tombol keyboard (mode window) -> perintah
+    KEY_COMMANDS = {'q': 'quit', 's': 'stats', 'f': 'fullscreen', '+': 'faster', '=': 'faster',
+                    '-': 'slower', '_': 'slower', 'a': 'auto'}
+    
+    def __init__(self, trace_file=None):
+        """
+        Args:
+            trace_file: Jika diisi, span per thread direkam dan ditulis ke file ini
+                        (JSON Chrome trace) saat keluar atau saat menerima SIGUSR1
+        """
         print("=== Inisialisasi Sistem Presensi GKI Karawaci ===")
         print("Menggunakan YOLO + ArcFace (Multi-threaded Optimized)\n")
         
         # Inisialisasi komponen
+        # Mode process: model di proses worker terpisah (proxy dengan interface yang sama)
+        self.pipeline_mode = config.PIPELINE_MODE
+        if self.pipeline_mode == "process":
+            from pipeline_workers import DetectorWorker, RecognizerWorker
+        
         print("Loading YOLO detector...")
-        self.detector = YOLOFaceDetector()
+        self.detector = DetectorWorker() if self.pipeline_mode == "process" else YOLOFaceDetector()
         print("✓ YOLO Face model loaded")
         
         print("Loading ArcFace recognizer...")
-        self.recognizer = ArcFaceRecognizer()
+        self.recognizer = RecognizerWorker() if self.pipeline_mode == "process" else ArcFaceRecognizer()
         self.attendance_manager = AttendanceManager()
         self.unknown_collector = UnknownFaceCollector()
         
@@ -41,111 +69,77 @@ class AttendanceSystem:
             print("  Jalankan 08_retrain_model.py untuk melatih model\n")
             self.model_loaded = False
         else:
-            num_people = len(set(self.recognizer.known_names))
+            num_people = self.recognizer.get_person_count()
             print(f"✓ Model loaded: {num_people} orang dikenal\n")
             self.model_loaded = True
         
+        # Kamera: masing-masing punya thread capture, diproses bersama oleh satu worker
+        self.cameras = [CameraStream(camera_id, source) for camera_id, source in enumerate(config.CAMERA_SOURCES)]
+        self.scheduler = CameraScheduler(self.cameras)
+        
+        # Pipeline deteksi -> tracking -> recognition per kamera (tracker & cache identitas sendiri,
+        # detector & recognizer dipakai bersama)
+        self.pipelines = [FacePipeline(self.detector, self.recognizer, self.model_loaded) for _ in self.cameras]
+        
         # State
-        self.unknown_tracking = {}  # Track wajah unknown per frame
+        self.unknown_tracking = {}  # {(camera_id, track_id): {'person_id', 'last_seen'}} wajah unknown yang sedang di-capture
         self.notification_queue = []  # Queue untuk notifikasi
-        self.recently_captured = []  # Blacklist wajah yang baru selesai di-capture (cooldown 60 detik)
+        self.recently_captured = {}  # {(camera_id, track_id): {'time', 'center'}} track yang baru selesai di-capture (cooldown 60 detik)
         
         # Threading untuk optimasi
-        self.frame_queue = Queue(maxsize=2)  # Queue untuk frame dari kamera
-        self.result_queue = Queue(maxsize=2)  # Queue untuk hasil deteksi
-        self.attendance_queue = Queue()  # Queue untuk async attendance processing
+        # Hasil terbaru per kamera (camera_id, frame, seq, waktu capture, results); main thread tidur sampai ada hasil
+        self.result_slot = LatestValueSlot()
+        self.attendance_queue = Queue()  # Queue untuk async attendance processing (None = berhenti)
+        # Mode process: hasil deteksi diteruskan ke thread recognition (deteksi frame
+        # berikutnya berjalan bersamaan dengan recognition frame sebelumnya)
+        # Frame yang di-skip juga lewat queue ini agar hasil terkirim urut capture
+        self.stage_queue = Queue(maxsize=config.WORKER_QUEUE_SIZE)
+        # Stage frame skip yang masuk / selesai (masing-masing hanya ditulis satu thread),
+        # tidak dihitung sebagai antrean processing
+        self.skip_stages_queued = 0
+        self.skip_stages_done = 0
         self.lock = Lock()
         self.stopped = False
         
         # Skip frame untuk optimasi (process setiap N frame)
         self.frame_skip = 2  # Process setiap 2 frame, skip 1 frame
-        self.frame_counter = 0
-        
-        print("✓ Sistem siap dengan multi-threading!\n")
-    
-    def _draw_face_box(self, frame, face_location, name, confidence, status="recognized"):
-        """Gambar kotak dan label di wajah - Modern & Clean UI"""
-        top, right, bottom, left = face_location
-        
-        # Tentukan warna berdasarkan status (RGB format untuk lebih modern)
-        if status == "recognized":
-            color = (46, 204, 113)  # Green modern
-            accent_color = (39, 174, 96)  # Darker green
-        elif status == "capturing":
-            color = (52, 152, 219)  # Blue modern
-            accent_color = (41, 128, 185)  # Darker blue
-        else:  # unknown
-            color = (231, 76, 60)  # Red modern
-            accent_color = (192, 57, 43)  # Darker red
-        
-        # Gambar bounding box tipis dengan corner highlights
-        thickness = 1  # Garis tipis
-        corner_length = 20  # Panjang corner highlight
-        corner_thickness = 2  # Ketebalan corner
-        
-        # Corner top-left
-        cv2.line(frame, (left, top), (left + corner_length, top), accent_color, corner_thickness)
-        cv2.line(frame, (left, top), (left, top + corner_length), accent_color, corner_thickness)
-        
-        # Corner top-right
-        cv2.line(frame, (right, top), (right - corner_length, top), accent_color, corner_thickness)
-        cv2.line(frame, (right, top), (right, top + corner_length), accent_color, corner_thickness)
-        
-        # Corner bottom-left
-        cv2.line(frame, (left, bottom), (left + corner_length, bottom), accent_color, corner_thickness)
-        cv2.line(frame, (left, bottom), (left, bottom - corner_length), accent_color, corner_thickness)
-        
-        # Corner bottom-right
-        cv2.line(frame, (right, bottom), (right - corner_length, bottom), accent_color, corner_thickness)
-        cv2.line(frame, (right, bottom), (right, bottom - corner_length), accent_color, corner_thickness)
-        
-        # Bounding box utama (tipis)
-        cv2.rectangle(frame, (left, top), (right, bottom), color, thickness)
-        
-        # Label dengan background semi-transparent modern
-        if status == "capturing":
-            label = f"Capturing: {name}"
-            font_scale = 0.5
-        elif name == "Unknown":
-            label = "Unknown"
-            font_scale = 0.5
-        else:
-            label = f"{name}"
-            font_scale = 0.6
-        
-        # Hitung ukuran text
-        (text_width, text_height), baseline = cv2.getTextSize(
-            label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1
+        self.frame_counters = [0] * len(self.cameras)  # Counter frame per kamera
+        self.last_processed_results = [[] for _ in self.cameras]  # Cache hasil terakhir per kamera
+        
+        # Frame skip otomatis berdasarkan latency terukur (untuk kiosk headless)
+        self.auto_skip = config.ADAPTIVE_FRAME_SKIP
+        # Resolusi deteksi diturunkan jika latency per frame melebihi budget;
+        # level 0 selalu DETECTION_SIZE agar resolusi awal bisa dipulihkan
+        self.skip_controller = AdaptiveFrameSkip(
+            initial_skip=self.frame_skip,
+            resolution_levels=[config.DETECTION_SIZE] + [size for size in config.DETECTION_SIZE_LEVELS
+                                                         if size < config.DETECTION_SIZE],
+            on_resolution_change=self.detector.set_detection_size
         )
         
-        # Background dengan rounded corners effect (semi-transparent)
-        padding = 8
-        label_top = top - text_height - padding * 2 - 5
-        if label_top < 0:
-            label_top = bottom + 5
-        
-        # Background dengan opacity
-        overlay = frame.copy()
-        cv2.rectangle(
-            overlay, 
-            (left, label_top), 
-            (left + text_width + padding * 2, label_top + text_height + padding * 2),
-            accent_color, 
-            -1
-        )
-        cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
-        
-        # Text putih bersih
-        cv2.putText(
-            frame, 
-            label, 
-            (left + padding, label_top + text_height + padding),
-            cv2.FONT_HERSHEY_SIMPLEX, 
-            font_scale, 
-            (255, 255, 255),  # White text
-            1,  # Thickness 1 untuk clean look
-            cv2.LINE_AA  # Anti-aliased
-        )
+        # Tampilan: window OpenCV, atau headless dengan preview MJPEG opsional
+        self.headless = config.HEADLESS
+        self.window_name = 'GKI Karawaci - Attendance System'
+        self.renderer = OverlayRenderer()
+        self.is_fullscreen = False
+        self.display_fps = 0.0
+        self.command_queue = Queue()  # Perintah dari endpoint kontrol
+        self.quit_requested = False  # Di-set signal handler SIGTERM (tanpa lock)
+        self.preview = None
+        if config.PREVIEW_PORT:
+            self.preview = PreviewServer(status_provider=self._get_status, command_handler=self._queue_command)
+        
+        # Metrics latency per tahap: endpoint Prometheus & log periodik (opsional)
+        self.metrics_server = MetricsServer() if metrics.enabled and config.METRICS_PORT else None
+        self.metrics_reporter = MetricsReporter() if metrics.enabled and config.METRICS_LOG_INTERVAL else None
+        
+        # Mode --trace: span per thread ke buffer memori terbatas
+        self.trace_file = trace_file
+        if trace_file:
+            tracer.enable()
+        
+        mode_label = "proses worker" if self.pipeline_mode == "process" else "multi-threading"
+        print(f"✓ Sistem siap dengan {mode_label}!\n")
     
     def _draw_notifications(self, frame):
         """Gambar notifikasi di layar - DISABLED untuk clean UI"""
@@ -163,6 +157,7 @@ class AttendanceSystem:
     def _process_recognized_face(self, name, confidence):
         """Proses wajah yang dikenali - async untuk menghindari freeze"""
         # Kirim ke queue untuk diproses di background thread
+        # (satu queue & AttendanceManager untuk semua kamera -> cooldown berlaku lintas kamera)
         self.attendance_queue.put((name, confidence))
     
     def _attendance_worker(self):
@@ -170,80 +165,78 @@ class AttendanceSystem:
         processed_recently = {}  # Cache untuk avoid duplicate dalam waktu dekat
         cooldown = 5  # seconds
         
-        while not self.stopped:
+        while True:
+            # Tidur sampai ada antrean presensi; None = sinyal berhenti
+            item = self.attendance_queue.get()
+            if item is None:
+                break
+            name, confidence = item
+            
+            current_time = time.time()
+            
+            # Cek apakah baru saja diproses (dalam 5 detik terakhir)
+            if name in processed_recently:
+                last_time = processed_recently[name]
+                if current_time - last_time < cooldown:
+                    continue  # Skip, baru saja diproses
+            
+            # Process attendance (blocking operation, tapi di background thread)
             try:
-                # Ambil dari queue dengan timeout
-                name, confidence = self.attendance_queue.get(timeout=1)
-                
-                current_time = time.time()
-                
-                # Cek apakah baru saja diproses (dalam 5 detik terakhir)
-                if name in processed_recently:
-                    last_time = processed_recently[name]
-                    if current_time - last_time < cooldown:
-                        continue  # Skip, baru saja diproses
-                
-                # Process attendance (blocking operation, tapi di background thread)
-                if self.attendance_manager.mark_attendance(name, confidence):
-                    print(f"✓ Kehadiran tercatat: {name}")
-                
-                # Update cache
-                processed_recently[name] = current_time
-                
-                # Cleanup cache lama
-                to_remove = [k for k, v in processed_recently.items() 
-                           if current_time - v > cooldown * 2]
-                for k in to_remove:
-                    del processed_recently[k]
-                
-            except:
-                # Queue kosong atau timeout, lanjutkan
+                with tracer.span('mark_attendance', name=name):
+                    marked = self.attendance_manager.mark_attendance(name, confidence)
+            except Exception as e:
+                print(f"⚠ Gagal mencatat kehadiran {name}: {e}")
                 continue
+            if marked:
+                print(f"✓ Kehadiran tercatat: {name}")
+            
+            # Update cache
+            processed_recently[name] = current_time
+            
+            # Cleanup cache lama
+            to_remove = [k for k, v in processed_recently.items() 
+                       if current_time - v > cooldown * 2]
+            for k in to_remove:
+                del processed_recently[k]
     
-    def _process_unknown_face(self, frame, face_location):
-        """Proses wajah yang tidak dikenali"""
-        top, right, bottom, left = face_location
-        center_x = (left + right) // 2
-        center_y = (top + bottom) // 2
+    def _process_unknown_face(self, frame, face_location, track_id):
+        """
+        Proses wajah yang tidak dikenali (per track dari FaceTracker)
         
-        # Cek apakah wajah ini baru saja di-capture (dalam cooldown)
+        track_id berupa (camera_id, track ID) karena setiap kamera punya tracker sendiri
+        """
         current_time = time.time()
-        for captured_data in self.recently_captured[:]:  # Copy list untuk iterasi aman
-            captured_x, captured_y, capture_time = captured_data
-            # Hapus dari blacklist jika sudah lewat 60 detik
-            if current_time - capture_time > 60:
-                self.recently_captured.remove(captured_data)
+        top, right, bottom, left = face_location
+        center = ((left + right) // 2, (top + bottom) // 2)
+        
+        # Cek apakah track ini baru saja di-capture (dalam cooldown)
+        captured = self.recently_captured.get(track_id)
+        if captured is not None:
+            captured['center'] = center  # Ikuti posisi terakhir untuk fallback saat track hilang
+            return "SKIP"  # Skip capture untuk wajah ini
+        
+        # Track baru (mis. setelah tertutup > TRACK_TIMEOUT) di dekat wajah yang
+        # baru di-capture di kamera yang sama: orang yang sama, ikut cooldown-nya
+        for (camera_id, _), captured in list(self.recently_captured.items()):
+            if camera_id != track_id[0] or current_time - captured['time'] > 60:
                 continue
-            
-            # Cek jarak dengan wajah yang baru di-capture
-            distance = ((center_x - captured_x)**2 + (center_y - captured_y)**2)**0.5
+            captured_x, captured_y = captured['center']
+            distance = ((center[0] - captured_x)**2 + (center[1] - captured_y)**2)**0.5
             if distance < 80:  # Wajah yang sama dalam cooldown
-                return "SKIP"  # Skip capture untuk wajah ini
-        
-        # Cari tracking terdekat (dalam radius 80 pixel)
-        closest_key = None
-        min_distance = 80  # threshold jarak
-        
-        for key, data in self.unknown_tracking.items():
-            old_x, old_y = map(int, key.split('_'))
-            distance = ((center_x - old_x)**2 + (center_y - old_y)**2)**0.5
-            if distance < min_distance:
-                min_distance = distance
-                closest_key = key
-        
-        # Gunakan tracking yang ada atau buat baru
-        if closest_key:
-            location_key = closest_key
-            tracking_data = self.unknown_tracking[location_key]
+                self.recently_captured[track_id] = {'time': captured['time'], 'center': center}
+                return "SKIP"
+        
+        # Gunakan capture yang sudah berjalan untuk track ini atau buat baru
+        tracking_data = self.unknown_tracking.get(track_id)
+        if tracking_data is not None:
             person_id = tracking_data['person_id']
-            tracking_data['last_seen'] = time.time()
+            tracking_data['last_seen'] = current_time
         else:
             # Mulai capture baru
-            location_key = f"{center_x}_{center_y}"
             person_id = self.unknown_collector.start_capture()
-            self.unknown_tracking[location_key] = {
+            self.unknown_tracking[track_id] = {
                 'person_id': person_id,
-                'last_seen': time.time()
+                'last_seen': current_time
             }
         
         # Tambah frame
@@ -258,10 +251,10 @@ class AttendanceSystem:
                 print("  Jalankan 08_retrain_model.py untuk melatih ulang model\n")
                 
                 # Tambahkan ke blacklist dengan cooldown 60 detik
-                self.recently_captured.append((center_x, center_y, current_time))
+                self.recently_captured[track_id] = {'time': current_time, 'center': center}
             
             # Hapus dari tracking
-            del self.unknown_tracking[location_key]
+            del self.unknown_tracking[track_id]
             return None
         
         # Return progress untuk ditampilkan
@@ -274,211 +267,435 @@ class AttendanceSystem:
         timeout = 3  # 3 detik
         
         to_remove = []
-        for location_key, data in self.unknown_tracking.items():
+        for track_id, data in self.unknown_tracking.items():
             if current_time - data['last_seen'] > timeout:
                 # Cancel capture
                 self.unknown_collector.cancel_capture(data['person_id'])
-                to_remove.append(location_key)
+                to_remove.append(track_id)
         
-        for key in to_remove:
-            del self.unknown_tracking[key]
+        for track_id in to_remove:
+            del self.unknown_tracking[track_id]
+        
+        # Hapus dari blacklist jika sudah lewat 60 detik
+        expired = [track_id for track_id, captured in self.recently_captured.items()
+                   if current_time - captured['time'] > 60]
+        for track_id in expired:
+            del self.recently_captured[track_id]
     
-    def _capture_frames(self, cap):
-        """Thread untuk capture frame dari kamera"""
+    def _process_faces(self):
+        """Thread worker inference bersama: deteksi dan recognisi frame dari semua kamera"""
         while not self.stopped:
-            ret, frame = cap.read()
-            if not ret:
+            # Tidur sampai thread capture mengirim frame baru (timeout untuk update FPS)
+            batch = self.scheduler.wait_batch(timeout=0.5)
+            for camera in self.cameras:
+                camera.update_fps()
+            
+            if not batch:
                 continue
             
-            # Resize frame untuk processing lebih cepat (opsional)
-            # Uncomment jika perlu lebih cepat lagi
-            # frame = cv2.resize(frame, (640, 480))
+            queue_depth = sum(camera.pending() for camera in self.cameras) + len(batch)
             
-            if not self.frame_queue.full():
-                self.frame_queue.put(frame)
-    
-    def _process_faces(self):
-        """Thread untuk deteksi dan recognisi wajah"""
-        last_processed_results = []  # Cache hasil terakhir
-        
-        while not self.stopped:
-            if self.frame_queue.empty():
-                time.sleep(0.001)
-                continue
+            # Skip frame untuk optimasi (per kamera)
+            to_process = []
+            skipped = []
+            for camera, frame, seq, captured_at in batch:
+                self.frame_counters[camera.camera_id] += 1
+                if self.frame_counters[camera.camera_id] % self.frame_skip != 0:
+                    skipped.append((camera, frame, seq, captured_at))
+                    continue
+                to_process.append((camera, frame, seq, captured_at))
             
-            frame = self.frame_queue.get()
+            if skipped:
+                if self.pipeline_mode == "process":
+                    # Frame sebelumnya mungkin masih di tahap recognition: lewat stage_queue
+                    # (states None) supaya tidak mendahului hasilnya dan memakai hasil terbarunya
+                    self.skip_stages_queued += 1
+                    self._queue_stage((skipped, None, None, None, 0.0, queue_depth))
+                else:
+                    for camera, frame, seq, captured_at in skipped:
+                        # Skip processing, gunakan hasil terakhir
+                        self._send_result(camera, frame, seq, captured_at,
+                                          self.last_processed_results[camera.camera_id])
             
-            # Skip frame untuk optimasi
-            self.frame_counter += 1
-            if self.frame_counter % self.frame_skip != 0:
-                # Skip processing, gunakan hasil terakhir
-                if not self.result_queue.full():
-                    self.result_queue.put((frame, last_processed_results))
+            if not to_process:
                 continue
             
-            # Deteksi wajah
-            face_locations = self.detector.detect_faces(frame)
+            # Deteksi & tracking - satu batch untuk semua kamera
+            start = time.perf_counter()
+            pipelines = [self.pipelines[camera.camera_id] for camera, _, _, _ in to_process]
+            frames = [frame for _, frame, _, _ in to_process]
+            frame_ids = [frame_id(camera.camera_id, seq) for camera, _, seq, _ in to_process]
+            with tracer.span('detect_stage', frames=frame_ids, flow='t'):
+                # Waktu capture frame (bukan waktu diproses) untuk tracker & motion gate
+                states = detect_stage(pipelines, frames, [captured_at for _, _, _, captured_at in to_process])
+            stage = (to_process, pipelines, frames, states, time.perf_counter() - start, queue_depth)
             
-            # Process hasil deteksi
-            results = []
-            if len(face_locations) > 0:
-                for face_location in face_locations:
-                    result = {'location': face_location}
-                    
-                    if self.model_loaded:
-                        # Recognize wajah
-                        name, confidence = self.recognizer.recognize_face(frame, bbox=face_location)
-                        result['name'] = name
-                        result['confidence'] = confidence
-                        
-                        if name != "Unknown":
-                            result['status'] = 'recognized'
-                            # Process attendance di thread utama
-                        else:
-                            result['status'] = 'unknown'
-                    else:
-                        result['name'] = "Unknown"
-                        result['confidence'] = 0
-                        result['status'] = 'unknown'
-                    
-                    results.append(result)
+            if self.pipeline_mode != "process":
+                self._finish_batch(*stage)
+                continue
+            
+            # Mode process: recognition dikerjakan thread _recognize_faces
+            self._queue_stage(stage)
+    
+    def _queue_stage(self, stage):
+        """Kirim stage ke thread recognition (mode process), tunggu jika queue penuh"""
+        frame_ids = [frame_id(camera.camera_id, seq) for camera, _, seq, _ in stage[0]]
+        with tracer.span('wait_stage_queue', frames=frame_ids):
+            while not self.stopped:
+                try:
+                    self.stage_queue.put(stage, timeout=0.1)
+                    break
+                except Full:
+                    continue
+    
+    def _recognize_faces(self):
+        """Thread recognition (mode process): tahap kedua pipeline untuk hasil deteksi"""
+        while True:
+            stage = self.stage_queue.get()
+            if stage is None:
+                break  # Sinyal berhenti dari run()
+            self._finish_batch(*stage)
+    
+    def _finish_batch(self, to_process, pipelines, frames, states, detect_elapsed, queue_depth):
+        """Recognition untuk batch hasil deteksi, lalu kirim hasil ke main thread"""
+        if states is None:
+            # Frame yang di-skip (mode process): batch sebelumnya sudah selesai, pakai hasil terakhirnya
+            for camera, frame, seq, captured_at in to_process:
+                self._send_result(camera, frame, seq, captured_at, self.last_processed_results[camera.camera_id])
+            self.skip_stages_done += 1
+            return
+        
+        start = time.perf_counter()
+        frame_ids = [frame_id(camera.camera_id, seq) for camera, _, seq, _ in to_process]
+        with tracer.span('recognize_stage', frames=frame_ids, flow='t'):
+            results_list = recognize_stage(pipelines, frames, states)
+        
+        if self.auto_skip:
+            # Latency per frame = waktu kerja batch (deteksi + recognition) dibagi jumlah frame
+            self.frame_skip = self.skip_controller.record_processing(
+                (detect_elapsed + time.perf_counter() - start) / len(to_process),
+                queue_depth + self.stage_queue.qsize() - (self.skip_stages_queued - self.skip_stages_done),
+                pipelines[0].last_timings
+            )
+        
+        metrics.increment('frames_processed', len(to_process))
+        metrics.set_gauge('frame_skip', self.frame_skip)
+        
+        for (camera, frame, seq, captured_at), results in zip(to_process, results_list):
+            # Keputusan (identitas wajah) untuk frame ini sudah ada: catat latency glass-to-decision
+            camera.record_processed(captured_at)
             
             # Simpan hasil untuk digunakan di frame yang di-skip
-            last_processed_results = results
+            self.last_processed_results[camera.camera_id] = results
+            
+            self._send_result(camera, frame, seq, captured_at, results)
+    
+    def _send_result(self, camera, frame, seq, captured_at, results):
+        """Kirim hasil ke main thread; hasil lama kamera ini yang belum ditampilkan ditimpa (slot ring dilepas)"""
+        dropped = self.result_slot.put((camera.camera_id, frame, seq, captured_at, results), key=camera.camera_id)
+        if dropped is not None:
+            camera.release(dropped[1])
+            tracer.instant('result_dropped', camera=camera.camera_id, seq=dropped[2])
+    
+    def _compose_display(self, display_frames):
+        """Gabungkan frame semua kamera menjadi satu tampilan grid"""
+        frames = [frame for frame in display_frames if frame is not None]
+        if len(frames) == 1:
+            return frames[0]
+        
+        cols = math.ceil(math.sqrt(len(frames)))
+        rows = math.ceil(len(frames) / cols)
+        tile_h, tile_w = frames[0].shape[:2]
+        tile_w, tile_h = tile_w // cols, tile_h // cols
+        
+        canvas = np.zeros((tile_h * rows, tile_w * cols, 3), dtype=np.uint8)
+        for idx, frame in enumerate(frames):
+            row, col = divmod(idx, cols)
+            canvas[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = cv2.resize(
+                frame, (tile_w, tile_h), interpolation=cv2.INTER_AREA
+            )
+        return canvas
+    
+    def _queue_command(self, command):
+        """Terima perintah dari endpoint kontrol (thread HTTP), dijalankan di main loop"""
+        if command not in self.COMMANDS:
+            return False
+        self.command_queue.put(command)
+        self.result_slot.wake()  # Main loop mungkin sedang menunggu hasil
+        return True
+    
+    def _request_quit(self, signum, frame):
+        """
+        Signal handler SIGTERM (berjalan di main thread, bisa menyela main loop
+        di mana saja): hanya set flag lalu bangunkan main loop. Tidak memakai
+        command_queue karena mutex Queue tidak reentrant -> deadlock jika main
+        thread sedang memegangnya; Condition result_slot memakai RLock.
+        """
+        self.quit_requested = True
+        self.result_slot.wake()
+    
+    def _handle_command(self, command):
+        """Jalankan perintah (dari keyboard atau endpoint kontrol), return False untuk keluar"""
+        if command == 'quit':
+            return False
+        elif command == 'stats':
+            self._show_statistics()
+        elif command == 'fullscreen' and not self.headless:
+            # Toggle fullscreen
+            self.is_fullscreen = not self.is_fullscreen
+            try:
+                if self.is_fullscreen:
+                    cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+                    print("Fullscreen: ON")
+                else:
+                    cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+                    print("Fullscreen: OFF")
+            except Exception as e:
+                print(f"⚠ Fullscreen toggle tidak support: {e}")
+        elif command == 'faster':
+            # Kurangi skip untuk lebih akurat (mematikan skip otomatis)
+            self.auto_skip = False
+            self.frame_skip = max(1, self.frame_skip - 1)
+            print(f"Frame skip: {self.frame_skip} (otomatis: OFF)")
+        elif command == 'slower':
+            # Tambah skip untuk lebih cepat (mematikan skip otomatis)
+            self.auto_skip = False
+            self.frame_skip = min(config.MAX_FRAME_SKIP, self.frame_skip + 1)
+            print(f"Frame skip: {self.frame_skip} (otomatis: OFF)")
+        elif command == 'auto':
+            self.auto_skip = not self.auto_skip
+            self.skip_controller.skip = self.frame_skip
+            print(f"Frame skip otomatis: {'ON' if self.auto_skip else 'OFF'}")
+        return True
+    
+    def _get_status(self):
+        """Status ringkas sistem untuk endpoint /stats"""
+        return {
+            'fps': self.display_fps,
+            'frame_skip': self.frame_skip,
+            'auto_skip': self.auto_skip,
+            'cameras': [camera.get_stats() for camera in self.cameras],
+            'pipeline': self._aggregate_pipeline_stats()
+        }
+    
+    def _annotate_results(self, camera_id, frame, results):
+        """
+        Proses hasil satu frame (presensi & capture wajah unknown)
+        
+        Returns:
+            List anotasi (face_location, label, confidence, status) untuk digambar
+        """
+        annotations = []
+        for result in results:
+            face_location = result['location']
+            name = result['name']
+            confidence = result.get('confidence', 0)
+            status = result.get('status', 'unknown')
             
-            # Kirim hasil ke main thread
-            if not self.result_queue.full():
-                self.result_queue.put((frame, results))
+            if status == 'recognized':
+                annotations.append((face_location, name, confidence, "recognized"))
+                # Kirim ke attendance queue (non-blocking)
+                self._process_recognized_face(name, confidence)
+            else:
+                # Process unknown face
+                with self.lock:
+                    progress = self._process_unknown_face(frame, face_location, (camera_id, result['track_id']))
+                
+                if progress == "SKIP":
+                    annotations.append((face_location, "Already Captured", 0, "unknown"))
+                elif progress:
+                    annotations.append((face_location, progress, 0, "capturing"))
+                else:
+                    annotations.append((face_location, "Unknown", 0, "unknown"))
+        return annotations
     
     def run(self):
         """Jalankan sistem dengan multi-threading"""
         print("Sistem berjalan dengan multi-threading...")
-        print("Tekan 'q' untuk keluar")
-        print("Tekan 's' untuk melihat statistik hari ini")
-        print("Tekan 'f' untuk toggle fullscreen")
-        print("Tekan '+' untuk kurangi skip (lebih akurat, lebih lambat)")
-        print("Tekan '-' untuk tambah skip (lebih cepat, kurang akurat)\n")
-        
-        cap = cv2.VideoCapture(config.CAMERA_INDEX)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.FRAME_WIDTH)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.FRAME_HEIGHT)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer lag
-        
-        # Setup window dengan fullscreen - compatible untuk Raspberry Pi
-        window_name = 'GKI Karawaci - Attendance System'
-        self.is_fullscreen = True
-        
-        # Create window tanpa fullscreen dulu untuk compatibility
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-        
-        # Try fullscreen after window creation
-        try:
-            cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-        except Exception as e:
-            print(f"⚠ Fullscreen mode tidak support: {e}")
-            print("  Menggunakan window mode biasa")
-            self.is_fullscreen = False
-        
-        # Start threads
-        capture_thread = Thread(target=self._capture_frames, args=(cap,), daemon=True)
-        process_thread = Thread(target=self._process_faces, daemon=True)
-        attendance_thread = Thread(target=self._attendance_worker, daemon=True)
-        
-        capture_thread.start()
+        if self.headless:
+            print("Mode headless: tanpa window, frame hanya digambar untuk preview")
+            if self.preview is None:
+                print("Tekan Ctrl+C untuk keluar\n")
+        else:
+            print("Tekan 'q' untuk keluar")
+            print("Tekan 's' untuk melihat statistik hari ini")
+            print("Tekan 'f' untuk toggle fullscreen")
+            print("Tekan '+' untuk kurangi skip (lebih akurat, lebih lambat)")
+            print("Tekan '-' untuk tambah skip (lebih cepat, kurang akurat)")
+            print("Tekan 'a' untuk toggle frame skip otomatis\n")
+        
+        # Buka semua kamera
+        opened = []
+        for camera in self.cameras:
+            if camera.open():
+                print(f"✓ {camera.name}: {camera.source}")
+                camera.on_capture = self.skip_controller.record_capture
+                opened.append(camera)
+            else:
+                print(f"⚠ {camera.name} tidak bisa dibuka: {camera.source}")
+        if not opened:
+            print("⚠ Tidak ada kamera yang bisa dibuka")
+            return
+        
+        if not self.headless:
+            # Setup window dengan fullscreen - compatible untuk Raspberry Pi
+            self.is_fullscreen = True
+            
+            # Create window tanpa fullscreen dulu untuk compatibility
+            cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+            
+            # Try fullscreen after window creation
+            try:
+                cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            except Exception as e:
+                print(f"⚠ Fullscreen mode tidak support: {e}")
+                print("  Menggunakan window mode biasa")
+                self.is_fullscreen = False
+        
+        if self.preview is not None:
+            self.preview.start()
+            print(f"  Perintah kontrol: {', '.join(self.COMMANDS)}\n")
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.start()
+        
+        # systemctl stop / kill: berhenti dengan rapi seperti tombol 'q'
+        signal.signal(signal.SIGTERM, self._request_quit)
+        if self.trace_file:
+            # kill -USR1 <pid>: tulis trace sekarang tanpa berhenti
+            signal.signal(signal.SIGUSR1, lambda signum, frame: tracer.dump(self.trace_file))
+            print(f"Tracing aktif: trace ditulis ke {self.trace_file} saat keluar atau kill -USR1 {os.getpid()}\n")
+        
+        # Start threads (satu thread capture per kamera)
+        process_thread = Thread(target=self._process_faces, name="inference", daemon=True)
+        attendance_thread = Thread(target=self._attendance_worker, name="attendance", daemon=True)
+        recognize_thread = Thread(target=self._recognize_faces, name="recognize", daemon=True)
+        
+        for camera in opened:
+            camera.start()
         process_thread.start()
         attendance_thread.start()
+        if self.pipeline_mode == "process":
+            recognize_thread.start()
         
         frame_count = 0
         fps_time = time.time()
-        fps = 0
-        last_results = []
+        display_frames = [None] * len(self.cameras)  # Frame terakhir per kamera untuk tampilan grid
+        running = True
         
-        while True:
-            # Ambil hasil dari queue
-            if not self.result_queue.empty():
-                frame, results = self.result_queue.get()
-                last_results = results
-            else:
-                # Jika tidak ada hasil baru, skip
-                time.sleep(0.001)
-                continue
-            
-            # Hitung FPS
-            frame_count += 1
-            if frame_count % 10 == 0:
-                current_time = time.time()
-                fps = 10 / (current_time - fps_time)
-                fps_time = current_time
-            
-            # Draw hasil
-            for result in last_results:
-                face_location = result['location']
-                name = result['name']
-                confidence = result.get('confidence', 0)
-                status = result.get('status', 'unknown')
+        try:
+            while running:
+                if self.quit_requested:
+                    break
                 
-                if status == 'recognized':
-                    self._draw_face_box(frame, face_location, name, confidence, "recognized")
-                    # Kirim ke attendance queue (non-blocking)
-                    self._process_recognized_face(name, confidence)
-                else:
-                    # Process unknown face
+                # Perintah dari endpoint kontrol
+                while not self.command_queue.empty():
+                    running = self._handle_command(self.command_queue.get()) and running
+                
+                # Tunggu hasil berikutnya (dibangunkan juga oleh perintah kontrol)
+                item = self.result_slot.get(timeout=0.5)
+                if item is None:
+                    continue
+                camera_id, frame, seq, captured_at, results = item
+                
+                # Hitung FPS
+                frame_count += 1
+                if frame_count % 10 == 0:
+                    current_time = time.time()
+                    self.display_fps = 10 / (current_time - fps_time)
+                    metrics.set_gauge('display_fps', self.display_fps)
+                    fps_time = current_time
+                
+                # Span frame di main thread: akhir flow capture -> layar
+                with tracer.span('frame', frames=(frame_id(camera_id, seq),), flow='f', camera=camera_id, seq=seq):
+                    # Presensi & capture wajah unknown tetap berjalan walau tidak ada tampilan
+                    with tracer.span('annotate'):
+                        annotations = self._annotate_results(camera_id, frame, results)
+                    
+                    # Cleanup tracking lama
                     with self.lock:
-                        progress = self._process_unknown_face(frame, face_location)
+                        self._cleanup_old_tracking()
                     
-                    if progress == "SKIP":
-                        self._draw_face_box(frame, face_location, "Already Captured", 0, "unknown")
-                    elif progress:
-                        self._draw_face_box(frame, face_location, progress, 0, "capturing")
-                    else:
-                        self._draw_face_box(frame, face_location, "Unknown", 0, "unknown")
-            
-            # Cleanup tracking lama
-            with self.lock:
-                self._cleanup_old_tracking()
-            
-            # Clean UI - No system info displayed
-            
-            # Tampilkan frame
-            cv2.imshow(window_name, frame)
-            
-            # Handle keyboard
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('s'):
-                self._show_statistics()
-            elif key == ord('f'):
-                # Toggle fullscreen
-                self.is_fullscreen = not self.is_fullscreen
-                try:
-                    if self.is_fullscreen:
-                        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-                        print("Fullscreen: ON")
-                    else:
-                        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-                        print("Fullscreen: OFF")
-                except Exception as e:
-                    print(f"⚠ Fullscreen toggle tidak support: {e}")
-            elif key == ord('+') or key == ord('='):
-                # Kurangi skip untuk lebih akurat
-                self.frame_skip = max(1, self.frame_skip - 1)
-                print(f"Frame skip: {self.frame_skip}")
-            elif key == ord('-') or key == ord('_'):
-                # Tambah skip untuk lebih cepat
-                self.frame_skip = min(5, self.frame_skip + 1)
-                print(f"Frame skip: {self.frame_skip}")
-        
-        # Stop threads
+                    # Headless: gambar & encode hanya jika ada client preview yang menunggu frame
+                    send_preview = self.preview is not None and self.preview.wants_frame()
+                    if self.headless and not send_preview:
+                        self.cameras[camera_id].release(frame)
+                        continue
+                    
+                    with metrics.timer('render'), tracer.span('render'):
+                        # Draw hasil (semua wajah dalam satu pass)
+                        self.renderer.draw(frame, annotations)
+                        
+                        # Clean UI - No system info displayed
+                        
+                        # Tampilkan frame (grid jika lebih dari satu kamera); frame sebelumnya
+                        # dari kamera ini tidak dipakai lagi, slot ring-nya dilepas
+                        if display_frames[camera_id] is not None:
+                            self.cameras[camera_id].release(display_frames[camera_id])
+                        display_frames[camera_id] = frame
+                        display = self._compose_display(display_frames)
+                    
+                    if send_preview:
+                        self.preview.publish(display)
+                    # Frame ter-anotasi siap tampil: latency glass-to-display
+                    metrics.observe('glass_to_display', time.monotonic() - captured_at)
+                    if self.headless:
+                        continue
+                    
+                    with tracer.span('imshow'):
+                        cv2.imshow(self.window_name, display)
+                        
+                        # Handle keyboard
+                        key = cv2.waitKey(1) & 0xFF
+                    if key != 0xFF and chr(key) in self.KEY_COMMANDS:
+                        running = self._handle_command(self.KEY_COMMANDS[chr(key)])
+        except KeyboardInterrupt:
+            print("\n\n✓ Program dihentikan oleh user")
+        
+        # Stop threads (kamera & ring frame dihentikan setelah thread inference selesai);
+        # thread yang sedang menunggu dibangunkan lewat close() / sentinel None
         self.stopped = True
-        capture_thread.join(timeout=1)
-        process_thread.join(timeout=1)
+        self.scheduler.close()
+        if self.preview is not None:
+            self.preview.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+        process_thread.join(timeout=2)
+        self.attendance_queue.put(None)
         attendance_thread.join(timeout=1)
-        
-        cap.release()
-        cv2.destroyAllWindows()
+        if self.pipeline_mode == "process":
+            try:
+                self.stage_queue.put(None, timeout=2)
+            except Full:
+                pass  # Thread recognition macet di worker, daemon thread ikut berhenti
+            recognize_thread.join(timeout=2)
+        for camera in opened:
+            camera.stop()
+        if self.pipeline_mode == "process":
+            self.detector.stop()
+            self.recognizer.stop()
+        
+        if not self.headless:
+            cv2.destroyAllWindows()
+        if self.trace_file:
+            tracer.dump(self.trace_file)
         print("\n✓ Sistem berhenti")
     
+    def _aggregate_pipeline_stats(self):
+        """Statistik pipeline dijumlahkan dari semua kamera"""
+        pipeline_stats = {}
+        for pipeline in self.pipelines:
+            for key, value in pipeline.get_stats().items():
+                pipeline_stats[key] = pipeline_stats.get(key, 0) + value
+        lookups = pipeline_stats['hits'] + pipeline_stats['misses']
+        pipeline_stats['hit_rate'] = pipeline_stats['hits'] / lookups if lookups else 0.0
+        if 'frames_checked' in pipeline_stats:
+            pipeline_stats['gated_ratio'] = pipeline_stats['frames_gated'] / max(pipeline_stats['frames_checked'], 1)
+        return pipeline_stats
+    
     def _show_statistics(self):
         """Tampilkan statistik presensi hari ini"""
         print("\n" + "="*50)
@@ -495,12 +712,42 @@ class AttendanceSystem:
             for idx, name in enumerate(stats['names'], 1):
                 print(f"  {idx}. {name}")
         
+        pipeline_stats = self._aggregate_pipeline_stats()
+        
+        print("\nKamera:")
+        for camera in self.cameras:
+            camera_stats = camera.get_stats()
+            print(f"  {camera_stats['name']}: capture {camera_stats['capture_fps']:.1f} FPS, "
+                  f"diproses {camera_stats['processed_fps']:.1f} FPS, drop {camera_stats['frames_dropped']} frame, "
+                  f"glass-to-decision p50 {camera_stats['latency_p50_ms']:.0f} ms / p95 {camera_stats['latency_p95_ms']:.0f} ms")
+        
+        if self.pipeline_mode == "process":
+            print(f"\nWorker: detector restart {self.detector.restarts}x, "
+                  f"recognizer restart {self.recognizer.restarts}x")
+        
+        print("\nCache identitas wajah:")
+        print(f"  Hit: {pipeline_stats['hits']}, Miss: {pipeline_stats['misses']} "
+              f"(hit rate {pipeline_stats['hit_rate'] * 100:.1f}%)")
+        print(f"  Recognition ArcFace: {pipeline_stats['faces_recognized']} wajah "
+              f"dalam {pipeline_stats['frames_processed']} frame")
+        if 'frames_gated' in pipeline_stats:
+            print(f"  Motion gating: {pipeline_stats['frames_gated']} frame tanpa YOLO "
+                  f"({pipeline_stats['gated_ratio'] * 100:.1f}%)")
+        
+        if metrics.enabled:
+            print(f"\n{metrics.summary_line()}")
+        
         print("="*50 + "\n")
 
 # Main program
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistem presensi otomatis GKI Karawaci")
+    parser.add_argument('--trace', nargs='?', const=config.TRACE_FILE, default=None, metavar='FILE',
+                        help=f"Rekam span per thread ke JSON Chrome trace (default {config.TRACE_FILE})")
+    args = parser.parse_args()
+    
     try:
-        system = AttendanceSystem()
+        system = AttendanceSystem(trace_file=args.trace)
         system.run()
     except KeyboardInterrupt:
         print("\n\n✓ Program dihentikan oleh user")
@@ -0,0 +1,1090 @@
+"""
+03 - Benchmark
+Script untuk mengukur performa komponen sistem presensi
+Jalankan: python 03_benchmark.py <nama_benchmark> --help
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import cv2
+import numpy as np
+import config
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def load_frames(source, limit=100):
+    """
+    Load frame dari file video atau direktori gambar (rekursif)
+
+    Args:
+        source: Path ke file video atau direktori gambar
+        limit: Maksimum frame yang di-load
+
+    Returns:
+        List of frame BGR
+    """
+    frames = []
+
+    if os.path.isdir(source):
+        for image_path in sorted(Path(source).rglob('*')):
+            if image_path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            image = cv2.imread(str(image_path))
+            if image is not None:
+                frames.append(image)
+            if len(frames) >= limit:
+                break
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def summarize(samples_ms):
+    """Ringkasan latency (ms): mean, p50, p90, p99"""
+    if len(samples_ms) == 0:
+        return {'count': 0}
+
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'count': int(samples.size),
+        'mean': float(samples.mean()),
+        'p50': float(np.percentile(samples, 50)),
+        'p90': float(np.percentile(samples, 90)),
+        'p99': float(np.percentile(samples, 99))
+    }
+
+
+def print_summary(label, summary):
+    """Cetak ringkasan latency dalam satu baris"""
+    if summary['count'] == 0:
+        print(f"  {label:<28} (tidak ada sampel)")
+        return
+    print(f"  {label:<28} n={summary['count']:<5} mean={summary['mean']:.2f}ms "
+          f"p50={summary['p50']:.2f}ms p90={summary['p90']:.2f}ms p99={summary['p99']:.2f}ms")
+
+
+def bench_align(args):
+    """
+    Bandingkan latency per wajah: deteksi ulang InsightFace vs alignment langsung
+    dari keypoint YOLO ke model recognition
+    """
+    from face_detector_yolo import YOLOFaceDetector
+    from face_recognizer_arcface import ArcFaceRecognizer
+
+    frames = load_frames(args.source, args.limit)
+    print(f"✓ {len(frames)} frame di-load dari {args.source}\n")
+
+    detector = YOLOFaceDetector()
+    recognizer = ArcFaceRecognizer()
+
+    # Kumpulkan wajah beserta landmark sekali saja
+    faces = []
+    for frame in frames:
+        face_locations, landmarks = detector.detect_faces_with_landmarks(frame)
+        for face_location, face_landmarks in zip(face_locations, landmarks):
+            if face_landmarks is not None:
+                faces.append((frame, face_location, face_landmarks))
+
+    if len(faces) == 0:
+        print("⚠ Tidak ada wajah dengan keypoint terdeteksi")
+        return
+
+    redetect_ms = []
+    aligned_ms = []
+    similarities = []
+
+    for frame, face_location, face_landmarks in faces:
+        recognizer.use_alignment = False
+        start = time.perf_counter()
+        embedding_redetect = recognizer._get_embedding(frame, face_location)
+        redetect_ms.append((time.perf_counter() - start) * 1000)
+
+        recognizer.use_alignment = True
+        start = time.perf_counter()
+        embedding_aligned = recognizer._get_embedding(frame, face_location, face_landmarks)
+        aligned_ms.append((time.perf_counter() - start) * 1000)
+
+        if embedding_redetect is not None:
+            similarities.append(recognizer.cosine_similarity(embedding_redetect, embedding_aligned))
+
+    print(f"Latency per wajah ({len(faces)} wajah):")
+    print_summary("Deteksi ulang InsightFace", summarize(redetect_ms))
+    print_summary("Alignment langsung", summarize(aligned_ms))
+
+    speedup = np.mean(redetect_ms) / max(np.mean(aligned_ms), 1e-9)
+    print(f"\n  Speedup: {speedup:.1f}x")
+    if similarities:
+        print(f"  Cosine similarity antar mode: mean={np.mean(similarities):.3f} "
+              f"min={np.min(similarities):.3f}")
+
+
+def bench_match(args):
+    """
+    Bandingkan loop Python cosine similarity vs FaceMatcher (satu perkalian matriks)
+    pada galeri sintetis
+    """
+    from face_matcher import FaceMatcher
+
+    rng = np.random.default_rng(0)
+    num_embeddings = args.people * args.per_person
+    embeddings = rng.standard_normal((num_embeddings, config.EMBEDDING_SIZE)).astype(np.float32)
+    names = [f"orang_{idx // args.per_person}" for idx in range(num_embeddings)]
+    queries = rng.standard_normal((args.faces, config.EMBEDDING_SIZE)).astype(np.float32)
+
+    start = time.perf_counter()
+    matcher = FaceMatcher()
+    matcher.build(embeddings, names)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Loop lama: hitung ulang kedua norm untuk setiap perbandingan
+    loop_ms = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for query in queries:
+            similarities = [
+                np.dot(query, known) / (np.linalg.norm(query) * np.linalg.norm(known))
+                for known in embeddings
+            ]
+            int(np.argmax(similarities))
+        loop_ms.append((time.perf_counter() - start) * 1000)
+
+    matcher_ms = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        matcher.search(queries, k=args.k)
+        matcher_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"Galeri: {args.people} orang x {args.per_person} embedding, {args.faces} wajah per frame")
+    print(f"  Build matriks galeri: {build_ms:.1f}ms\n")
+    print("Latency per frame:")
+    print_summary("Loop Python", summarize(loop_ms))
+    print_summary(f"FaceMatcher (top-{args.k})", summarize(matcher_ms))
+
+
+def bench_batch(args):
+    """
+    Throughput embedding (wajah/detik) terhadap ukuran batch model recognition
+    """
+    from face_detector_yolo import YOLOFaceDetector
+    from face_encoder_arcface import ArcFaceEncoder
+
+    frames = load_frames(args.source, args.limit)
+    print(f"✓ {len(frames)} frame di-load dari {args.source}\n")
+
+    detector = YOLOFaceDetector()
+    encoder = ArcFaceEncoder()
+
+    aligned_faces = []
+    for frame in frames:
+        _, landmarks = detector.detect_faces_with_landmarks(frame)
+        aligned_faces.extend(encoder.align_face(frame, kps) for kps in landmarks if kps is not None)
+
+    if len(aligned_faces) == 0:
+        print("⚠ Tidak ada wajah dengan keypoint terdeteksi")
+        return
+
+    print(f"Throughput recognition ({len(aligned_faces)} wajah unik, {args.faces} wajah per ukuran batch):")
+    for batch_size in args.batch_sizes:
+        # Susun batch dengan mengulang wajah yang tersedia
+        batch = [aligned_faces[idx % len(aligned_faces)] for idx in range(batch_size)]
+        num_batches = max(1, args.faces // batch_size)
+
+        encoder.embed_aligned_faces(batch)  # Warm-up
+        start = time.perf_counter()
+        for _ in range(num_batches):
+            encoder.embed_aligned_faces(batch)
+        elapsed = time.perf_counter() - start
+
+        faces_per_sec = num_batches * batch_size / elapsed
+        print(f"  batch={batch_size:<3} {faces_per_sec:8.1f} wajah/detik "
+              f"({elapsed / num_batches * 1000:.2f}ms per batch)")
+
+
+def bench_index(args):
+    """
+    Recall dan latency index aproksimasi (IVF) dibanding pencarian exact
+    pada galeri sintetis yang tumbuh (mis. 100x)
+    """
+    from face_index import ExactIndex, IVFIndex
+    from face_matcher import l2_normalize
+
+    rng = np.random.default_rng(0)
+    print(f"Index IVF (nprobe={args.nprobe}) vs exact, top-{args.k}, {args.queries} query:\n")
+
+    for num_people in args.people:
+        # Setiap orang punya pusat embedding, foto-fotonya tersebar di sekitarnya
+        centers = l2_normalize(rng.standard_normal((num_people, config.EMBEDDING_SIZE)))
+        noise = rng.standard_normal((num_people, args.per_person, config.EMBEDDING_SIZE)) * args.noise
+        gallery = l2_normalize((centers[:, None, :] + noise).reshape(-1, config.EMBEDDING_SIZE))
+
+        query_people = rng.integers(0, num_people, args.queries)
+        queries = l2_normalize(
+            centers[query_people] + rng.standard_normal((args.queries, config.EMBEDDING_SIZE)) * args.noise
+        )
+
+        exact = ExactIndex()
+        exact.build(gallery)
+
+        start = time.perf_counter()
+        ivf = IVFIndex(nlist=args.nlist, nprobe=args.nprobe)
+        ivf.build(gallery)
+        build_s = time.perf_counter() - start
+
+        exact_ms, ivf_ms = [], []
+        hits = 0
+        top1_hits = 0
+        for query in queries:
+            query = query[None, :]
+            start = time.perf_counter()
+            exact_rows, _ = exact.search(query, args.k)
+            exact_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            ivf_rows, _ = ivf.search(query, args.k)
+            ivf_ms.append((time.perf_counter() - start) * 1000)
+
+            hits += len(np.intersect1d(exact_rows[0], ivf_rows[0]))
+            top1_hits += int(exact_rows[0, 0] == ivf_rows[0, 0])
+
+        recall = hits / (args.queries * args.k)
+        print(f"Galeri {len(gallery)} embedding ({num_people} orang), "
+              f"{len(ivf.centroids)} cluster, build {build_s:.1f}s")
+        print(f"  recall@1={top1_hits / args.queries:.3f} recall@{args.k}={recall:.3f}")
+        print_summary("Exact", summarize(exact_ms))
+        print_summary("IVF", summarize(ivf_ms))
+        print()
+
+
+def bench_gate(args):
+    """
+    Efek motion gating: CPU time dan missed-detection rate dibanding YOLO di setiap frame
+    """
+    from face_detector_yolo import YOLOFaceDetector
+    from motion_gate import MotionGate
+
+    frames = load_frames(args.source, args.limit)
+    print(f"✓ {len(frames)} frame di-load dari {args.source}\n")
+
+    detector = YOLOFaceDetector()
+    gate = MotionGate()
+    frame_interval = 1.0 / args.fps
+
+    yolo_cpu = 0.0
+    gate_cpu = 0.0
+    gated_yolo_cpu = 0.0
+    frames_with_faces = 0
+    missed_frames = 0
+    has_faces = False
+
+    for idx, frame in enumerate(frames):
+        # Ground truth: YOLO di setiap frame
+        start = time.process_time()
+        face_locations = detector.detect_faces(frame)
+        yolo_time = time.process_time() - start
+        yolo_cpu += yolo_time
+
+        # Keputusan gate (waktu frame disimulasikan dari FPS video)
+        start = time.process_time()
+        run_yolo = gate.should_process(frame, has_active_tracks=has_faces, now=idx * frame_interval)
+        gate_cpu += time.process_time() - start
+
+        if run_yolo:
+            gated_yolo_cpu += yolo_time
+            # Perkiraan tracker: wajah dianggap masih aktif jika terdeteksi di frame yang dijalankan
+            has_faces = len(face_locations) > 0
+
+        if len(face_locations) > 0:
+            frames_with_faces += 1
+            if not run_yolo:
+                missed_frames += 1
+
+    stats = gate.get_stats()
+    total_gated = gate_cpu + gated_yolo_cpu
+    print(f"Frame di-gate (tanpa YOLO): {stats['frames_gated']}/{stats['frames_checked']} "
+          f"({stats['gated_ratio'] * 100:.1f}%)")
+    print(f"CPU time YOLO setiap frame : {yolo_cpu:.2f}s")
+    print(f"CPU time dengan gating     : {total_gated:.2f}s "
+          f"(gate {gate_cpu:.2f}s + YOLO {gated_yolo_cpu:.2f}s), "
+          f"hemat {(1 - total_gated / max(yolo_cpu, 1e-9)) * 100:.1f}%")
+    if frames_with_faces:
+        print(f"Missed detection: {missed_frames}/{frames_with_faces} frame berisi wajah "
+              f"({missed_frames / frames_with_faces * 100:.1f}%)")
+
+
+def bench_scale(args):
+    """
+    Latency dan recall wajah (terutama wajah kecil) per resolusi deteksi,
+    dibanding deteksi pada resolusi terbesar sebagai referensi
+    """
+    from face_detector_yolo import YOLOFaceDetector
+    from face_tracker import iou_matrix, locations_to_boxes
+
+    frames = load_frames(args.source, args.limit)
+    print(f"✓ {len(frames)} frame di-load dari {args.source}\n")
+
+    detector = YOLOFaceDetector()
+    sizes = sorted(args.sizes, reverse=True)
+
+    # Referensi: deteksi pada resolusi terbesar
+    detector.set_detection_size(sizes[0])
+    reference = [locations_to_boxes(detector.detect_faces(frame)) for frame in frames]
+    total_faces = sum(len(boxes) for boxes in reference)
+    small_faces = sum(int(np.sum(boxes[:, 3] - boxes[:, 1] < args.small)) for boxes in reference)
+    print(f"Referensi {sizes[0]}px: {total_faces} wajah ({small_faces} wajah < {args.small}px)\n")
+
+    for size in sizes:
+        detector.set_detection_size(size)
+        latency_ms = []
+        found = 0
+        found_small = 0
+
+        for frame, ref_boxes in zip(frames, reference):
+            start = time.perf_counter()
+            boxes = locations_to_boxes(detector.detect_faces(frame))
+            latency_ms.append((time.perf_counter() - start) * 1000)
+
+            if len(ref_boxes) == 0:
+                continue
+            matched = (iou_matrix(ref_boxes, boxes) >= 0.5).any(axis=1)
+            small = ref_boxes[:, 3] - ref_boxes[:, 1] < args.small
+            found += int(matched.sum())
+            found_small += int(matched[small].sum())
+
+        recall = found / total_faces if total_faces else 0.0
+        recall_small = found_small / small_faces if small_faces else 0.0
+        print_summary(f"{size}px", summarize(latency_ms))
+        print(f"    recall={recall:.3f} recall wajah kecil={recall_small:.3f}")
+
+
+def current_rss_mb():
+    """RSS proses saat ini (MB), fallback ke peak RSS jika /proc tidak ada"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_detector_probe(args):
+    """
+    Dijalankan di proses terpisah oleh bench_backend: ukur startup (import +
+    load model), RSS, dan latency per frame untuk satu backend detector
+    """
+    start = time.perf_counter()
+    from face_detector_yolo import YOLOFaceDetector
+    detector = YOLOFaceDetector(backend=args.backend)
+    startup = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    frames = load_frames(args.source, args.limit)
+    for frame in frames[:3]:
+        detector.detect_faces(frame)  # warm-up
+
+    latency_ms = []
+    faces = 0
+    for frame in frames:
+        start = time.perf_counter()
+        faces += len(detector.detect_faces(frame))
+        latency_ms.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        'startup_s': startup,
+        'rss_loaded_mb': rss_loaded,
+        'rss_after_mb': current_rss_mb(),
+        'faces': faces,
+        'latency': summarize(latency_ms)
+    }))
+
+
+def bench_backend(args):
+    """
+    Bandingkan backend detector (ultralytics vs ONNX Runtime): startup time,
+    RSS, dan latency per frame. Setiap backend diukur di proses baru supaya
+    import torch tidak mempengaruhi pengukuran backend lain.
+    """
+    for backend in args.backends:
+        command = [sys.executable, os.path.abspath(__file__), 'detector-probe',
+                   '--backend', backend, '--source', args.source, '--limit', str(args.limit)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"⚠ Backend {backend} gagal:\n{completed.stderr.strip()[-500:]}")
+            continue
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"Backend {backend}:")
+        print(f"  Startup (import + load model): {result['startup_s']:.2f}s")
+        print(f"  RSS setelah load: {result['rss_loaded_mb']:.0f}MB, "
+              f"setelah inference: {result['rss_after_mb']:.0f}MB")
+        print(f"  Wajah terdeteksi: {result['faces']}")
+        print_summary("Latency per frame", result['latency'])
+        print()
+
+
+def leave_one_out_accuracy(queries, gallery, labels, threshold):
+    """
+    Akurasi recognition leave-one-out: setiap query dicocokkan ke galeri tanpa
+    dirinya sendiri, benar jika orang dengan skor tertinggi sesuai label dan
+    skornya >= threshold
+
+    Returns:
+        (accuracy, false_accept_rate) atas query yang orangnya punya >= 2 gambar
+    """
+    from face_matcher import l2_normalize
+
+    labels = np.asarray(labels)
+    scores = l2_normalize(queries) @ l2_normalize(gallery).T
+    np.fill_diagonal(scores, -np.inf)
+
+    # Label sudah terurut per orang -> skor per orang dengan reduceat
+    persons, starts, counts = np.unique(labels, return_index=True, return_counts=True)
+    order = np.argsort(starts)
+    persons, starts, counts = persons[order], starts[order], counts[order]
+    person_scores = np.maximum.reduceat(scores, starts, axis=1)
+
+    best = np.argmax(person_scores, axis=1)
+    best_scores = person_scores[np.arange(len(labels)), best]
+    count_of = dict(zip(persons, counts))
+    valid = np.array([count_of[label] >= 2 for label in labels])
+
+    correct = (persons[best] == labels) & (best_scores >= threshold)
+    false_accept = (persons[best] != labels) & (best_scores >= threshold)
+    return correct[valid].mean(), false_accept[valid].mean()
+
+
+def run_recognition_session(session, rec_model, blob, batch_size=32):
+    """Embedding untuk semua wajah dengan satu session ONNX"""
+    outputs = []
+    for start in range(0, len(blob), batch_size):
+        outputs.append(session.run(rec_model.output_names, {rec_model.input_name: blob[start:start + batch_size]})[0])
+    return np.concatenate(outputs)
+
+
+def bench_quant(args):
+    """
+    Bandingkan model FP32 vs INT8: recall deteksi, akurasi recognition pada
+    FACE_RECOGNITION_THRESHOLD, dan latency
+    """
+    import onnxruntime
+    from model_quantizer import recognition_blobs
+
+    # Deteksi: recall INT8 terhadap FP32 sebagai referensi
+    fp32_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_MODEL)
+    int8_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_INT8_MODEL)
+    if os.path.exists(fp32_path) and os.path.exists(int8_path):
+        from face_detector_onnx import ONNXFaceDetector
+        from face_tracker import iou_matrix
+
+        frames = load_frames(args.source, args.limit)
+        print(f"Deteksi ({len(frames)} frame dari {args.source}):")
+        detectors = {'FP32': ONNXFaceDetector(fp32_path), 'INT8': ONNXFaceDetector(int8_path)}
+        detections = {}
+        for label, detector in detectors.items():
+            latency_ms = []
+            detections[label] = []
+            for frame in frames:
+                start = time.perf_counter()
+                boxes, _, _ = detector.detect(frame, config.FACE_DETECTION_THRESHOLD, config.DETECTION_SIZE)
+                latency_ms.append((time.perf_counter() - start) * 1000)
+                detections[label].append(boxes)
+            print_summary(label, summarize(latency_ms))
+
+        total = sum(len(boxes) for boxes in detections['FP32'])
+        found = sum(int((iou_matrix(ref, boxes) >= 0.5).any(axis=1).sum())
+                    for ref, boxes in zip(detections['FP32'], detections['INT8']) if len(ref) > 0)
+        extra = sum(len(boxes) for boxes in detections['INT8']) - found
+        print(f"  Recall INT8 vs FP32: {found}/{total} ({found / max(total, 1):.3f}), deteksi tambahan: {max(extra, 0)}\n")
+    else:
+        print(f"⚠ Lewati deteksi: butuh {fp32_path} dan {int8_path}\n")
+
+    # Recognition: wajah ter-align dari data/faces, dievaluasi dengan kedua model
+    int8_rec_path = os.path.join(config.DATA_DIR, config.ARCFACE_INT8_MODEL)
+    if not os.path.exists(int8_rec_path):
+        print(f"⚠ Lewati recognition: {int8_rec_path} tidak ada (jalankan 05_quantize_models.py)")
+        return
+
+    config.USE_INT8_RECOGNITION = False
+    from face_encoder_arcface import ArcFaceEncoder
+    encoder = ArcFaceEncoder()
+    rec_model = encoder.rec_model
+
+    aligned_faces = []
+    labels = []
+    for person_name, image_paths in encoder._list_training_images(args.faces_dir):
+        for image_path in image_paths[:args.per_person]:
+            image = cv2.imread(str(image_path))
+            face = encoder.get_training_aligned_face(image) if image is not None else None
+            if face is not None:
+                aligned_faces.append(face)
+                labels.append(person_name)
+
+    if len(aligned_faces) == 0:
+        print(f"⚠ Tidak ada wajah di {args.faces_dir}")
+        return
+
+    print(f"Recognition ({len(aligned_faces)} wajah, {len(set(labels))} orang, "
+          f"threshold {config.FACE_RECOGNITION_THRESHOLD}):")
+    blob = recognition_blobs(rec_model, aligned_faces)
+    sessions = {
+        'FP32': rec_model.session,
+        'INT8': onnxruntime.InferenceSession(int8_rec_path, providers=['CPUExecutionProvider'])
+    }
+
+    embeddings = {}
+    for label, session in sessions.items():
+        latency_ms = []
+        for idx in range(min(len(blob), 100)):
+            start = time.perf_counter()
+            session.run(rec_model.output_names, {rec_model.input_name: blob[idx:idx + 1]})
+            latency_ms.append((time.perf_counter() - start) * 1000)
+        print_summary(f"{label} latency per wajah", summarize(latency_ms))
+        embeddings[label] = run_recognition_session(session, rec_model, blob)
+
+    threshold = config.FACE_RECOGNITION_THRESHOLD
+    rows = [
+        ("FP32", embeddings['FP32'], embeddings['FP32']),
+        ("INT8", embeddings['INT8'], embeddings['INT8']),
+        ("INT8 query vs galeri FP32", embeddings['INT8'], embeddings['FP32'])
+    ]
+    for label, queries, gallery in rows:
+        accuracy, false_accept = leave_one_out_accuracy(queries, gallery, labels, threshold)
+        print(f"  {label:<28} akurasi={accuracy:.3f} false accept={false_accept:.3f}")
+
+    from face_matcher import l2_normalize
+    agreement = np.sum(l2_normalize(embeddings['FP32']) * l2_normalize(embeddings['INT8']), axis=1)
+    print(f"  Cosine FP32 vs INT8 wajah yang sama: mean={agreement.mean():.4f} min={agreement.min():.4f}")
+
+
+# Konfigurasi yang ikut dicatat di hasil replay (untuk membandingkan antar versi)
+REPLAY_CONFIG_KEYS = [
+    'DETECTOR_BACKEND', 'DETECTION_SIZE', 'USE_INT8_DETECTOR', 'USE_INT8_RECOGNITION',
+    'ARCFACE_MODEL', 'FACE_INDEX_TYPE', 'USE_LANDMARK_ALIGNMENT', 'MOTION_GATING',
+    'IDENTITY_REVERIFY_INTERVAL', 'FACE_RECOGNITION_THRESHOLD'
+]
+
+
+def git_revision():
+    """Commit git saat ini (None jika bukan repo git)"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                   text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_replay(args):
+    """
+    Putar ulang rekaman melalui pipeline lengkap (capture -> deteksi ->
+    recognition -> presensi), hasil dalam JSON untuk dilacak antar versi
+    """
+    import tempfile
+    from metrics import metrics
+    from replay_harness import ReplayHarness
+
+    # Presensi benchmark ditulis ke file sementara, bukan attendance.csv asli
+    attendance_file = os.path.join(tempfile.mkdtemp(prefix='replay_'), 'attendance.csv')
+    harness = ReplayHarness(args.source, realtime=args.realtime, frame_skip=args.frame_skip,
+                            max_frames=args.limit, fps=args.fps, attendance_file=attendance_file)
+    report = harness.run()
+
+    counters = report['counters']
+    elapsed = report['elapsed_s']
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'source': args.source,
+        'pace': 'realtime' if args.realtime else 'fast',
+        'frame_skip': args.frame_skip,
+        'config': {key: getattr(config, key, None) for key in REPLAY_CONFIG_KEYS},
+        'elapsed_s': elapsed,
+        'fps': {
+            'source': report['source_fps'],
+            'input': counters['frames_read'] / elapsed if elapsed > 0 else 0.0,
+            'processed': counters['frames_processed'] / elapsed if elapsed > 0 else 0.0
+        },
+        'counters': counters,
+        'pipeline': report['pipeline'],
+        'latency_ms': {stage: summarize(samples) for stage, samples in report['samples'].items()},
+        # Rincian per tahap dari instrumentasi metrics (embed, match, mark_attendance, ...)
+        'stage_latency_ms': {
+            stage: {'count': timer['count'], **{f"p{round(q * 100)}": value * 1000
+                                                for q, value in timer['quantiles'].items()}}
+            for stage, timer in metrics.snapshot()['timers'].items()
+        }
+    }
+
+    print(f"\nReplay {args.source} ({result['pace']}): {counters['frames_read']} frame dalam {elapsed:.1f}s")
+    print(f"  FPS input={result['fps']['input']:.1f} diproses={result['fps']['processed']:.1f} | "
+          f"drop={counters['frames_dropped']} skip={counters['frames_skipped']} gated={counters['frames_gated']} | "
+          f"recognition calls={report['pipeline']['recognition_calls']} "
+          f"(wajah di-embed={report['pipeline']['faces_recognized']}) | presensi={counters['attendance_marked']}")
+    for stage, summary in result['latency_ms'].items():
+        print_summary(stage, summary)
+
+    output = json.dumps(result, indent=2, default=float)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"\n✓ Hasil JSON disimpan: {args.output}")
+    else:
+        print(output)
+
+
+def run_pipeline_mode(mode, frames, fps, duration):
+    """
+    Jalankan pipeline selama `duration` detik dengan struktur thread seperti
+    01_main_system: thread capture ber-pacing FPS kamera (frame diputar
+    berulang) menulis ke ring shared memory (latest-frame-wins), lalu
+    - thread: deteksi & recognition dalam satu thread di proses ini
+    - process: deteksi & recognition di proses worker, dua tahap (thread
+      deteksi -> queue terbatas -> thread recognition)
+
+    Returns:
+        Dict FPS capture/diproses, frame drop, keterlambatan capture (ms,
+        indikator rebutan GIL) dan latency capture -> hasil (ms)
+    """
+    from queue import Empty, Full, Queue
+    from threading import Event, Thread
+    from face_pipeline import FacePipeline, detect_stage, process_batch, recognize_stage
+    from frame_ring import SharedFrameRing
+
+    if mode == "process":
+        from pipeline_workers import DetectorWorker, RecognizerWorker
+        detector, recognizer = DetectorWorker(), RecognizerWorker()
+    else:
+        from face_detector_yolo import YOLOFaceDetector
+        from face_recognizer_arcface import ArcFaceRecognizer
+        detector, recognizer = YOLOFaceDetector(), ArcFaceRecognizer()
+    pipeline = FacePipeline(detector, recognizer, recognizer.load_model())
+    process_batch([pipeline], [frames[0]])  # warm-up
+
+    ring = SharedFrameRing(frames[0].shape)
+    stage_queue = Queue(maxsize=config.WORKER_QUEUE_SIZE)
+    stop = Event()
+    counters = {'captured': 0, 'processed': 0}
+    capture_late_ms = []
+    latency_ms = []
+
+    def capture():
+        interval = 1.0 / fps
+        start = time.perf_counter()
+        index = 0
+        while not stop.is_set():
+            target = start + index * interval
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            capture_late_ms.append(max(0.0, (time.perf_counter() - target) * 1000))
+
+            ring.write(frames[index % len(frames)], time.perf_counter())
+            index += 1
+            counters['captured'] += 1
+
+    def finish(frame, captured_at, states):
+        recognize_stage([pipeline], [frame], states)
+        latency_ms.append((time.perf_counter() - captured_at) * 1000)
+        counters['processed'] += 1
+        ring.release(frame)
+
+    def detect_loop():
+        while not stop.is_set():
+            latest = ring.latest()
+            if latest is None:
+                time.sleep(0.001)
+                continue
+            frame, _, captured_at = latest
+            item = (frame, captured_at, detect_stage([pipeline], [frame]))
+            if mode != "process":
+                finish(*item)
+                continue
+            while not stop.is_set():
+                try:
+                    stage_queue.put(item, timeout=0.1)
+                    break
+                except Full:
+                    continue
+
+    def recognize_loop():
+        while not stop.is_set():
+            try:
+                item = stage_queue.get(timeout=0.1)
+            except Empty:
+                continue
+            finish(*item)
+
+    threads = [Thread(target=capture, daemon=True), Thread(target=detect_loop, daemon=True)]
+    if mode == "process":
+        threads.append(Thread(target=recognize_loop, daemon=True))
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    elapsed = time.perf_counter() - start
+    for thread in threads:
+        thread.join(timeout=config.WORKER_CALL_TIMEOUT)
+
+    if mode == "process":
+        detector.stop()
+        recognizer.stop()
+    dropped = ring.frames_dropped()
+    ring.close()
+
+    return {
+        'capture_fps': counters['captured'] / elapsed,
+        'processed_fps': counters['processed'] / elapsed,
+        'dropped': dropped,
+        'capture_late': summarize(capture_late_ms),
+        'latency': summarize(latency_ms)
+    }
+
+
+def bench_workers(args):
+    """
+    Throughput mode thread vs mode proses worker (config.PIPELINE_MODE)
+    dengan thread capture yang berjalan bersamaan
+    """
+    frames = load_frames(args.source, args.limit)
+    print(f"✓ {len(frames)} frame di-load dari {args.source}, {os.cpu_count()} core CPU\n")
+
+    results = {}
+    for mode in args.modes:
+        print(f"Mode {mode} ({args.duration:.0f}s)...")
+        results[mode] = run_pipeline_mode(mode, frames, args.fps, args.duration)
+
+    print()
+    for mode, result in results.items():
+        print(f"{mode}: diproses {result['processed_fps']:.1f} FPS, capture {result['capture_fps']:.1f} FPS "
+              f"(target {args.fps:.0f}), drop {result['dropped']} frame")
+        print_summary("keterlambatan capture", result['capture_late'])
+        print_summary("latency capture -> hasil", result['latency'])
+
+    if 'thread' in results and 'process' in results and results['thread']['processed_fps'] > 0:
+        print(f"\nThroughput process / thread: "
+              f"{results['process']['processed_fps'] / results['thread']['processed_fps']:.2f}x")
+
+
+def _ring_consumer(request_queue, response_queue):
+    """Proses konsumen bench_ring: terima frame (array atau FrameRef), balas checksum"""
+    from frame_ring import from_shared
+
+    while True:
+        item = request_queue.get()
+        if item is None:
+            break
+        frame = from_shared([item])[0]
+        response_queue.put(int(frame[::64, ::64].sum()))
+
+
+def bench_ring(args):
+    """
+    Biaya hand-off satu frame ke proses lain: pickle lewat multiprocessing.Queue
+    vs FrameRef ke ring shared memory
+    """
+    import multiprocessing
+    import pickle
+    from frame_ring import SharedFrameRing, frame_ref
+
+    context = multiprocessing.get_context("spawn")
+    request_queue = context.Queue(maxsize=2)
+    response_queue = context.Queue(maxsize=2)
+    consumer = context.Process(target=_ring_consumer, args=(request_queue, response_queue), daemon=True)
+    consumer.start()
+
+    frame = np.random.randint(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    ring = SharedFrameRing(frame.shape, slots=2)
+    ring.write(frame, time.monotonic())
+    shared_frame = ring.latest()[0]
+
+    print(f"Frame {args.width}x{args.height}: {frame.nbytes / 1e6:.2f} MB, "
+          f"FrameRef {len(pickle.dumps(frame_ref(shared_frame)))} byte\n")
+
+    for label, make_item in (('pickle', lambda: frame), ('shared memory', lambda: frame_ref(shared_frame))):
+        latency_ms = []
+        for _ in range(args.iterations + 5):
+            start = time.perf_counter()
+            request_queue.put(make_item())
+            response_queue.get()
+            latency_ms.append((time.perf_counter() - start) * 1000)
+        print_summary(label, summarize(latency_ms[5:]))
+
+    request_queue.put(None)
+    consumer.join(timeout=5)
+    ring.release(shared_frame)
+    del shared_frame
+    ring.close()
+
+
+def bench_render(args):
+    """
+    Waktu render anotasi per frame vs jumlah wajah: cara lama (copy + blend
+    satu frame penuh per wajah) vs OverlayRenderer (blend hanya ROI label)
+    """
+    from overlay_renderer import STATUS_COLORS, OverlayRenderer
+
+    def legacy_draw(frame, face_location, name, status):
+        # Cara lama: box + label, background label lewat copy & addWeighted satu frame penuh
+        top, right, bottom, left = face_location
+        color, accent_color = STATUS_COLORS[status]
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 1)
+        (text_width, text_height), _ = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+        label_top = max(0, top - text_height - 21)
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (left, label_top), (left + text_width + 16, label_top + text_height + 16),
+                      accent_color, -1)
+        cv2.addWeighted(overlay, 0.85, frame, 0.15, 0, frame)
+        cv2.putText(frame, name, (left + 8, label_top + text_height + 8), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (255, 255, 255), 1, cv2.LINE_AA)
+
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    renderer = OverlayRenderer()
+
+    print(f"Frame {args.width}x{args.height}, {args.repeat} ulangan per jumlah wajah\n")
+    for count in args.faces:
+        annotations = []
+        for idx in range(count):
+            size = int(rng.integers(60, 160))
+            top = int(rng.integers(40, args.height - size))
+            left = int(rng.integers(0, args.width - size))
+            annotations.append(((top, left + size, top + size, left), f"Jemaat {idx}", 0.8, 'recognized'))
+
+        legacy_ms = []
+        renderer_ms = []
+        for _ in range(args.repeat):
+            frame = base.copy()
+            start = time.perf_counter()
+            for face_location, name, _, status in annotations:
+                legacy_draw(frame, face_location, name, status)
+            legacy_ms.append((time.perf_counter() - start) * 1000)
+
+            frame = base.copy()
+            start = time.perf_counter()
+            renderer.draw(frame, annotations)
+            renderer_ms.append((time.perf_counter() - start) * 1000)
+
+        print(f"{count} wajah:")
+        print_summary("copy + blend frame penuh", summarize(legacy_ms))
+        print_summary("OverlayRenderer (ROI)", summarize(renderer_ms))
+
+
+def bench_metrics(args):
+    """Overhead instrumentasi per pengukuran: tanpa timer vs timer nonaktif vs timer aktif"""
+    from metrics import MetricsRegistry
+
+    def loop(registry):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            if registry is None:
+                pass
+            else:
+                with registry.timer('stage'):
+                    pass
+        return (time.perf_counter() - start) / args.iterations * 1e9
+
+    baseline = loop(None)
+    disabled = loop(MetricsRegistry(enabled=False))
+    enabled_registry = MetricsRegistry(enabled=True, window=args.window)
+    enabled = loop(enabled_registry)
+
+    print(f"{args.iterations} pengukuran, window {args.window} sampel")
+    print(f"  {'tanpa timer':<28} {baseline:.0f} ns")
+    print(f"  {'timer nonaktif':<28} {disabled:.0f} ns (+{disabled - baseline:.0f} ns)")
+    print(f"  {'timer aktif':<28} {enabled:.0f} ns (+{enabled - baseline:.0f} ns)")
+
+    start = time.perf_counter()
+    text = enabled_registry.prometheus_text()
+    print(f"  {'scrape /metrics':<28} {(time.perf_counter() - start) * 1000:.2f} ms ({len(text)} byte)")
+
+
+def bench_handoff(args):
+    """
+    Hand-off antar thread: polling lama (Queue.empty() + sleep 1 ms) vs
+    LatestValueSlot (Condition) - CPU saat idle dan latency bangun konsumen
+    """
+    import threading
+    from queue import Queue
+    from latest_slot import LatestValueSlot
+
+    def polling_consumer(channel, stop, latencies):
+        while not stop.is_set():
+            if not channel.empty():
+                sent = channel.get()
+                latencies.append((time.perf_counter() - sent) * 1000)
+            else:
+                time.sleep(0.001)
+
+    def slot_consumer(channel, stop, latencies):
+        while not stop.is_set():
+            sent = channel.get(timeout=0.5)
+            if sent is not None:
+                latencies.append((time.perf_counter() - sent) * 1000)
+
+    variants = [
+        ("polling (empty + sleep 1 ms)", Queue, polling_consumer),
+        ("LatestValueSlot (Condition)", LatestValueSlot, slot_consumer),
+    ]
+
+    print(f"Idle {args.idle:.0f}s, lalu {args.messages} pesan setiap {args.interval * 1000:.0f} ms\n")
+    for label, factory, consumer in variants:
+        channel = factory()
+        stop = threading.Event()
+        latencies = []
+        thread = threading.Thread(target=consumer, args=(channel, stop, latencies), daemon=True)
+        thread.start()
+
+        # CPU proses saat konsumen menunggu tanpa data
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        time.sleep(args.idle)
+        idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start) * 100
+
+        for _ in range(args.messages):
+            channel.put(time.perf_counter())
+            time.sleep(args.interval)
+
+        stop.set()
+        if isinstance(channel, LatestValueSlot):
+            channel.close()
+        thread.join()
+
+        print(f"{label}: CPU idle {idle_cpu:.2f}% core")
+        print_summary("latency bangun", summarize(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Sistem Presensi GKI Karawaci")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    align_parser = subparsers.add_parser('align', help="Latency per wajah: deteksi ulang vs alignment langsung")
+    align_parser.add_argument('--source', default=config.FACES_DIR, help="File video atau direktori gambar")
+    align_parser.add_argument('--limit', type=int, default=100, help="Jumlah frame maksimum")
+    align_parser.set_defaults(func=bench_align)
+
+    match_parser = subparsers.add_parser('match', help="Loop Python vs matcher galeri tervektorisasi")
+    match_parser.add_argument('--people', type=int, default=2000, help="Jumlah orang di galeri")
+    match_parser.add_argument('--per-person', type=int, default=5, help="Embedding per orang")
+    match_parser.add_argument('--faces', type=int, default=5, help="Jumlah wajah per frame (query)")
+    match_parser.add_argument('--k', type=int, default=5, help="Top-k kandidat")
+    match_parser.add_argument('--repeat', type=int, default=5, help="Jumlah pengulangan")
+    match_parser.set_defaults(func=bench_match)
+
+    batch_parser = subparsers.add_parser('batch', help="Throughput embedding vs ukuran batch")
+    batch_parser.add_argument('--source', default=config.FACES_DIR, help="File video atau direktori gambar")
+    batch_parser.add_argument('--limit', type=int, default=100, help="Jumlah frame maksimum")
+    batch_parser.add_argument('--faces', type=int, default=256, help="Jumlah wajah yang di-embed per ukuran batch")
+    batch_parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                              help="Ukuran batch yang diuji")
+    batch_parser.set_defaults(func=bench_batch)
+
+    index_parser = subparsers.add_parser('index', help="Recall & latency index IVF vs exact")
+    index_parser.add_argument('--people', type=int, nargs='+', default=[100, 1000, 10000],
+                              help="Jumlah orang di galeri (beberapa ukuran)")
+    index_parser.add_argument('--per-person', type=int, default=5, help="Embedding per orang")
+    index_parser.add_argument('--noise', type=float, default=0.04, help="Sebaran embedding per orang")
+    index_parser.add_argument('--nlist', type=int, default=config.IVF_NLIST, help="Jumlah cluster (0 = otomatis)")
+    index_parser.add_argument('--nprobe', type=int, default=config.IVF_NPROBE, help="Cluster yang diperiksa")
+    index_parser.add_argument('--queries', type=int, default=200, help="Jumlah query")
+    index_parser.add_argument('--k', type=int, default=10, help="Top-k baris")
+    index_parser.set_defaults(func=bench_index)
+
+    gate_parser = subparsers.add_parser('gate', help="CPU & missed detection motion gating")
+    gate_parser.add_argument('--source', required=True, help="File video (rekaman pintu masuk)")
+    gate_parser.add_argument('--limit', type=int, default=3000, help="Jumlah frame maksimum")
+    gate_parser.add_argument('--fps', type=float, default=config.FPS, help="FPS video untuk simulasi waktu")
+    gate_parser.set_defaults(func=bench_gate)
+
+    scale_parser = subparsers.add_parser('scale', help="Latency & recall wajah kecil per resolusi deteksi")
+    scale_parser.add_argument('--source', required=True, help="File video atau direktori gambar")
+    scale_parser.add_argument('--limit', type=int, default=200, help="Jumlah frame maksimum")
+    scale_parser.add_argument('--sizes', type=int, nargs='+', default=[1280, 960, 640, 480, 320],
+                              help="Resolusi deteksi (sisi terpanjang)")
+    scale_parser.add_argument('--small', type=int, default=60, help="Tinggi box (px resolusi penuh) untuk wajah kecil")
+    scale_parser.set_defaults(func=bench_scale)
+
+    backend_parser = subparsers.add_parser('backend', help="Startup, RSS & latency backend detector")
+    backend_parser.add_argument('--source', default=config.FACES_DIR, help="File video atau direktori gambar")
+    backend_parser.add_argument('--limit', type=int, default=100, help="Jumlah frame maksimum")
+    backend_parser.add_argument('--backends', nargs='+', default=['ultralytics', 'onnx'],
+                                help="Backend yang dibandingkan")
+    backend_parser.set_defaults(func=bench_backend)
+
+    probe_parser = subparsers.add_parser('detector-probe', help="(internal) ukur satu backend detector")
+    probe_parser.add_argument('--backend', required=True)
+    probe_parser.add_argument('--source', required=True)
+    probe_parser.add_argument('--limit', type=int, default=100)
+    probe_parser.set_defaults(func=bench_detector_probe)
+
+    quant_parser = subparsers.add_parser('quant', help="Akurasi & latency model FP32 vs INT8")
+    quant_parser.add_argument('--source', default=config.FACES_DIR, help="Frame untuk recall deteksi")
+    quant_parser.add_argument('--limit', type=int, default=200, help="Jumlah frame maksimum")
+    quant_parser.add_argument('--faces-dir', default=config.FACES_DIR, help="Dataset berlabel per orang")
+    quant_parser.add_argument('--per-person', type=int, default=10, help="Gambar maksimum per orang")
+    quant_parser.set_defaults(func=bench_quant)
+
+    replay_parser = subparsers.add_parser('replay', help="Replay rekaman melalui pipeline lengkap (hasil JSON)")
+    replay_parser.add_argument('--source', required=True, help="File video atau direktori urutan gambar")
+    replay_parser.add_argument('--realtime', action='store_true',
+                               help="Ikuti FPS rekaman (frame drop seperti kamera), default secepat mungkin")
+    replay_parser.add_argument('--fps', type=float, default=None, help="FPS rekaman (default dari video / config.FPS)")
+    replay_parser.add_argument('--frame-skip', type=int, default=1, help="Proses setiap N frame")
+    replay_parser.add_argument('--limit', type=int, default=None, help="Jumlah frame maksimum")
+    replay_parser.add_argument('--output', default=None, help="File JSON hasil (default: cetak ke stdout)")
+    replay_parser.set_defaults(func=bench_replay)
+
+    workers_parser = subparsers.add_parser('workers', help="Throughput mode thread vs proses worker")
+    workers_parser.add_argument('--source', required=True, help="File video atau direktori gambar")
+    workers_parser.add_argument('--limit', type=int, default=100, help="Jumlah frame maksimum (diputar berulang)")
+    workers_parser.add_argument('--fps', type=float, default=config.FPS, help="FPS kamera yang disimulasikan")
+    workers_parser.add_argument('--duration', type=float, default=30, help="Durasi per mode (detik)")
+    workers_parser.add_argument('--modes', nargs='+', default=['thread', 'process'], choices=['thread', 'process'])
+    workers_parser.set_defaults(func=bench_workers)
+
+    ring_parser = subparsers.add_parser('ring', help="Hand-off frame antar proses: pickle vs shared memory")
+    ring_parser.add_argument('--width', type=int, default=config.FRAME_WIDTH)
+    ring_parser.add_argument('--height', type=int, default=config.FRAME_HEIGHT)
+    ring_parser.add_argument('--iterations', type=int, default=200)
+    ring_parser.set_defaults(func=bench_ring)
+
+    render_parser = subparsers.add_parser('render', help="Waktu render anotasi vs jumlah wajah")
+    render_parser.add_argument('--faces', type=int, nargs='+', default=[0, 1, 5, 10, 20])
+    render_parser.add_argument('--width', type=int, default=config.FRAME_WIDTH)
+    render_parser.add_argument('--height', type=int, default=config.FRAME_HEIGHT)
+    render_parser.add_argument('--repeat', type=int, default=50)
+    render_parser.set_defaults(func=bench_render)
+
+    metrics_parser = subparsers.add_parser('metrics', help="Overhead instrumentasi latency per tahap")
+    metrics_parser.add_argument('--iterations', type=int, default=200000)
+    metrics_parser.add_argument('--window', type=int, default=config.METRICS_WINDOW)
+    metrics_parser.set_defaults(func=bench_metrics)
+
+    handoff_parser = subparsers.add_parser('handoff', help="CPU idle & latency bangun: polling vs Condition")
+    handoff_parser.add_argument('--idle', type=float, default=10, help="Durasi idle yang diukur (detik)")
+    handoff_parser.add_argument('--messages', type=int, default=500, help="Jumlah pesan untuk latency")
+    handoff_parser.add_argument('--interval', type=float, default=0.01, help="Jeda antar pesan (detik)")
+    handoff_parser.set_defaults(func=bench_handoff)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
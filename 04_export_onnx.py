@@ -0,0 +1,60 @@
+"""
+04 - Export ONNX
+Script untuk mengubah model YOLO face (.pt) menjadi .onnx
+Model .onnx dijalankan dengan ONNX Runtime (config.DETECTOR_BACKEND = "onnx")
+sehingga torch & ultralytics tidak perlu di-load saat sistem berjalan.
+Export membutuhkan ultralytics + package onnx (cukup sekali, boleh di PC lain)
+"""
+
+import argparse
+import os
+import shutil
+import config
+
+
+def export_onnx(imgsz, dynamic, opset):
+    """
+    Export model YOLO face ke ONNX
+
+    Args:
+        imgsz: Ukuran input saat export (dipakai juga untuk model static)
+        dynamic: True agar ukuran input bebas (DETECTION_SIZE / resolusi adaptif)
+        opset: Versi opset ONNX
+
+    Returns:
+        Path file .onnx di DATA_DIR
+    """
+    from ultralytics import YOLO
+
+    model_path = os.path.join(config.DATA_DIR, config.YOLO_MODEL)
+    if not os.path.exists(model_path):
+        print(f"⚠ Model tidak ditemukan: {model_path}")
+        print("  Jalankan 01_main_system.py sekali untuk download model")
+        return None
+
+    print(f"Export {model_path} -> ONNX (imgsz={imgsz}, dynamic={dynamic}, opset={opset})...")
+    model = YOLO(model_path)
+    exported = model.export(format='onnx', imgsz=imgsz, dynamic=dynamic, opset=opset, simplify=False)
+
+    output_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_MODEL)
+    if os.path.abspath(exported) != os.path.abspath(output_path):
+        shutil.move(exported, output_path)
+
+    print(f"✓ Model ONNX disimpan: {output_path}")
+    print('  Set DETECTOR_BACKEND = "onnx" di config.py untuk memakainya')
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export model YOLO face ke ONNX")
+    parser.add_argument('--imgsz', type=int, default=config.DETECTION_SIZE, help="Ukuran input export")
+    parser.add_argument('--static', action='store_true',
+                        help="Ukuran input tetap (sedikit lebih cepat, resolusi deteksi tidak bisa diubah)")
+    parser.add_argument('--opset', type=int, default=12, help="Versi opset ONNX")
+    args = parser.parse_args()
+
+    export_onnx(args.imgsz, not args.static, args.opset)
+
+
+if __name__ == "__main__":
+    main()
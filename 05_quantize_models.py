@@ -0,0 +1,110 @@
+"""
+05 - Quantize Models
+Script untuk membuat versi INT8 dari model YOLO face (.onnx) dan model
+recognition ArcFace (buffalo_sc), dikalibrasi dengan gambar di data/faces
+Hasil dipakai dengan USE_INT8_DETECTOR / USE_INT8_RECOGNITION di config.py
+Cek akurasi & latency: python 03_benchmark.py quant
+"""
+
+import argparse
+import os
+from pathlib import Path
+import cv2
+import numpy as np
+import config
+from model_quantizer import detector_blobs, quantize_model, recognition_blobs
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def load_calibration_images(directory, limit):
+    """
+    Ambil gambar kalibrasi tersebar merata dari semua orang di dataset
+
+    Returns:
+        List gambar BGR
+    """
+    paths = sorted(p for p in Path(directory).rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if len(paths) > limit:
+        paths = [paths[i] for i in np.linspace(0, len(paths) - 1, limit).astype(int)]
+
+    images = [cv2.imread(str(path)) for path in paths]
+    return [image for image in images if image is not None]
+
+
+def file_size_mb(path):
+    return os.path.getsize(path) / (1024 * 1024)
+
+
+def quantize_detector(mode, images):
+    """Kuantisasi model YOLO face ONNX"""
+    from face_detector_onnx import ONNXFaceDetector
+
+    input_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_MODEL)
+    output_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_INT8_MODEL)
+    if not os.path.exists(input_path):
+        print(f"⚠ Model ONNX tidak ditemukan: {input_path} (jalankan: python 04_export_onnx.py)")
+        return
+
+    detector = ONNXFaceDetector(input_path)
+    blobs = None
+    if mode == "static":
+        blobs = detector_blobs(images, detector.input_size(config.DETECTION_SIZE))
+
+    print(f"Kuantisasi detector ({mode})...")
+    quantize_model(input_path, output_path, mode, detector.input_name, blobs)
+    print(f"✓ {output_path} ({file_size_mb(input_path):.1f}MB -> {file_size_mb(output_path):.1f}MB)")
+
+
+def quantize_recognition(mode, images):
+    """Kuantisasi model recognition ArcFace"""
+    # Selalu mulai dari model FP32
+    config.USE_INT8_RECOGNITION = False
+    from face_encoder_arcface import ArcFaceEncoder
+
+    encoder = ArcFaceEncoder()
+    rec_model = encoder.rec_model
+    input_path = rec_model.model_file
+    output_path = os.path.join(config.DATA_DIR, config.ARCFACE_INT8_MODEL)
+
+    blobs = None
+    if mode == "static":
+        aligned_faces = [encoder.get_training_aligned_face(image) for image in images]
+        aligned_faces = [face for face in aligned_faces if face is not None]
+        print(f"  {len(aligned_faces)} wajah ter-align untuk kalibrasi")
+        blobs = [recognition_blobs(rec_model, [face]) for face in aligned_faces]
+
+    print(f"Kuantisasi recognition ({mode})...")
+    quantize_model(input_path, output_path, mode, rec_model.input_name, blobs)
+    print(f"✓ {output_path} ({file_size_mb(input_path):.1f}MB -> {file_size_mb(output_path):.1f}MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kuantisasi INT8 model YOLO face & ArcFace")
+    parser.add_argument('--mode', choices=['dynamic', 'static'], default='static',
+                        help="dynamic (tanpa kalibrasi) atau static (kalibrasi dengan data/faces)")
+    parser.add_argument('--models', nargs='+', choices=['detector', 'recognition'],
+                        default=['detector', 'recognition'], help="Model yang dikuantisasi")
+    parser.add_argument('--calib-dir', default=config.FACES_DIR, help="Direktori gambar kalibrasi")
+    parser.add_argument('--calib-images', type=int, default=200, help="Jumlah gambar kalibrasi")
+    args = parser.parse_args()
+
+    images = []
+    if args.mode == "static":
+        images = load_calibration_images(args.calib_dir, args.calib_images)
+        if len(images) == 0:
+            print(f"⚠ Tidak ada gambar kalibrasi di {args.calib_dir}")
+            return
+        print(f"✓ {len(images)} gambar kalibrasi dari {args.calib_dir}\n")
+
+    if 'detector' in args.models:
+        quantize_detector(args.mode, images)
+    if 'recognition' in args.models:
+        quantize_recognition(args.mode, images)
+
+    print("\nSet USE_INT8_DETECTOR / USE_INT8_RECOGNITION = True di config.py untuk memakainya")
+    print("Bandingkan akurasi & latency: python 03_benchmark.py quant")
+
+
+if __name__ == "__main__":
+    main()
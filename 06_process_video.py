@@ -0,0 +1,59 @@
+"""
+06 - Process Video
+Script untuk memproses rekaman pintu masuk (DVR) secara offline
+Presensi dicatat dengan waktu dari rekaman, bukan waktu saat diproses
+Jalankan: python 06_process_video.py rekaman1.mp4 rekaman2.mp4 [--start "2025-01-05 07:00:00"]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import config
+from attendance_manager import AttendanceManager
+from video_processor import VideoBatchProcessor, video_start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proses rekaman video menjadi data presensi")
+    parser.add_argument('videos', nargs='+', help="File video rekaman")
+    parser.add_argument('--start', default=None,
+                        help="Waktu mulai rekaman 'YYYY-MM-DD HH:MM:SS' (default: waktu file - durasi)")
+    parser.add_argument('--workers', type=int, default=config.OFFLINE_WORKERS,
+                        help="Jumlah proses paralel (0 = semua core CPU)")
+    parser.add_argument('--fps', type=float, default=config.OFFLINE_PROCESS_FPS,
+                        help="Frame per detik video yang dianalisis")
+    parser.add_argument('--segment', type=float, default=config.OFFLINE_SEGMENT_SECONDS,
+                        help="Panjang segmen per task (detik)")
+    parser.add_argument('--attendance-file', default=config.ATTENDANCE_FILE, help="File CSV presensi")
+    parser.add_argument('--no-supabase', action='store_true', help="Hanya simpan ke CSV")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S") if args.start else None
+    if start is not None and len(args.videos) > 1:
+        print("⚠ --start dipakai untuk semua video; pastikan ini memang yang diinginkan")
+
+    processor = VideoBatchProcessor(workers=args.workers, segment_seconds=args.segment, process_fps=args.fps)
+    results = processor.process(args.videos)
+
+    stats = processor.stats
+    print(f"\n✓ {stats['video_seconds'] / 60:.1f} menit video diproses dalam {stats['elapsed_seconds']:.0f}s "
+          f"({stats['realtime_factor']:.1f}x realtime, {stats['frames_processed']} frame dianalisis)\n")
+
+    # Urutkan semua kehadiran berdasarkan waktu supaya cooldown presensi berlaku benar
+    records = []
+    for video_path, persons in results.items():
+        base_time = video_start_time(video_path, processor.infos[video_path]['duration'], start)
+        for name, person in persons.items():
+            records.append((base_time + timedelta(seconds=person['first_seen']), name, person['confidence']))
+    records.sort()
+
+    attendance_manager = AttendanceManager(use_supabase=not args.no_supabase, attendance_file=args.attendance_file)
+    marked = 0
+    for timestamp, name, confidence in records:
+        if attendance_manager.mark_attendance(name, confidence, timestamp=timestamp):
+            marked += 1
+
+    print(f"\n✓ {marked} presensi tercatat dari {len(records)} kehadiran di rekaman")
+
+
+if __name__ == "__main__":
+    main()
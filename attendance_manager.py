@@ -7,6 +7,7 @@ import csv
 import os
 from datetime import datetime, timedelta
 import config
+from metrics import metrics
 
 # Import Supabase manager (optional, jika tidak ada akan skip)
 try:
@@ -19,8 +20,8 @@ except ImportError:
 class AttendanceManager:
     """Class untuk mengelola presensi"""
     
-    def __init__(self, use_supabase=True):
-        self.attendance_file = config.ATTENDANCE_FILE
+    def __init__(self, use_supabase=True, attendance_file=config.ATTENDANCE_FILE):
+        self.attendance_file = attendance_file
         self.cooldown = config.ATTENDANCE_COOLDOWN
         self.last_attendance = {}  # {name: timestamp}
         self._initialize_file()
@@ -43,18 +44,21 @@ class AttendanceManager:
                 writer = csv.writer(f)
                 writer.writerow(['Nama', 'Tanggal', 'Waktu', 'Confidence'])
     
-    def mark_attendance(self, name, confidence):
+    @metrics.timed('mark_attendance')
+    def mark_attendance(self, name, confidence, timestamp=None):
         """
         Tandai kehadiran seseorang (simpan ke CSV + Supabase)
         
         Args:
             name: Nama orang
             confidence: Confidence score (0-1)
+            timestamp: Waktu kehadiran (datetime), default sekarang.
+                       Dipakai proses video offline (waktu dari rekaman)
             
         Returns:
             True jika berhasil ditandai, False jika masih dalam cooldown
         """
-        now = datetime.now()
+        now = timestamp or datetime.now()
         
         # Cek cooldown
         if name in self.last_attendance:
@@ -73,6 +77,7 @@ class AttendanceManager:
             writer.writerow([name, date_str, time_str, f"{confidence:.3f}"])
         
         self.last_attendance[name] = now
+        metrics.increment('attendance_marked')
         print(f"✓ Presensi tercatat (CSV): {name} pada {time_str}")
         
         # Simpan ke Supabase jika tersedia
@@ -0,0 +1,277 @@
+"""
+Camera Stream
+Modul sumber kamera untuk sistem multi-kamera
+Setiap kamera (index USB, file video, atau URL RTSP) punya thread capture
+sendiri; CameraScheduler memilih frame dari semua kamera untuk diproses
+bersama oleh satu worker inference (detector & recognizer dipakai bersama).
+Frame ditulis langsung ke ring buffer shared memory (SharedFrameRing), jadi
+inference selalu mendapat frame terbaru tanpa copy. Setiap frame membawa seq
+dan waktu capture (time.monotonic) untuk mengukur latency glass-to-decision.
+"""
+
+import os
+import time
+from threading import Condition, Thread
+import cv2
+import numpy as np
+import config
+from frame_ring import SharedFrameRing
+from metrics import RollingHistogram, metrics
+from tracing import frame_id, tracer
+
+
+class CameraStream:
+    """Class untuk satu sumber kamera dengan thread capture sendiri"""
+
+    def __init__(self, camera_id, source, name=None):
+        self.camera_id = camera_id
+        self.source = source
+        self.name = name or f"Kamera {camera_id + 1}"
+        self.is_file = isinstance(source, str) and os.path.isfile(source)
+
+        self.ring = None  # Ring frame shared memory, dibuat saat frame pertama (ukuran frame diketahui)
+        self.last_seq = None  # Seq frame terakhir yang masuk ring (None jika frame terakhir dibuang)
+        self.cap = None
+        self.thread = None
+        self.stopped = False
+        self.on_capture = None  # Callback setiap frame diterima (mis. AdaptiveFrameSkip.record_capture)
+        self.frame_condition = None  # Condition CameraScheduler, di-notify setiap frame baru masuk ring
+
+        # Statistik FPS (dihitung ulang setiap window 1 detik)
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.capture_fps = 0.0
+        self.processed_fps = 0.0
+        self.last_processed = 0.0  # Waktu terakhir frame kamera ini diproses
+        self.decision_latency = RollingHistogram()  # Detik dari capture frame sampai hasil recognition
+        self._fps_window_start = time.monotonic()
+        self._window_captured = 0
+        self._window_processed = 0
+
+    def open(self):
+        """Buka sumber kamera, return True jika berhasil"""
+        self.cap = cv2.VideoCapture(self.source)
+        if isinstance(self.source, int):
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.FRAME_WIDTH)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.FRAME_HEIGHT)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer lag
+        return self.cap.isOpened()
+
+    def start(self):
+        """Mulai thread capture"""
+        self.thread = Thread(target=self._capture_frames, name=f"capture-{self.camera_id}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped = True
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        if self.cap is not None:
+            self.cap.release()
+        if self.ring is not None:
+            self.ring.close()
+
+    def _capture_frames(self):
+        """Thread capture; file video diputar berulang dengan kecepatan aslinya (pengganti kamera)"""
+        interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or config.FPS) if self.is_file else 0.0
+        next_frame = time.monotonic()
+
+        while not self.stopped:
+            if self.is_file:
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame = max(next_frame + interval, time.monotonic() - interval)
+
+            with metrics.timer('capture'), tracer.span('capture', flow='s', camera=self.camera_id) as span:
+                ok = self._read_into_ring()
+                if ok and self.last_seq is not None:
+                    span.set(frames=(frame_id(self.camera_id, self.last_seq),), seq=self.last_seq)
+            if not ok:
+                self._handle_read_failure()
+                continue
+
+            metrics.increment('frames_captured')
+            self.frames_captured += 1
+            self._window_captured += 1
+            if self.on_capture is not None:
+                self.on_capture()
+            if self.frame_condition is not None and self.last_seq is not None:
+                with self.frame_condition:
+                    self.frame_condition.notify_all()
+
+    def _read_into_ring(self):
+        """Decode frame langsung ke slot ring, return False jika read gagal"""
+        if self.ring is None:
+            ret, frame = self.cap.read()
+            if not ret:
+                return False
+            self.ring = SharedFrameRing(frame.shape)
+            self.last_seq = self.ring.write(frame, time.monotonic())
+            return True
+
+        acquired = self.ring.acquire()
+        if acquired is None:
+            # Semua slot sedang diproses: buang frame ini, stream tetap dibaca
+            self.last_seq = None
+            tracer.instant('ring_full', camera=self.camera_id)
+            return self.cap.grab()
+
+        slot, buffer = acquired
+        ret, frame = self.cap.read(buffer)
+        if not ret:
+            self.ring.cancel(slot)
+            return False
+
+        if frame is not buffer:
+            # Decoder mengalokasi ulang (mis. resolusi RTSP berubah setelah reconnect)
+            if frame.shape == buffer.shape:
+                np.copyto(buffer, frame)
+            else:
+                cv2.resize(frame, (buffer.shape[1], buffer.shape[0]), dst=buffer)
+        self.last_seq = self.ring.publish(slot, time.monotonic())
+        return True
+
+    def _handle_read_failure(self):
+        """File video: ulang dari awal; kamera/RTSP: sambung ulang setelah jeda"""
+        if self.is_file:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return
+
+        time.sleep(1.0)
+        if self.stopped:
+            return
+        print(f"⚠ {self.name}: gagal membaca frame, menyambung ulang...")
+        self.cap.release()
+        self.open()
+
+    def get_frame(self):
+        """
+        Ambil frame terbaru tanpa menunggu (frame lebih lama yang belum diambil dilewati)
+
+        Returns:
+            (frame, seq, waktu capture) atau None. Frame adalah view ring;
+            panggil release(frame) setelah selesai dipakai (termasuk ditampilkan)
+        """
+        if self.ring is None:
+            return None
+        return self.ring.latest()
+
+    def release(self, frame):
+        """Kembalikan slot frame dari get_frame() ke ring"""
+        if self.ring is not None:
+            self.ring.release(frame)
+
+    def pending(self):
+        """Jumlah frame yang menunggu diproses (0 atau 1, hanya frame terbaru yang dipakai)"""
+        return self.ring.pending() if self.ring is not None else 0
+
+    def record_processed(self, captured_at=None):
+        """
+        Dipanggil worker inference setiap frame kamera ini selesai diproses
+
+        Args:
+            captured_at: Waktu capture frame (dari get_frame()) untuk latency glass-to-decision
+        """
+        self.frames_processed += 1
+        self._window_processed += 1
+        self.last_processed = time.monotonic()
+        if captured_at is not None:
+            latency = self.last_processed - captured_at
+            self.decision_latency.observe(latency)
+            metrics.observe('glass_to_decision', latency)
+
+    def update_fps(self):
+        """Hitung ulang FPS capture & proses jika window 1 detik sudah lewat"""
+        now = time.monotonic()
+        elapsed = now - self._fps_window_start
+        if elapsed >= 1.0:
+            self.capture_fps = self._window_captured / elapsed
+            self.processed_fps = self._window_processed / elapsed
+            self._window_captured = 0
+            self._window_processed = 0
+            self._fps_window_start = now
+
+    def get_stats(self):
+        """Statistik kamera"""
+        latency = self.decision_latency.snapshot()['quantiles']
+        return {
+            'name': self.name,
+            'capture_fps': self.capture_fps,
+            'processed_fps': self.processed_fps,
+            'frames_captured': self.frames_captured,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.ring.frames_dropped() if self.ring is not None else 0,
+            'latency_p50_ms': latency[0.5] * 1000,
+            'latency_p95_ms': latency[0.95] * 1000
+        }
+
+
+class CameraScheduler:
+    """
+    Class untuk memilih frame dari beberapa kamera untuk satu batch inference
+
+    Policy:
+    - round_robin: kamera dilayani bergiliran, maksimal satu frame per kamera per batch
+    - load: kamera dengan antrean terpanjang / paling lama tidak diproses didahulukan
+
+    Thread inference menunggu frame baru lewat wait_batch() (Condition yang
+    di-notify thread capture), bukan polling.
+    """
+
+    def __init__(self, cameras, policy=config.CAMERA_SCHEDULING, batch_size=config.INFERENCE_BATCH_SIZE):
+        if policy not in ("round_robin", "load"):
+            raise ValueError(f"Policy scheduling tidak dikenal: {policy}")
+        self.cameras = cameras
+        self.policy = policy
+        self.batch_size = batch_size or len(cameras)
+        self.next_index = 0
+        self.condition = Condition()
+        self.closed = False
+        for camera in cameras:
+            camera.frame_condition = self.condition
+
+    def _ordered_cameras(self):
+        if self.policy == "load":
+            return sorted(self.cameras, key=lambda camera: (-camera.pending(), camera.last_processed))
+
+        order = self.cameras[self.next_index:] + self.cameras[:self.next_index]
+        self.next_index = (self.next_index + 1) % len(self.cameras)
+        return order
+
+    def next_batch(self):
+        """
+        Ambil batch frame berikutnya
+
+        Returns:
+            List of (camera, frame, seq, waktu capture); kosong jika belum ada frame baru
+        """
+        batch = []
+        for camera in self._ordered_cameras():
+            if len(batch) >= self.batch_size:
+                break
+            item = camera.get_frame()
+            if item is not None:
+                batch.append((camera,) + item)
+        return batch
+
+    def wait_batch(self, timeout=None):
+        """
+        Seperti next_batch(), tetapi tidur sampai ada frame baru dari kamera mana pun
+
+        Returns:
+            Batch frame; kosong jika timeout atau close()
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.closed or any(camera.pending() for camera in self.cameras), timeout
+            )
+            if self.closed:
+                return []
+            return self.next_batch()
+
+    def close(self):
+        """Bangunkan thread yang menunggu di wait_batch() untuk berhenti"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
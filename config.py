@@ -4,15 +4,57 @@ Konfigurasi untuk Sistem Presensi GKI Karawaci
 
 # Pengaturan Kamera
 CAMERA_INDEX = 0
+CAMERA_SOURCES = [CAMERA_INDEX]  # Satu atau lebih kamera: index USB, file video, atau URL RTSP, mis. [0, "rtsp://192.168.1.20/stream"]
+CAMERA_SCHEDULING = "round_robin"  # round_robin (bergiliran) atau load (kamera dengan antrean terpanjang didahulukan)
+INFERENCE_BATCH_SIZE = 0  # Frame maksimum per batch inference lintas kamera (0 = jumlah kamera)
 FRAME_WIDTH = 1280
 FRAME_HEIGHT = 720
 FPS = 30
+FRAME_RING_SLOTS = 8  # Slot ring buffer shared memory per kamera (frame yang sedang diproses + cadangan)
 
 # Pengaturan Deteksi Wajah (YOLO)
 YOLO_MODEL = "yolov8n-face.pt"  # yolov8n-face = nano (paling ringan), yolov8s-face = small
+DETECTOR_BACKEND = "ultralytics"  # ultralytics (torch) atau onnx (ONNX Runtime, tanpa torch)
+YOLO_ONNX_MODEL = "yolov8n-face.onnx"  # Hasil export: python 04_export_onnx.py
+YOLO_ONNX_INT8_MODEL = "yolov8n-face.int8.onnx"  # Hasil kuantisasi: python 05_quantize_models.py
+USE_INT8_DETECTOR = False  # Pakai model YOLO INT8 (hanya backend onnx)
 FACE_DETECTION_THRESHOLD = 0.5  # Confidence threshold untuk deteksi YOLO
+DETECTION_SIZE = 640  # Sisi terpanjang frame untuk YOLO (kelipatan 32), box dikembalikan ke resolusi penuh
+DETECTION_SIZE_LEVELS = [640, 480, 320]  # Resolusi deteksi yang boleh dipilih frame skip otomatis (besar ke kecil)
 FACE_RECOGNITION_THRESHOLD = 0.42  # Cosine similarity threshold untuk ArcFace (0-1, semakin tinggi semakin strict)
 MIN_FACE_SIZE = (50, 50)  # Ukuran minimum wajah yang dideteksi
+TRACK_IOU_THRESHOLD = 0.3  # IoU minimum untuk menyambung deteksi ke track yang sama
+TRACK_TIMEOUT = 3  # Detik tanpa deteksi sebelum track dihapus
+IDENTITY_CONFIRM_COUNT = 2  # Recognition berturut-turut dengan nama sama sebelum identitas track di-cache
+IDENTITY_REVERIFY_INTERVAL = 15  # Verifikasi ulang identitas track setiap N frame diproses
+IDENTITY_MIN_IOU = 0.5  # Verifikasi ulang jika box bergeser tajam dari verifikasi terakhir
+IDENTITY_REVOKE_COUNT = 2  # Verifikasi ulang "Unknown" berturut-turut sebelum identitas track dicabut
+
+# Pengaturan Motion Gating (lewati YOLO saat koridor kosong/diam)
+MOTION_GATING = True  # Jalankan YOLO hanya jika ada gerakan / masih ada wajah di-track
+MOTION_GATE_WIDTH = 160  # Lebar frame kecil untuk frame differencing
+MOTION_PIXEL_THRESHOLD = 25  # Selisih intensitas minimum per pixel
+MOTION_MIN_AREA = 0.005  # Fraksi pixel berubah minimum (0.5%)
+MOTION_REFRESH_INTERVAL = 1.0  # Detik maksimum tanpa YOLO (refresh paksa)
+
+# Pengaturan Frame Skip Otomatis
+ADAPTIVE_FRAME_SKIP = True  # Atur frame skip otomatis dari latency terukur (tanpa tombol +/-)
+TARGET_PROCESSING_FPS = 10  # Target frame yang diproses per detik
+LATENCY_BUDGET_MS = 150  # Budget latency deteksi + recognition per frame
+MAX_FRAME_SKIP = 5  # Frame skip maksimum
+FRAME_SKIP_CONTROL_INTERVAL = 2.0  # Detik antar keputusan controller
+
+# Pengaturan Mode Pipeline (thread atau proses worker)
+PIPELINE_MODE = "thread"  # thread (satu proses) atau process (deteksi & recognition di proses worker terpisah)
+WORKER_QUEUE_SIZE = 2  # Ukuran queue antar tahap / ke proses worker
+WORKER_NUM_THREADS = 0  # Thread inference per worker (0 = core CPU dibagi rata ke 2 worker)
+WORKER_START_TIMEOUT = 120  # Batas waktu worker selesai load model (detik)
+WORKER_CALL_TIMEOUT = 10  # Worker dianggap hang & di-restart jika satu panggilan melebihi ini (detik)
+
+# Pengaturan Proses Video Offline (rekaman DVR, python 06_process_video.py)
+OFFLINE_PROCESS_FPS = 5  # Frame per detik video yang dianalisis
+OFFLINE_WORKERS = 0  # Jumlah proses paralel (0 = semua core CPU)
+OFFLINE_SEGMENT_SECONDS = 120  # Panjang segmen video per task (detik)
 
 # Pengaturan Pengambilan Data Wajah Baru
 FRAMES_TO_CAPTURE = 5  # Jumlah frame untuk wajah tidak dikenali
@@ -21,16 +63,27 @@ MIN_FRAMES_FOR_TRAINING = 1  # Minimum frame yang valid untuk training (minimal
 
 # Pengaturan Model
 ARCFACE_MODEL = "buffalo_sc"  # buffalo_sc (ringan), buffalo_l (akurat)
+ARCFACE_INT8_MODEL = "arcface_rec.int8.onnx"  # Model recognition INT8 di DATA_DIR (python 05_quantize_models.py)
+USE_INT8_RECOGNITION = False  # Pakai model recognition INT8 (lebih cepat di ARM, cek akurasi dengan 03_benchmark.py quant)
 USE_GPU = False  # Set True jika ada GPU CUDA
 EMBEDDING_SIZE = 512  # Ukuran embedding ArcFace
+FACE_INDEX_TYPE = "exact"  # exact (brute force) atau ivf (aproksimasi k-means, untuk galeri puluhan ribu wajah)
+IVF_NLIST = 0  # Jumlah cluster IVF (0 = otomatis ~sqrt(jumlah embedding))
+IVF_NPROBE = 8  # Jumlah cluster yang diperiksa per query (lebih besar = recall lebih tinggi, lebih lambat)
+USE_EMBEDDING_CACHE = True  # Retrain hanya encode gambar baru/berubah
+ENCODE_WORKERS = 1  # Jumlah proses saat retrain (1 = tanpa paralel, 0 = semua core CPU)
+USE_LANDMARK_ALIGNMENT = True  # Align wajah dari keypoint YOLO langsung ke model recognition (tanpa deteksi ulang InsightFace)
 
 # Path File
 DATA_DIR = "data"
 FACES_DIR = f"{DATA_DIR}/faces"
 UNKNOWN_DIR = f"{DATA_DIR}/unknown"
-MODEL_FILE = f"{DATA_DIR}/face_encodings.pkl"
+MODEL_FILE = f"{DATA_DIR}/face_encodings.npy"  # Galeri embedding (memmap) + .labels.npy + .json header
+LEGACY_MODEL_FILE = f"{DATA_DIR}/face_encodings.pkl"  # Format pickle lama, di-import otomatis
+EMBEDDING_CACHE_FILE = f"{DATA_DIR}/embedding_cache.pkl"  # Cache embedding per gambar untuk retrain inkremental
 ATTENDANCE_FILE = f"{DATA_DIR}/attendance.csv"
 LOG_FILE = f"{DATA_DIR}/system.log"
+TRACE_FILE = f"{DATA_DIR}/trace.json"  # Output default 01_main_system.py --trace
 
 # Pengaturan Presensi
 ATTENDANCE_COOLDOWN = 3600  # Cooldown dalam detik (1 jam) sebelum bisa absen lagi
@@ -43,3 +96,21 @@ BOX_COLOR_KNOWN = (0, 255, 0)  # Hijau untuk wajah dikenali
 BOX_COLOR_UNKNOWN = (0, 0, 255)  # Merah untuk wajah tidak dikenali
 BOX_COLOR_CAPTURING = (255, 165, 0)  # Orange untuk sedang capture
 TEXT_COLOR = (255, 255, 255)
+
+# Pengaturan Mode Headless & Preview (kiosk tanpa layar)
+HEADLESS = False  # True: tanpa window OpenCV; frame hanya digambar jika ada yang menonton preview
+PREVIEW_PORT = 0  # Port HTTP preview MJPEG + endpoint kontrol (0 = nonaktif), mis. 8080
+PREVIEW_HOST = "127.0.0.1"  # Hanya dari perangkat ini; "0.0.0.0" agar bisa dibuka dari jaringan lokal
+PREVIEW_FPS = 5  # FPS maksimum preview
+PREVIEW_WIDTH = 640  # Lebar frame preview (diperkecil sebelum encode JPEG)
+PREVIEW_JPEG_QUALITY = 70
+
+# Pengaturan Metrics (latency per tahap untuk mencari bottleneck)
+METRICS_ENABLED = True  # False: timer menjadi no-op
+METRICS_WINDOW = 1024  # Jumlah sampel terakhir per tahap untuk persentil p50/p95/p99
+METRICS_PORT = 0  # Port HTTP /metrics format Prometheus (0 = nonaktif), mis. 9108
+METRICS_HOST = "127.0.0.1"
+METRICS_LOG_INTERVAL = 60  # Detik antar baris log [Metrics] (0 = nonaktif)
+
+# Pengaturan Tracing (01_main_system.py --trace)
+TRACE_BUFFER_EVENTS = 200000  # Event terakhir yang disimpan di memori (event lama dibuang)
@@ -0,0 +1,119 @@
+"""
+Embedding Cache
+Modul cache embedding per gambar untuk retrain inkremental
+Key: path gambar, divalidasi dengan ukuran file + mtime
+Cache otomatis tidak berlaku jika model ArcFace atau versi preprocessing berubah
+"""
+
+import os
+import pickle
+import config
+
+# Naikkan jika preprocessing gambar training di ArcFaceEncoder berubah
+# (padding, resize, konversi warna) supaya semua embedding dihitung ulang
+PREPROCESS_VERSION = 1
+
+CACHE_FORMAT_VERSION = 1
+
+
+class EmbeddingCache:
+    """Class untuk menyimpan embedding per gambar antar retrain"""
+
+    def __init__(self, filepath=config.EMBEDDING_CACHE_FILE):
+        self.filepath = filepath
+        # Embedding model INT8 sedikit berbeda dari FP32 -> cache terpisah
+        self.model_name = config.ARCFACE_MODEL + (":int8" if config.USE_INT8_RECOGNITION else "")
+        self.entries = {}  # {path: (size, mtime_ns, embedding atau None)}
+
+        # Statistik retrain terakhir
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+
+    def _header(self):
+        return {
+            'format': CACHE_FORMAT_VERSION,
+            'model': self.model_name,
+            'preprocess': PREPROCESS_VERSION
+        }
+
+    def load(self):
+        """
+        Load cache dari file; diabaikan jika model/preprocessing berbeda
+
+        Returns:
+            Jumlah entry yang valid
+        """
+        self.entries = {}
+        if not os.path.exists(self.filepath):
+            return 0
+
+        try:
+            with open(self.filepath, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"⚠ Cache embedding rusak, diabaikan: {e}")
+            return 0
+
+        if data.get('header') != self._header():
+            print("⚠ Cache embedding dibuat dengan model/preprocessing lain, encode ulang semua")
+            return 0
+
+        self.entries = data['entries']
+        return len(self.entries)
+
+    def save(self):
+        """Simpan cache ke file"""
+        data = {
+            'header': self._header(),
+            'entries': self.entries
+        }
+
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f)
+        os.replace(tmp_path, self.filepath)
+
+    @staticmethod
+    def _file_key(image_path):
+        stat = os.stat(image_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def lookup(self, image_path):
+        """
+        Cari embedding untuk gambar
+
+        Returns:
+            (found, embedding) - embedding bisa None jika sebelumnya tidak ada wajah
+        """
+        image_path = str(image_path)
+        entry = self.entries.get(image_path)
+        if entry is not None and entry[:2] == self._file_key(image_path):
+            self.hits += 1
+            return True, entry[2]
+
+        self.misses += 1
+        return False, None
+
+    def store(self, image_path, embedding):
+        """Simpan embedding (atau None jika gagal) untuk gambar"""
+        image_path = str(image_path)
+        size, mtime_ns = self._file_key(image_path)
+        self.entries[image_path] = (size, mtime_ns, embedding)
+
+    def prune(self, seen_paths):
+        """
+        Hapus entry untuk gambar yang sudah tidak ada di dataset
+
+        Args:
+            seen_paths: Iterable path gambar yang ada saat ini
+
+        Returns:
+            Jumlah entry yang dihapus
+        """
+        seen = {str(path) for path in seen_paths}
+        stale = [path for path in self.entries if path not in seen]
+        for path in stale:
+            del self.entries[path]
+        self.removed = len(stale)
+        return self.removed
@@ -0,0 +1,148 @@
+"""
+Embedding Store
+Format file galeri embedding (pengganti pickle face_encodings.pkl)
+
+    face_encodings.npy         Matriks float32 (N, D), sudah L2-normalized dan
+                               diurutkan per orang -> bisa langsung np.memmap
+    face_encodings.labels.npy  Index orang (int32) per baris matriks
+    face_encodings.json        Header: versi format, fingerprint model,
+                               dimensi, jumlah baris, tabel nama orang
+
+Load cukup membuka memmap (O(1), tanpa copy), sehingga beberapa proses
+worker berbagi halaman memori yang sama lewat page cache OS.
+"""
+
+import json
+import os
+import pickle
+import uuid
+import numpy as np
+import config
+from embedding_cache import PREPROCESS_VERSION
+from face_matcher import FaceMatcher
+
+STORE_FORMAT_VERSION = 1
+
+
+def model_fingerprint():
+    """Fingerprint model yang menghasilkan embedding (model + presisi + versi preprocessing)"""
+    # Embedding model INT8 sedikit berbeda dari FP32 -> galeri harus di-train ulang
+    model_name = config.ARCFACE_MODEL + (":int8" if config.USE_INT8_RECOGNITION else "")
+    return f"{model_name}:preprocess-{PREPROCESS_VERSION}"
+
+
+class EmbeddingStore:
+    """Class untuk menyimpan dan memuat galeri embedding dalam format memmap"""
+
+    def __init__(self, filepath=config.MODEL_FILE):
+        base = os.path.splitext(filepath)[0]
+        self.matrix_path = base + ".npy"
+        self.labels_path = base + ".labels.npy"
+        self.header_path = base + ".json"
+
+        self.header = None
+        self.matrix = np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.int32)
+        self.person_names = []
+
+    def exists(self):
+        """Cek apakah file store lengkap"""
+        return all(os.path.exists(path) for path in (self.matrix_path, self.labels_path, self.header_path))
+
+    @staticmethod
+    def _save_array(filepath, array):
+        tmp_path = filepath + ".tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, filepath)
+
+    def save(self, embeddings, names):
+        """
+        Simpan embedding dan nama ke store
+
+        Args:
+            embeddings: List/array embedding (N, D)
+            names: List nama sepanjang N
+        """
+        # FaceMatcher menormalisasi dan mengurutkan baris per orang
+        matcher = FaceMatcher()
+        matcher.build(embeddings, names)
+
+        self._save_array(self.matrix_path, matcher.matrix)
+        self._save_array(self.labels_path, matcher.labels.astype(np.int32))
+
+        # Header ditulis terakhir: store baru dianggap valid setelah header ada
+        header = {
+            'format': STORE_FORMAT_VERSION,
+            'model': model_fingerprint(),
+            'dimension': int(matcher.matrix.shape[1]),
+            'count': int(matcher.matrix.shape[0]),
+            'normalized': True,
+            'gallery_id': uuid.uuid4().hex,  # Berubah setiap save, dipakai untuk validasi index
+            'names': matcher.person_names
+        }
+        tmp_path = self.header_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(header, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.header_path)
+
+        self.header = header
+        self.matrix = matcher.matrix
+        self.labels = matcher.labels
+        self.person_names = matcher.person_names
+
+    def load(self, mmap=True):
+        """
+        Load store (memmap, tanpa membaca seluruh matriks)
+
+        Returns:
+            True jika berhasil
+        """
+        if not self.exists():
+            return False
+
+        with open(self.header_path, "r") as f:
+            header = json.load(f)
+
+        if header.get('format') != STORE_FORMAT_VERSION:
+            print(f"⚠ Format {self.header_path} tidak dikenal: {header.get('format')}")
+            return False
+
+        if header.get('model') != model_fingerprint():
+            print(f"⚠ Galeri dibuat dengan model {header.get('model')}, "
+                  f"sekarang {model_fingerprint()}. Jalankan retrain.")
+            return False
+
+        mmap_mode = 'r' if mmap else None
+        matrix = np.load(self.matrix_path, mmap_mode=mmap_mode)
+        labels = np.load(self.labels_path, mmap_mode=mmap_mode)
+
+        if matrix.shape != (header['count'], header['dimension']) or len(labels) != header['count']:
+            print(f"⚠ Ukuran {self.matrix_path} tidak cocok dengan header")
+            return False
+
+        self.header = header
+        self.matrix = matrix
+        self.labels = labels
+        self.person_names = header['names']
+        return True
+
+    def names(self):
+        """Nama per baris matriks (array object, sejajar dengan self.matrix)"""
+        return np.asarray(self.person_names, dtype=object)[self.labels]
+
+    def import_legacy(self, pickle_path=config.LEGACY_MODEL_FILE):
+        """
+        Import file pickle lama ({"embeddings": [...], "names": [...]}) ke store
+
+        Returns:
+            True jika berhasil
+        """
+        if not os.path.exists(pickle_path):
+            return False
+
+        with open(pickle_path, "rb") as f:
+            data = pickle.load(f)
+
+        self.save(data["embeddings"], data["names"])
+        print(f"✓ Import {len(data['names'])} embedding dari {pickle_path} ke {self.matrix_path}")
+        return True
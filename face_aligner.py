@@ -0,0 +1,73 @@
+"""
+Face Aligner
+Modul untuk alignment wajah 5 titik (similarity transform) ke 112x112
+Template landmark sama dengan yang dipakai model ArcFace InsightFace
+"""
+
+import cv2
+import numpy as np
+
+# Posisi 5 landmark (mata kiri, mata kanan, hidung, mulut kiri, mulut kanan)
+# pada gambar 112x112 yang dipakai saat training ArcFace
+ARCFACE_TEMPLATE = np.array([
+    [38.2946, 51.6963],
+    [73.5318, 51.5014],
+    [56.0252, 71.7366],
+    [41.5493, 92.3655],
+    [70.7299, 92.2041]
+], dtype=np.float32)
+
+ALIGNED_SIZE = 112
+
+
+def estimate_similarity_transform(landmarks, image_size=ALIGNED_SIZE):
+    """
+    Hitung matriks similarity transform (Umeyama) dari landmark ke template ArcFace
+
+    Args:
+        landmarks: Array (5, 2) koordinat landmark di frame
+        image_size: Ukuran output (kelipatan 112)
+
+    Returns:
+        Matriks affine 2x3 (float32)
+    """
+    src = np.asarray(landmarks, dtype=np.float64).reshape(5, 2)
+    dst = ARCFACE_TEMPLATE.astype(np.float64) * (image_size / float(ALIGNED_SIZE))
+
+    src_mean = src.mean(axis=0)
+    dst_mean = dst.mean(axis=0)
+    src_demean = src - src_mean
+    dst_demean = dst - dst_mean
+
+    # Kovarians dan SVD (Umeyama 1991)
+    cov = dst_demean.T @ src_demean / len(src)
+    U, S, Vt = np.linalg.svd(cov)
+
+    d = np.ones(2)
+    if np.linalg.det(cov) < 0:
+        d[1] = -1
+
+    rotation = U @ np.diag(d) @ Vt
+    src_var = src_demean.var(axis=0).sum()
+    scale = (S * d).sum() / src_var if src_var > 0 else 1.0
+
+    matrix = np.zeros((2, 3), dtype=np.float64)
+    matrix[:, :2] = scale * rotation
+    matrix[:, 2] = dst_mean - scale * rotation @ src_mean
+    return matrix.astype(np.float32)
+
+
+def align_face(image, landmarks, image_size=ALIGNED_SIZE):
+    """
+    Crop dan align wajah langsung dari frame berdasarkan 5 landmark
+
+    Args:
+        image: Frame (BGR/RGB) ukuran penuh
+        landmarks: Array (5, 2) koordinat landmark di frame
+        image_size: Ukuran output persegi
+
+    Returns:
+        Gambar wajah ter-align (image_size x image_size x 3)
+    """
+    matrix = estimate_similarity_transform(landmarks, image_size)
+    return cv2.warpAffine(image, matrix, (image_size, image_size), borderValue=0.0)
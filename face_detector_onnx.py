@@ -0,0 +1,175 @@
+"""
+ONNX Face Detector
+Modul inference YOLOv8-face lewat ONNX Runtime tanpa torch/ultralytics
+Pre-processing (letterbox) dan post-processing (decode + NMS) memakai NumPy
+sehingga startup jauh lebih cepat dan RSS lebih kecil di Raspberry Pi.
+Model dibuat dengan: python 04_export_onnx.py
+"""
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+from face_tracker import iou_matrix
+
+
+def nms(boxes, scores, iou_threshold=0.5):
+    """
+    Non-maximum suppression
+
+    Matriks IoU semua pasangan dihitung sekali (tervektorisasi), lalu box
+    diproses dari score tertinggi; setiap box yang dipilih menekan semua box
+    lain dengan IoU di atas threshold sekaligus.
+
+    Args:
+        boxes: Array (N, 4) format (x1, y1, x2, y2)
+        scores: Array (N,)
+        iou_threshold: IoU maksimum antar box yang dipertahankan
+
+    Returns:
+        Array index box yang dipertahankan (urut score menurun)
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(-scores, kind='stable')
+    overlaps = iou_matrix(boxes[order], boxes[order]) > iou_threshold
+
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(order[i])
+        suppressed |= overlaps[i]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+def letterbox(image, target_size):
+    """
+    Resize dengan rasio tetap lalu padding ke ukuran input model
+
+    Args:
+        image: Gambar BGR
+        target_size: (tinggi, lebar) input model
+
+    Returns:
+        (blob NCHW float32 RGB 0-1, ratio, (pad_x, pad_y))
+    """
+    target_h, target_w = target_size
+    height, width = image.shape[:2]
+    ratio = min(target_h / height, target_w / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (target_w - new_w) // 2
+    pad_y = (target_h - new_h) // 2
+    canvas = np.full((target_h, target_w, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+
+    # BGR -> RGB, HWC -> CHW, 0-1
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    return np.ascontiguousarray(blob), ratio, (pad_x, pad_y)
+
+
+class ONNXFaceDetector:
+    """Class untuk menjalankan model YOLOv8-face (.onnx) dengan ONNX Runtime"""
+
+    def __init__(self, model_path, iou_threshold=0.5, num_threads=None):
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Model di-export static -> ukuran input tetap; dynamic -> ikut imgsz
+        height, width = model_input.shape[2:4]
+        self.fixed_size = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.iou_threshold = iou_threshold
+
+    def input_size(self, imgsz):
+        """Ukuran (tinggi, lebar) input model untuk imgsz tertentu"""
+        return self.fixed_size or (imgsz, imgsz)
+
+    def _decode(self, output, image_shape, ratio, pad, conf_threshold):
+        """
+        Decode output satu gambar: filter confidence, NMS, kembalikan ke koordinat gambar
+
+        Args:
+            output: Array (4 + 1 + K, anchors)
+            image_shape: Shape gambar asli
+            ratio, pad: Hasil letterbox()
+        """
+        pad_x, pad_y = pad
+
+        # Output (4 + 1 + K, anchors) -> (anchors, 4 + 1 + K)
+        predictions = output.T
+        scores = predictions[:, 4]
+        candidates = scores >= conf_threshold
+        predictions = predictions[candidates]
+        scores = scores[candidates]
+
+        cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        keep = nms(boxes, scores, self.iou_threshold)
+        boxes = boxes[keep]
+        scores = scores[keep]
+
+        # Kembalikan dari koordinat letterbox ke koordinat gambar
+        offset = np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        boxes = (boxes - offset) / ratio
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, image_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, image_shape[0])
+
+        keypoints = None
+        num_kps_values = predictions.shape[1] - 5
+        if num_kps_values in (10, 15):
+            # yolov8-face: 5 keypoint (x, y, visibility)
+            keypoints = predictions[keep, 5:].reshape(len(keep), 5, -1)[:, :, :2]
+            keypoints = (keypoints - offset[:2]) / ratio
+
+        return boxes, scores, keypoints
+
+    def detect(self, image, conf_threshold=0.5, imgsz=640):
+        """
+        Deteksi wajah pada gambar
+
+        Args:
+            image: Gambar BGR
+            conf_threshold: Confidence minimum
+            imgsz: Ukuran input (diabaikan jika model static)
+
+        Returns:
+            (boxes (N, 4) x1y1x2y2, scores (N,), keypoints (N, 5, 2) atau None)
+            dalam koordinat gambar input
+        """
+        return self.detect_batch([image], conf_threshold, imgsz)[0]
+
+    def detect_batch(self, images, conf_threshold=0.5, imgsz=640):
+        """
+        Deteksi wajah pada beberapa gambar (mis. frame dari beberapa kamera)
+
+        Jika model di-export dengan batch dinamis, semua gambar di-letterbox ke
+        ukuran yang sama lalu dijalankan dengan satu kali inference.
+
+        Returns:
+            List (boxes, scores, keypoints) per gambar
+        """
+        size = self.input_size(imgsz)
+        prepared = [letterbox(image, size) for image in images]
+
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self.input_name: np.concatenate([p[0] for p in prepared])})[0]
+        else:
+            outputs = [self.session.run(None, {self.input_name: p[0]})[0][0] for p in prepared]
+
+        return [
+            self._decode(output, image.shape, ratio, pad, conf_threshold)
+            for output, image, (_, ratio, pad) in zip(outputs, images, prepared)
+        ]
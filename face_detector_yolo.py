@@ -2,22 +2,72 @@
 YOLO Face Detector
 Modul untuk deteksi wajah menggunakan YOLOv8
 Lebih ringan dan akurasi tinggi untuk Raspberry Pi
+Backend dipilih lewat config.DETECTOR_BACKEND:
+- "ultralytics": model .pt dengan torch
+- "onnx": model .onnx dengan ONNX Runtime (tanpa torch, startup lebih cepat)
 """
 
 import cv2
 import numpy as np
-import torch
-from ultralytics import YOLO
 import config
 import os
-
-# Fix untuk PyTorch 2.6+ weights_only issue
-torch.serialization.add_safe_globals(['ultralytics.nn.tasks.DetectionModel'])
+from metrics import metrics
 
 class YOLOFaceDetector:
     """Class untuk mendeteksi wajah menggunakan YOLO"""
     
-    def __init__(self):
+    def __init__(self, backend=None, num_threads=None):
+        self.backend = backend or config.DETECTOR_BACKEND
+        self.num_threads = num_threads  # Batasi thread inference (proses worker paralel)
+        self.conf_threshold = config.FACE_DETECTION_THRESHOLD
+        self.min_face_size = config.MIN_FACE_SIZE
+        self.fixed_input_size = None  # (tinggi, lebar) input model ONNX static
+        self.set_detection_size(config.DETECTION_SIZE)
+        
+        # Untuk tracking wajah antar frame
+        self.prev_faces = []
+        
+        if self.backend == "onnx":
+            self._load_onnx()
+        else:
+            self._load_ultralytics()
+    
+    def _load_onnx(self):
+        """Load model YOLO face .onnx dengan ONNX Runtime"""
+        from face_detector_onnx import ONNXFaceDetector
+        
+        model_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_MODEL)
+        int8_path = os.path.join(config.DATA_DIR, config.YOLO_ONNX_INT8_MODEL)
+        if config.USE_INT8_DETECTOR:
+            if os.path.exists(int8_path):
+                model_path = int8_path
+            else:
+                print(f"⚠ Model INT8 tidak ditemukan: {int8_path}, tetap pakai FP32")
+        
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"Model ONNX tidak ditemukan: {model_path} (jalankan: python 04_export_onnx.py)"
+            )
+        
+        self.model = ONNXFaceDetector(model_path, num_threads=self.num_threads)
+        self.use_person_class = False
+        print(f"✓ YOLO Face model loaded (ONNX Runtime, {os.path.basename(model_path)})")
+        
+        self.fixed_input_size = self.model.fixed_size
+        if self.fixed_input_size and max(self.fixed_input_size) != self.detection_size:
+            print(f"⚠ Model ONNX static {self.fixed_input_size[1]}x{self.fixed_input_size[0]}: "
+                  f"DETECTION_SIZE={self.detection_size} diabaikan, resolusi deteksi mengikuti input model")
+    
+    def _load_ultralytics(self):
+        """Load model YOLO face .pt dengan ultralytics (torch)"""
+        import torch
+        from ultralytics import YOLO
+        
+        # Fix untuk PyTorch 2.6+ weights_only issue
+        torch.serialization.add_safe_globals(['ultralytics.nn.tasks.DetectionModel'])
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        
         model_path = os.path.join(config.DATA_DIR, config.YOLO_MODEL)
         
         # Download model jika belum ada
@@ -40,12 +90,40 @@ class YOLOFaceDetector:
         self.use_person_class = False
         print("✓ YOLO Face model loaded")
         
-        self.conf_threshold = config.FACE_DETECTION_THRESHOLD
-        self.min_face_size = config.MIN_FACE_SIZE
+    def set_detection_size(self, size):
+        """
+        Atur resolusi deteksi (sisi terpanjang gambar input YOLO)
         
-        # Untuk tracking wajah antar frame
-        self.prev_faces = []
+        Args:
+            size: Ukuran dalam pixel, dibulatkan ke kelipatan 32 (stride YOLO)
+        """
+        self.detection_size = max(32, int(round(size / 32)) * 32)
+    
+    def _prepare_detection_frame(self, frame):
+        """
+        Perkecil frame ke resolusi deteksi
+        
+        Model ONNX static memakai ukuran input model, bukan detection_size:
+        frame langsung diperkecil pas ke ukuran letterbox sehingga tidak
+        diperkecil lalu diperbesar lagi (wajah kecil kehilangan detail).
+        
+        Returns:
+            (frame_kecil, scale) - koordinat hasil deteksi dibagi scale
+            untuk kembali ke resolusi penuh
+        """
+        height, width = frame.shape[:2]
+        if self.fixed_input_size:
+            target_h, target_w = self.fixed_input_size
+            scale = min(target_h / height, target_w / width)
+        else:
+            scale = self.detection_size / max(height, width)
+        if scale >= 1.0:
+            return frame, 1.0
         
+        small = cv2.resize(frame, (int(round(width * scale)), int(round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        return small, scale
+    
     def detect_faces(self, frame):
         """
         Deteksi wajah dalam frame menggunakan YOLO
@@ -56,33 +134,106 @@ class YOLOFaceDetector:
         Returns:
             List of face locations (top, right, bottom, left)
         """
-        # YOLO inference
-        results = self.model(frame, verbose=False, conf=self.conf_threshold)
+        face_locations, _ = self.detect_faces_with_landmarks(frame)
+        return face_locations
+    
+    def detect_faces_with_landmarks(self, frame):
+        """
+        Deteksi wajah beserta 5 keypoint wajah (mata, hidung, sudut mulut)
+        
+        Keypoint dari model yolov8-face dipakai untuk alignment langsung ke
+        model recognition ArcFace tanpa deteksi ulang oleh InsightFace.
+        
+        YOLO dijalankan pada frame yang diperkecil ke detection_size, lalu box
+        dan keypoint dikembalikan ke koordinat resolusi penuh supaya crop dan
+        alignment untuk recognition tetap memakai pixel asli.
+        
+        Args:
+            frame: Frame BGR dari OpenCV
+            
+        Returns:
+            (face_locations, landmarks) - landmarks adalah list array (5, 2)
+            sejajar dengan face_locations (elemen None jika model tidak punya keypoint)
+        """
+        return self.detect_faces_with_landmarks_batch([frame])[0]
+    
+    def detect_faces_with_landmarks_batch(self, frames):
+        """
+        Deteksi wajah pada beberapa frame sekaligus (mis. dari beberapa kamera)
+        
+        Semua frame diperkecil ke detection_size lalu dijalankan dalam satu
+        batch inference YOLO.
+        
+        Args:
+            frames: List frame BGR
+            
+        Returns:
+            List (face_locations, landmarks) per frame
+        """
+        with metrics.timer('detect'):
+            # YOLO inference pada resolusi deteksi
+            prepared = [self._prepare_detection_frame(frame) for frame in frames]
+            detections = self._infer([small for small, _ in prepared])
+            
+            results = [
+                self._to_face_locations(boxes, kps_xy, scale)
+                for (boxes, kps_xy), (_, scale) in zip(detections, prepared)
+            ]
+        metrics.increment('faces_detected', sum(len(locations) for locations, _ in results))
+        return results
+    
+    def _to_face_locations(self, boxes, kps_xy, scale):
+        """Kembalikan box & keypoint ke resolusi penuh lalu filter ukuran minimum"""
+        boxes = boxes / scale
+        if kps_xy is not None:
+            kps_xy = kps_xy / scale
         
         face_locations = []
+        landmarks = []
         
-        # Parse hasil deteksi
+        for idx, (x1, y1, x2, y2) in enumerate(boxes):
+            # Convert ke format (top, right, bottom, left)
+            top = int(y1)
+            right = int(x2)
+            bottom = int(y2)
+            left = int(x1)
+            
+            # Filter berdasarkan ukuran minimum
+            width = right - left
+            height = bottom - top
+            
+            if width >= self.min_face_size[0] and height >= self.min_face_size[1]:
+                face_locations.append((top, right, bottom, left))
+                landmarks.append(kps_xy[idx] if kps_xy is not None else None)
+        
+        return face_locations, landmarks
+    
+    def _infer(self, images):
+        """
+        Jalankan backend YOLO pada sekumpulan gambar
+        
+        Returns:
+            List (boxes (N, 4) x1y1x2y2, keypoints (N, 5, 2) atau None) per gambar,
+            dalam koordinat gambar masing-masing
+        """
+        if self.backend == "onnx":
+            return [
+                (boxes, kps_xy)
+                for boxes, _, kps_xy in self.model.detect_batch(images, self.conf_threshold, self.detection_size)
+            ]
+        
+        results = self.model(images, verbose=False, conf=self.conf_threshold, imgsz=self.detection_size)
+        
+        detections = []
         for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                # Get coordinates
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                conf = box.conf[0].cpu().numpy()
-                
-                # Convert ke format (top, right, bottom, left)
-                top = int(y1)
-                right = int(x2)
-                bottom = int(y2)
-                left = int(x1)
-                
-                # Filter berdasarkan ukuran minimum
-                width = right - left
-                height = bottom - top
-                
-                if width >= self.min_face_size[0] and height >= self.min_face_size[1]:
-                    face_locations.append((top, right, bottom, left))
+            boxes = result.boxes.xyxy.cpu().numpy()
+            keypoints = getattr(result, 'keypoints', None)
+            kps_xy = None
+            if keypoints is not None and keypoints.xy is not None and keypoints.xy.shape[1] == 5:
+                kps_xy = keypoints.xy.cpu().numpy()
+            detections.append((boxes, kps_xy))
         
-        return face_locations
+        return detections
     
     def get_face_images(self, frame, face_locations):
         """
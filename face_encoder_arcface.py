@@ -6,37 +6,109 @@ ArcFace lebih ringan dan akurat dibanding face_recognition
 
 import cv2
 import numpy as np
-import pickle
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import config
+from face_aligner import align_face
+from embedding_cache import EmbeddingCache
+from embedding_store import EmbeddingStore
+from metrics import metrics
 from insightface.app import FaceAnalysis
 
+IMAGE_EXTENSIONS = ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']
+
+# Jumlah gambar per task saat encoding paralel
+ENCODE_CHUNK_SIZE = 8
+
+# Encoder milik proses worker (dibuat sekali per proses oleh _init_encode_worker)
+_worker_encoder = None
+
+
+def _init_encode_worker(num_threads):
+    """Initializer ProcessPoolExecutor: setiap worker punya session ONNX sendiri"""
+    global _worker_encoder
+    _worker_encoder = ArcFaceEncoder(num_threads=num_threads)
+
+
+def _encode_chunk_in_worker(image_paths):
+    """Task worker: encode sekumpulan gambar, return list of (embedding, status)"""
+    return _worker_encoder.encode_image_files(image_paths)
+
+
 class ArcFaceEncoder:
     """Class untuk encoding wajah menggunakan ArcFace dari InsightFace"""
     
-    def __init__(self):
+    def __init__(self, num_threads=None):
         print("Loading ArcFace model...")
         self.app = FaceAnalysis(
             name=config.ARCFACE_MODEL,
             providers=['CUDAExecutionProvider', 'CPUExecutionProvider'] if config.USE_GPU else ['CPUExecutionProvider']
         )
         self.app.prepare(ctx_id=0 if config.USE_GPU else -1, det_size=(640, 640))
+        if config.USE_INT8_RECOGNITION:
+            self._load_int8_recognition()
+        if num_threads:
+            self._limit_threads(num_threads)
         print("✓ ArcFace model loaded")
         
+        # Model recognition (ONNX) untuk dipanggil langsung dengan wajah ter-align
+        self.rec_model = self.app.models.get('recognition')
+        
         self.known_embeddings = []
         self.known_names = []
+        self.store = EmbeddingStore()
+    
+    def _load_int8_recognition(self):
+        """
+        Ganti session model recognition dengan versi INT8 (hasil 05_quantize_models.py)
         
-    def get_embedding(self, face_img, skip_detection=False):
+        Nama input/output model INT8 sama dengan FP32, jadi get_feat() dan
+        jalur app.get() langsung memakai session baru.
         """
-        Mendapatkan embedding dari gambar wajah
+        import onnxruntime
+        
+        model_path = os.path.join(config.DATA_DIR, config.ARCFACE_INT8_MODEL)
+        if not os.path.exists(model_path):
+            print(f"⚠ Model INT8 tidak ditemukan: {model_path}, tetap pakai FP32")
+            return
+        
+        rec_model = self.app.models['recognition']
+        rec_model.model_file = model_path
+        rec_model.session = onnxruntime.InferenceSession(
+            model_path, providers=rec_model.session.get_providers()
+        )
+        print("✓ Model recognition INT8 dipakai")
+    
+    def _limit_threads(self, num_threads):
+        """
+        Buat ulang session ONNX dengan jumlah thread terbatas
+        
+        Dipakai oleh worker encoding paralel supaya total thread tidak
+        melebihi jumlah core (setiap proses punya session sendiri).
+        """
+        import onnxruntime
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        
+        for model in self.app.models.values():
+            model.session = onnxruntime.InferenceSession(
+                model.model_file, sess_options=options, providers=model.session.get_providers()
+            )
+        
+    def _prepare_image(self, face_img, skip_detection=False):
+        """
+        Siapkan gambar untuk detector + recognition InsightFace
         
         Args:
             face_img: Gambar wajah (BGR format)
             skip_detection: Jika True, gambar sudah di-crop wajah dari detector lain (YOLO)
             
         Returns:
-            Embedding vector (512-d) atau None jika tidak ada wajah
+            Gambar RGB (diberi padding & diperbesar jika skip_detection)
         """
         # Convert BGR to RGB
         rgb_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
@@ -68,8 +140,24 @@ class ArcFaceEncoder:
                 new_h, new_w = int(h * scale), int(w * scale)
                 rgb_img = cv2.resize(rgb_img, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
         
+        return rgb_img
+    
+    def get_embedding(self, face_img, skip_detection=False):
+        """
+        Mendapatkan embedding dari gambar wajah
+        
+        Args:
+            face_img: Gambar wajah (BGR format)
+            skip_detection: Jika True, gambar sudah di-crop wajah dari detector lain (YOLO)
+            
+        Returns:
+            Embedding vector (512-d) atau None jika tidak ada wajah
+        """
+        rgb_img = self._prepare_image(face_img, skip_detection)
+        
         # Detect and get embedding
-        faces = self.app.get(rgb_img)
+        with metrics.timer('embed'):
+            faces = self.app.get(rgb_img)
         
         if len(faces) == 0:
             return None
@@ -80,7 +168,191 @@ class ArcFaceEncoder:
         # Flatten untuk konsistensi dimensi
         return face.embedding.flatten()
     
-    def encode_faces_from_directory(self, directory=config.FACES_DIR):
+    def get_training_aligned_face(self, face_img, skip_detection=True):
+        """
+        Crop wajah ter-align 112x112 persis seperti jalur retrain
+        (dipakai untuk kalibrasi & evaluasi model INT8)
+        
+        Returns:
+            Gambar wajah ter-align (RGB) atau None jika tidak ada wajah
+        """
+        rgb_img = self._prepare_image(face_img, skip_detection)
+        bboxes, kpss = self.app.det_model.detect(rgb_img, max_num=0, metric='default')
+        if kpss is None or len(bboxes) == 0:
+            return None
+        
+        # Keypoint wajah dengan confidence tertinggi (kolom terakhir bbox = det_score)
+        best = int(np.argmax(bboxes[:, 4]))
+        return align_face(rgb_img, kpss[best])
+    
+    def get_embedding_aligned(self, frame, landmarks):
+        """
+        Mendapatkan embedding langsung dari frame + 5 landmark (tanpa deteksi ulang)
+        
+        Wajah di-align dengan similarity transform ke 112x112 lalu model
+        recognition ONNX dipanggil langsung, melewati detector InsightFace.
+        
+        Args:
+            frame: Frame penuh (BGR format)
+            landmarks: Array (5, 2) keypoint wajah dalam koordinat frame
+            
+        Returns:
+            Embedding vector (512-d)
+        """
+        return self.get_embeddings_aligned(frame, [landmarks])[0]
+    
+    def get_embeddings_aligned(self, frame, landmarks_list):
+        """
+        Mendapatkan embedding semua wajah dalam satu frame dengan satu kali inference
+        
+        Args:
+            frame: Frame penuh (BGR format)
+            landmarks_list: List array (5, 2) keypoint, satu per wajah
+            
+        Returns:
+            Array (N, 512) embedding, urutan sama dengan landmarks_list
+        """
+        aligned_faces = [self.align_face(frame, landmarks) for landmarks in landmarks_list]
+        return self.embed_aligned_faces(aligned_faces)
+    
+    def align_face(self, frame, landmarks):
+        """
+        Align satu wajah ke 112x112 untuk model recognition
+        
+        Returns:
+            Gambar wajah ter-align (RGB)
+        """
+        aligned = align_face(frame, landmarks)
+        
+        # Convert BGR to RGB, konsisten dengan get_embedding() supaya
+        # embedding cocok dengan galeri yang sudah dilatih
+        return cv2.cvtColor(aligned, cv2.COLOR_BGR2RGB)
+    
+    def embed_aligned_faces(self, aligned_faces):
+        """
+        Jalankan model recognition sekali untuk sekumpulan wajah ter-align
+        
+        Semua wajah disusun menjadi satu tensor NCHW (blobFromImages di dalam
+        get_feat) sehingga ONNX Runtime hanya dipanggil satu kali per batch.
+        
+        Args:
+            aligned_faces: List gambar wajah 112x112 hasil align_face()
+            
+        Returns:
+            Array (N, 512) embedding
+        """
+        if len(aligned_faces) == 0:
+            return np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+        
+        with metrics.timer('embed'):
+            return self.rec_model.get_feat(aligned_faces).reshape(len(aligned_faces), -1)
+    
+    def _encode_training_image(self, image):
+        """
+        Encode satu gambar training yang sudah di-load
+        
+        Returns:
+            (embedding, status) - status: "ok", "read_error" atau "no_face"
+        """
+        if image is None:
+            return None, "read_error"
+        
+        # Get embedding - skip detection karena gambar sudah di-crop wajah
+        embedding = self.get_embedding(image, skip_detection=True)
+        
+        return embedding, ("ok" if embedding is not None else "no_face")
+    
+    def encode_image_files(self, image_paths):
+        """
+        Encode beberapa gambar training secara berurutan
+        
+        Decode gambar berikutnya (cv2.imread melepas GIL) berjalan di thread
+        terpisah selama inference gambar saat ini.
+        
+        Args:
+            image_paths: List path gambar
+            
+        Returns:
+            List of (embedding, status), urutan sama dengan image_paths
+        """
+        results = []
+        if len(image_paths) == 0:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            next_image = reader.submit(cv2.imread, str(image_paths[0]))
+            for idx in range(len(image_paths)):
+                image = next_image.result()
+                if idx + 1 < len(image_paths):
+                    next_image = reader.submit(cv2.imread, str(image_paths[idx + 1]))
+                results.append(self._encode_training_image(image))
+        
+        return results
+    
+    def encode_image_file(self, image_path):
+        """
+        Encode satu gambar training (sudah di-crop wajah)
+        
+        Returns:
+            Embedding vector atau None jika gagal dibaca / tidak ada wajah
+        """
+        embedding, status = self.encode_image_files([image_path])[0]
+        self._print_encode_status(image_path, status)
+        return embedding
+    
+    @staticmethod
+    def _print_encode_status(image_path, status):
+        if status == "read_error":
+            print(f"  ⚠ Gagal membaca {Path(image_path).name}")
+        elif status == "no_face":
+            print(f"  ⚠ Tidak ada wajah terdeteksi di {Path(image_path).name}")
+    
+    def _encode_chunks(self, chunks, workers):
+        """
+        Encode chunk (person_name, image_paths) secara berurutan atau paralel
+        
+        Yields:
+            (person_name, image_paths, results) dengan urutan sama seperti chunks
+        """
+        if workers <= 1:
+            for person_name, image_paths in chunks:
+                yield person_name, image_paths, self.encode_image_files(image_paths)
+            return
+        
+        # spawn: session ONNX tidak aman di-fork, setiap worker load model sendiri
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_encode_worker,
+            initargs=(threads_per_worker,)
+        ) as pool:
+            # map mempertahankan urutan task -> hasil deterministik
+            all_results = pool.map(_encode_chunk_in_worker, [paths for _, paths in chunks])
+            for (person_name, image_paths), results in zip(chunks, all_results):
+                yield person_name, image_paths, results
+    
+    def _list_training_images(self, directory):
+        """List (person_name, [image_path]) terurut dari direktori dataset"""
+        persons = []
+        
+        # Iterasi setiap folder (setiap orang)
+        for person_dir in sorted(Path(directory).iterdir()):
+            if not person_dir.is_dir():
+                continue
+            
+            # Support multiple image formats
+            image_files = []
+            for ext in IMAGE_EXTENSIONS:
+                image_files.extend(person_dir.glob(ext))
+            
+            persons.append((person_dir.name, sorted(set(image_files))))
+        
+        return persons
+    
+    def encode_faces_from_directory(self, directory=config.FACES_DIR, use_cache=config.USE_EMBEDDING_CACHE,
+                                    workers=config.ENCODE_WORKERS):
         """
         Encode semua wajah dari direktori
         
@@ -94,81 +366,117 @@ class ArcFaceEncoder:
         
         Args:
             directory: Path ke direktori yang berisi folder per orang
+            use_cache: Jika True, hanya gambar baru/berubah yang di-encode
+                       (lihat EmbeddingCache), gambar yang dihapus dibuang dari cache
+            workers: Jumlah proses encoding (1 = tanpa paralel, 0 = semua core)
         """
         print(f"Memproses wajah dari: {directory}\n")
         
+        cache = None
+        if use_cache:
+            cache = EmbeddingCache()
+            cached_count = cache.load()
+            print(f"Cache embedding: {cached_count} gambar\n")
+        
+        persons = self._list_training_images(directory)
+        
+        # Ambil dari cache, sisanya dikumpulkan untuk di-encode
+        embeddings_by_path = {}
+        chunks = []
+        for person_name, image_paths in persons:
+            pending = []
+            for image_path in image_paths:
+                found = False
+                if cache is not None:
+                    found, embedding = cache.lookup(image_path)
+                if found:
+                    embeddings_by_path[image_path] = embedding
+                else:
+                    pending.append(image_path)
+            
+            for start in range(0, len(pending), ENCODE_CHUNK_SIZE):
+                chunks.append((person_name, pending[start:start + ENCODE_CHUNK_SIZE]))
+        
+        if chunks:
+            workers = workers or os.cpu_count() or 1
+            workers = max(1, min(workers, len(chunks)))
+            pending_persons = sorted({person_name for person_name, _ in chunks})
+            remaining = {}
+            for person_name, _ in chunks:
+                remaining[person_name] = remaining.get(person_name, 0) + 1
+            
+            print(f"Encoding {sum(len(paths) for _, paths in chunks)} gambar dari "
+                  f"{len(pending_persons)} orang ({workers} proses)\n")
+            
+            done_persons = 0
+            for person_name, image_paths, results in self._encode_chunks(chunks, workers):
+                for image_path, (embedding, status) in zip(image_paths, results):
+                    self._print_encode_status(image_path, status)
+                    embeddings_by_path[image_path] = embedding
+                    if cache is not None:
+                        cache.store(image_path, embedding)
+                
+                # Progress per orang
+                remaining[person_name] -= 1
+                if remaining[person_name] == 0:
+                    done_persons += 1
+                    print(f"  [{done_persons}/{len(pending_persons)}] {person_name} selesai di-encode")
+            print()
+        
         known_embeddings = []
         known_names = []
         
-        # Iterasi setiap folder (setiap orang)
-        for person_dir in Path(directory).iterdir():
-            if not person_dir.is_dir():
-                continue
-                
-            person_name = person_dir.name
+        for person_name, image_paths in persons:
             print(f"Memproses: {person_name}")
             
-            image_count = 0
             encoding_count = 0
-            
-            # Iterasi setiap foto dalam folder orang tersebut
-            # Support multiple image formats
-            image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']
-            image_files = []
-            for ext in image_extensions:
-                image_files.extend(person_dir.glob(ext))
-            
-            for image_path in image_files:
-                image_count += 1
-                
-                # Load gambar
-                image = cv2.imread(str(image_path))
-                
-                if image is None:
-                    print(f"  ⚠ Gagal membaca {image_path.name}")
-                    continue
-                
-                # Get embedding - skip detection karena gambar sudah di-crop wajah
-                embedding = self.get_embedding(image, skip_detection=True)
-                
+            for image_path in image_paths:
+                embedding = embeddings_by_path[image_path]
                 if embedding is not None:
                     known_embeddings.append(embedding)
                     known_names.append(person_name)
                     encoding_count += 1
-                else:
-                    print(f"  ⚠ Tidak ada wajah terdeteksi di {image_path.name}")
             
-            print(f"  ✓ {encoding_count}/{image_count} gambar berhasil diencode\n")
+            print(f"  ✓ {encoding_count}/{len(image_paths)} gambar berhasil diencode\n")
         
         self.known_embeddings = known_embeddings
         self.known_names = known_names
         
+        if cache is not None:
+            cache.prune(path for _, image_paths in persons for path in image_paths)
+            cache.save()
+            print(f"Cache: {cache.hits} dari cache, {cache.misses} di-encode, {cache.removed} dihapus")
+        
         print(f"Total: {len(known_embeddings)} embedding dari {len(set(known_names))} orang")
         return known_embeddings, known_names
     
     def save_encodings(self, filepath=config.MODEL_FILE):
-        """Simpan embeddings ke file"""
-        data = {
-            "embeddings": self.known_embeddings,
-            "names": self.known_names
-        }
-        
-        with open(filepath, "wb") as f:
-            pickle.dump(data, f)
+        """Simpan embeddings ke file (lihat EmbeddingStore)"""
+        self.store = EmbeddingStore(filepath)
+        self.store.save(self.known_embeddings, self.known_names)
         
-        print(f"\n✓ Embeddings disimpan ke: {filepath}")
+        print(f"\n✓ Embeddings disimpan ke: {self.store.matrix_path}")
     
     def load_encodings(self, filepath=config.MODEL_FILE):
-        """Load embeddings dari file"""
-        if not os.path.exists(filepath):
-            print(f"⚠ File {filepath} tidak ditemukan")
+        """
+        Load embeddings dari file (memmap, tanpa copy)
+        
+        File pickle lama (LEGACY_MODEL_FILE) di-import otomatis jika store belum ada.
+        
+        Returns:
+            (matrix, names) - matriks (N, D) ternormalisasi dan nama per baris
+        """
+        self.store = EmbeddingStore(filepath)
+        
+        if not self.store.exists() and not self.store.import_legacy(config.LEGACY_MODEL_FILE):
+            print(f"⚠ File {self.store.matrix_path} tidak ditemukan")
             return [], []
         
-        with open(filepath, "rb") as f:
-            data = pickle.load(f)
+        if not self.store.load():
+            return [], []
         
-        self.known_embeddings = data["embeddings"]
-        self.known_names = data["names"]
+        self.known_embeddings = self.store.matrix
+        self.known_names = self.store.names()
         
-        print(f"✓ Loaded {len(self.known_embeddings)} embeddings dari {filepath}")
+        print(f"✓ Loaded {len(self.known_embeddings)} embeddings dari {self.store.matrix_path}")
         return self.known_embeddings, self.known_names
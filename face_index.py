@@ -0,0 +1,249 @@
+"""
+Face Index
+Modul index nearest-neighbour untuk galeri embedding
+- ExactIndex: brute force (satu perkalian matriks), hasil pasti benar
+- IVFIndex: partisi k-means (inverted file), hanya cluster terdekat yang diperiksa
+Semua embedding diasumsikan sudah dinormalisasi L2 (inner product = cosine)
+"""
+
+import hashlib
+import os
+import numpy as np
+import config
+
+
+def matrix_fingerprint(matrix):
+    """Fingerprint isi matriks galeri untuk mendeteksi index yang sudah basi"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    digest = hashlib.sha1(matrix.tobytes()).hexdigest()
+    return f"{matrix.shape[0]}x{matrix.shape[1]}:{digest}"
+
+
+def top_k(scores, k):
+    """Index top-k per baris (urut dari skor tertinggi)"""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        top_idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top_idx = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+    top_scores = np.take_along_axis(scores, top_idx, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top_idx, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+class ExactIndex:
+    """Index brute force: bandingkan query dengan seluruh galeri"""
+
+    index_type = "exact"
+
+    def __init__(self):
+        self.matrix = np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+
+    def build(self, matrix):
+        """Simpan referensi ke matriks galeri (tidak ada training)"""
+        self.matrix = matrix
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def search(self, queries, k):
+        """
+        Cari k baris galeri paling mirip
+
+        Args:
+            queries: Array (M, D) ternormalisasi
+            k: Jumlah baris
+
+        Returns:
+            (rows, scores) masing-masing array (M, k)
+        """
+        return top_k(queries @ self.matrix.T, k)
+
+
+class IVFIndex:
+    """
+    Index IVF (inverted file) dengan partisi spherical k-means
+
+    Baris galeri diurutkan per cluster sehingga setiap inverted list
+    adalah potongan kontigu dari matriks dan bisa langsung dikalikan
+    tanpa menyalin kandidat.
+    """
+
+    index_type = "ivf"
+
+    def __init__(self, nlist=0, nprobe=8, iterations=20, seed=0):
+        self.nlist = nlist  # 0 = otomatis (~sqrt(N))
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids = np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+        self.sorted_matrix = np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+        self.sorted_rows = np.zeros(0, dtype=np.int64)  # Baris asli untuk setiap baris sorted_matrix
+        self.list_offsets = np.zeros(1, dtype=np.int64)  # Batas inverted list per cluster
+
+    def __len__(self):
+        return self.sorted_matrix.shape[0]
+
+    def _train_centroids(self, matrix, nlist):
+        """Spherical k-means pada sampel galeri"""
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(matrix), max(nlist * 64, 10000))
+        sample = matrix[rng.choice(len(matrix), sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+
+            # Cluster kosong diisi ulang dengan titik acak
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        return centroids
+
+    def build(self, matrix):
+        """
+        Latih centroid dan susun inverted list
+
+        Args:
+            matrix: Array (N, D) galeri ternormalisasi
+        """
+        num_rows = len(matrix)
+        nlist = self.nlist or int(np.sqrt(num_rows))
+        nlist = max(1, min(nlist, num_rows))
+
+        self.centroids = self._train_centroids(matrix, nlist)
+
+        # Assign seluruh galeri per blok supaya memori tetap kecil
+        assignment = np.empty(num_rows, dtype=np.int64)
+        for start in range(0, num_rows, 65536):
+            block = matrix[start:start + 65536]
+            assignment[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+
+        self.sorted_rows = np.argsort(assignment, kind='stable')
+        self.sorted_matrix = np.ascontiguousarray(matrix[self.sorted_rows])
+        counts = np.bincount(assignment, minlength=nlist)
+        self.list_offsets = np.r_[0, np.cumsum(counts)].astype(np.int64)
+
+    def search(self, queries, k):
+        """
+        Cari k baris galeri paling mirip (perkiraan) di nprobe cluster terdekat
+
+        Args:
+            queries: Array (M, D) ternormalisasi
+            k: Jumlah baris
+
+        Returns:
+            (rows, scores) masing-masing array (M, k); baris -1 jika kandidat kurang dari k
+        """
+        nprobe = min(self.nprobe, len(self.centroids))
+        probe_lists, _ = top_k(queries @ self.centroids.T, nprobe)
+
+        all_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+
+        for query_idx, query in enumerate(queries):
+            candidate_rows = []
+            candidate_scores = []
+            for list_id in probe_lists[query_idx]:
+                start, end = self.list_offsets[list_id], self.list_offsets[list_id + 1]
+                if start == end:
+                    continue
+                candidate_scores.append(self.sorted_matrix[start:end] @ query)
+                candidate_rows.append(self.sorted_rows[start:end])
+
+            if not candidate_rows:
+                continue
+
+            scores = np.concatenate(candidate_scores)[None, :]
+            top_idx, top_scores = top_k(scores, k)
+            count = top_idx.shape[1]
+            all_rows[query_idx, :count] = np.concatenate(candidate_rows)[top_idx[0]]
+            all_scores[query_idx, :count] = top_scores[0]
+
+        return all_rows, all_scores
+
+    def save(self, filepath, fingerprint):
+        """Simpan index ke file .npz"""
+        np.savez(
+            filepath,
+            fingerprint=np.array(fingerprint),
+            centroids=self.centroids,
+            sorted_rows=self.sorted_rows,
+            list_offsets=self.list_offsets
+        )
+
+    def load(self, filepath, matrix, fingerprint):
+        """
+        Load index dari file jika fingerprint cocok dengan galeri saat ini
+
+        Returns:
+            True jika berhasil, False jika file tidak ada / sudah basi
+        """
+        if not os.path.exists(filepath):
+            return False
+
+        data = np.load(filepath)
+        if str(data['fingerprint']) != fingerprint:
+            return False
+
+        self.centroids = data['centroids']
+        self.sorted_rows = data['sorted_rows']
+        self.list_offsets = data['list_offsets']
+        self.sorted_matrix = np.ascontiguousarray(matrix[self.sorted_rows])
+        return True
+
+
+def get_index_path(model_file=config.MODEL_FILE):
+    """Path file index, disimpan di sebelah MODEL_FILE"""
+    return os.path.splitext(model_file)[0] + "_index.npz"
+
+
+def create_index(matrix, index_type=config.FACE_INDEX_TYPE, model_file=config.MODEL_FILE, fingerprint=None):
+    """
+    Buat index sesuai konfigurasi; index IVF di-load dari disk jika masih valid,
+    jika tidak dilatih ulang dan disimpan di sebelah MODEL_FILE
+
+    Args:
+        matrix: Array (N, D) galeri ternormalisasi
+        index_type: "exact" atau "ivf"
+        model_file: Path model, untuk menentukan lokasi file index
+        fingerprint: Identitas galeri (mis. gallery_id EmbeddingStore); jika None
+                     dihitung dari isi matriks
+
+    Returns:
+        Objek index (ExactIndex / IVFIndex)
+    """
+    if index_type == "exact":
+        index = ExactIndex()
+        index.build(matrix)
+        return index
+
+    if index_type != "ivf":
+        raise ValueError(f"FACE_INDEX_TYPE tidak dikenal: {index_type}")
+
+    index = IVFIndex(nlist=config.IVF_NLIST, nprobe=config.IVF_NPROBE)
+    index_path = get_index_path(model_file)
+    if fingerprint is None:
+        fingerprint = matrix_fingerprint(matrix)
+
+    if index.load(index_path, matrix, fingerprint):
+        print(f"✓ Index IVF di-load dari {index_path}")
+        return index
+
+    print("Membangun index IVF...")
+    index.build(matrix)
+    try:
+        index.save(index_path, fingerprint)
+        print(f"✓ Index IVF ({len(index.centroids)} cluster) disimpan ke: {index_path}")
+    except OSError as e:
+        print(f"⚠ Gagal simpan index: {e}")
+    return index
@@ -0,0 +1,199 @@
+"""
+Face Matcher
+Modul untuk mencocokkan embedding dengan galeri wajah yang dikenal
+Galeri disimpan sebagai satu matriks float32 yang sudah dinormalisasi (L2),
+sehingga cosine similarity cukup dihitung dengan satu perkalian matriks
+"""
+
+import numpy as np
+import config
+from face_index import ExactIndex, top_k
+from metrics import metrics
+
+
+def l2_normalize(embeddings):
+    """
+    Normalisasi L2 per baris
+
+    Args:
+        embeddings: Array (N, D) atau (D,)
+
+    Returns:
+        Array float32 (N, D) dengan norm 1 per baris
+    """
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class FaceMatcher:
+    """Class untuk pencarian top-k wajah dalam galeri embedding"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Kosongkan galeri"""
+        self.matrix = np.zeros((0, config.EMBEDDING_SIZE), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.int32)  # Index orang untuk setiap baris matriks
+        self.person_names = []  # Nama orang per label
+        self.person_starts = np.zeros(0, dtype=np.int64)  # Baris awal setiap orang di matriks
+        self.max_per_person = 0  # Jumlah embedding terbanyak milik satu orang
+        self.index = ExactIndex()
+
+    def build(self, embeddings, names):
+        """
+        Bangun galeri dari list embedding dan nama (dipanggil sekali saat load model)
+
+        Baris diurutkan per orang supaya skor per orang bisa diambil
+        dengan np.maximum.reduceat tanpa loop Python.
+
+        Args:
+            embeddings: List/array embedding (N, D)
+            names: List nama sepanjang N
+        """
+        if len(embeddings) == 0:
+            self.clear()
+            return
+
+        self.person_names = sorted(set(names))
+        label_of = {name: idx for idx, name in enumerate(self.person_names)}
+        labels = np.array([label_of[name] for name in names], dtype=np.int32)
+
+        order = np.argsort(labels, kind='stable')
+        matrix = l2_normalize(np.asarray(embeddings).reshape(len(embeddings), -1))
+        self.matrix = np.ascontiguousarray(matrix[order])
+        self.labels = labels[order]
+        self.person_starts = np.flatnonzero(np.r_[True, self.labels[1:] != self.labels[:-1]])
+        self.max_per_person = int(np.diff(np.r_[self.person_starts, len(self.labels)]).max())
+        
+        self.index = ExactIndex()
+        self.index.build(self.matrix)
+
+    def load_prepared(self, matrix, labels, person_names):
+        """
+        Pakai galeri yang sudah ternormalisasi dan terurut per orang
+        (mis. memmap dari EmbeddingStore) tanpa menyalin matriks
+
+        Args:
+            matrix: Array (N, D) float32 L2-normalized, baris terurut per label
+            labels: Array (N,) index orang per baris
+            person_names: List nama per label
+        """
+        if len(matrix) == 0:
+            self.clear()
+            return
+
+        self.matrix = matrix
+        self.labels = np.asarray(labels)
+        self.person_names = list(person_names)
+        self.person_starts = np.flatnonzero(np.r_[True, self.labels[1:] != self.labels[:-1]])
+        self.max_per_person = int(np.diff(np.r_[self.person_starts, len(self.labels)]).max())
+
+        self.index = ExactIndex()
+        self.index.build(self.matrix)
+
+    def set_index(self, index):
+        """
+        Pasang index nearest-neighbour (lihat face_index.create_index)
+
+        Index harus dibangun dari self.matrix karena baris hasil pencarian
+        dipetakan ke self.labels.
+        """
+        self.index = index
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def get_person_count(self):
+        """Jumlah orang unik di galeri"""
+        return len(self.person_names)
+
+    def similarities(self, queries):
+        """
+        Cosine similarity query terhadap seluruh galeri
+
+        Args:
+            queries: Array embedding (M, D) atau (D,)
+
+        Returns:
+            Array (M, N) similarity
+        """
+        return l2_normalize(queries) @ self.matrix.T
+
+    def person_scores(self, queries):
+        """
+        Skor terbaik per orang untuk setiap query
+
+        Returns:
+            Array (M, P) - similarity maksimum antara query dan embedding orang tersebut
+        """
+        return np.maximum.reduceat(self.similarities(queries), self.person_starts, axis=1)
+
+    def search(self, queries, k=1):
+        """
+        Cari top-k orang paling mirip untuk setiap query (dikelompokkan per orang)
+
+        Args:
+            queries: Array embedding (M, D) atau (D,)
+            k: Jumlah kandidat orang per query
+
+        Returns:
+            List sepanjang M, masing-masing list of (name, score) urut dari skor tertinggi
+        """
+        if len(self) == 0:
+            return [[] for _ in range(np.atleast_2d(queries).shape[0])]
+
+        if self.index.index_type != "exact":
+            return self._search_candidates(queries, k)
+
+        scores = self.person_scores(queries)
+        top_idx, top_scores = top_k(scores, k)
+
+        return [
+            [(self.person_names[idx], float(score)) for idx, score in zip(row_idx, row_scores)]
+            for row_idx, row_scores in zip(top_idx, top_scores)
+        ]
+
+    def _search_candidates(self, queries, k):
+        """
+        Top-k orang lewat index aproksimasi: ambil kandidat baris secukupnya
+        (k x embedding per orang) lalu kelompokkan per orang
+        """
+        queries = l2_normalize(queries)
+        rows, scores = self.index.search(queries, k * self.max_per_person)
+
+        results = []
+        for row_ids, row_scores in zip(rows, scores):
+            valid = row_ids >= 0
+            labels = self.labels[row_ids[valid]]
+            # Baris sudah urut dari skor tertinggi, ambil kemunculan pertama setiap orang
+            _, first = np.unique(labels, return_index=True)
+            first = np.sort(first)[:k]
+            results.append([
+                (self.person_names[labels[idx]], float(row_scores[valid][idx])) for idx in first
+            ])
+        return results
+
+    def match(self, queries, threshold):
+        """
+        Cocokkan setiap query dengan orang terbaik
+
+        Args:
+            queries: Array embedding (M, D) atau (D,)
+            threshold: Minimum similarity agar dianggap dikenali
+
+        Returns:
+            List of (name, confidence) - name "Unknown" jika di bawah threshold
+        """
+        with metrics.timer('match'):
+            results = []
+            for candidates in self.search(queries, k=1):
+                if len(candidates) == 0:
+                    results.append(("Unknown", 0.0))
+                    continue
+                name, score = candidates[0]
+                # Tetap return similarity untuk debugging walaupun Unknown
+                results.append((name if score >= threshold else "Unknown", score))
+        return results
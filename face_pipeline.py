@@ -0,0 +1,226 @@
+"""
+Face Pipeline
+Modul pipeline per frame: deteksi (YOLO) -> tracking -> recognition (ArcFace)
+Recognition hanya dijalankan untuk track yang belum dikonfirmasi atau
+perlu diverifikasi ulang (lihat TrackIdentityCache)
+"""
+
+import time
+from threading import Lock
+import config
+from face_tracker import FaceTracker
+from identity_cache import TrackIdentityCache
+from motion_gate import MotionGate
+from metrics import metrics
+
+
+class FacePipeline:
+    """Class untuk memproses satu frame menjadi daftar hasil wajah"""
+
+    def __init__(self, detector, recognizer, model_loaded=True):
+        self.detector = detector
+        self.recognizer = recognizer
+        self.model_loaded = model_loaded
+
+        self.tracker = FaceTracker()
+        self.identity_cache = TrackIdentityCache()
+        self.motion_gate = MotionGate() if config.MOTION_GATING else None
+        # Tracker & cache diakses dua thread jika tahap deteksi dan recognition dipisah
+        self.lock = Lock()
+        # Track yang sedang di-recognize (tahap deteksi batch berikutnya bisa berjalan sebelum selesai)
+        self.in_flight = set()
+
+        # Statistik
+        self.frames_processed = 0
+        self.faces_recognized = 0  # Jumlah wajah yang benar-benar di-embed ArcFace
+        self.recognition_calls = 0  # Jumlah panggilan batch recognition
+        self.last_timings = {}  # Latency per tahap frame terakhir (detik)
+        self.last_gated = False  # Frame terakhir dilewati motion gate (YOLO tidak dijalankan)
+
+    def process(self, frame, timestamp=None):
+        """
+        Proses satu frame
+
+        Args:
+            frame: Frame BGR
+            timestamp: Waktu frame (untuk tracker & motion gate), default waktu sekarang
+
+        Returns:
+            List of dict {'location', 'track_id', 'name', 'confidence', 'status'}
+        """
+        return process_batch([self], [frame], [timestamp])[0]
+
+    def get_stats(self):
+        """Statistik pipeline + cache identitas"""
+        stats = self.identity_cache.get_stats()
+        stats['frames_processed'] = self.frames_processed
+        stats['faces_recognized'] = self.faces_recognized
+        stats['recognition_calls'] = self.recognition_calls
+        if self.motion_gate is not None:
+            stats.update(self.motion_gate.get_stats())
+        return stats
+
+
+def detect_stage(pipelines, frames, timestamps=None):
+    """
+    Tahap 1 pipeline: motion gate, deteksi YOLO (satu batch untuk semua
+    frame aktif), tracking dan lookup cache identitas
+
+    Args:
+        pipelines: List FacePipeline dengan detector & recognizer yang sama
+        frames: List frame BGR, sejajar dengan pipelines
+        timestamps: Optional list waktu frame
+
+    Returns:
+        List state per frame yang tidak di-gate, diteruskan ke recognize_stage()
+    """
+    if timestamps is None:
+        timestamps = [None] * len(frames)
+
+    for pipeline in pipelines:
+        pipeline.frames_processed += 1
+
+    # Scene diam dan tidak ada wajah yang di-track -> lewati YOLO
+    active = []
+    for idx, (pipeline, frame, timestamp) in enumerate(zip(pipelines, frames, timestamps)):
+        if pipeline.motion_gate is not None and not pipeline.motion_gate.should_process(
+                frame, len(pipeline.tracker) > 0, timestamp):
+            pipeline.last_timings = {'detect': 0.0, 'recognize': 0.0}
+            pipeline.last_gated = True
+        else:
+            pipeline.last_gated = False
+            active.append(idx)
+
+    if not active:
+        return []
+
+    detector = pipelines[active[0]].detector
+
+    # Deteksi wajah (satu batch untuk semua frame aktif)
+    start = time.perf_counter()
+    detections = detector.detect_faces_with_landmarks_batch([frames[idx] for idx in active])
+    detect_time = time.perf_counter() - start
+
+    states = []
+    for idx, (face_locations, landmarks) in zip(active, detections):
+        pipeline = pipelines[idx]
+        state = {
+            'idx': idx,
+            'locations': face_locations,
+            'landmarks': landmarks,
+            'recognitions': [("Unknown", 0)] * len(face_locations),
+            'pending': [],
+            'deferred': [],  # Track yang sedang di-recognize batch sebelumnya
+            'detect_time': detect_time
+        }
+        with pipeline.lock:
+            state['track_ids'] = pipeline.tracker.update(face_locations, timestamps[idx])
+            pipeline.identity_cache.remove(pipeline.tracker.removed_ids)
+
+            if pipeline.model_loaded:
+                # Ambil identitas dari cache, sisanya di-recognize sekaligus (batch)
+                for face_idx, (track_id, face_location) in enumerate(zip(state['track_ids'], face_locations)):
+                    cached = pipeline.identity_cache.lookup(track_id, face_location)
+                    if cached is not None:
+                        state['recognitions'][face_idx] = cached
+                    elif track_id in pipeline.in_flight:
+                        # Jangan embed dua kali: ambil hasil batch sebelumnya di recognize_stage
+                        state['deferred'].append(face_idx)
+                    else:
+                        state['pending'].append(face_idx)
+                        pipeline.in_flight.add(track_id)
+        states.append(state)
+
+    return states
+
+
+def recognize_stage(pipelines, frames, states):
+    """
+    Tahap 2 pipeline: recognition ArcFace untuk wajah yang tidak ada di
+    cache (satu batch untuk semua frame), update cache dan susun hasil
+
+    Args:
+        pipelines, frames: Sama dengan yang diberikan ke detect_stage()
+        states: Hasil detect_stage()
+
+    Returns:
+        List (per frame) of list dict hasil seperti FacePipeline.process()
+    """
+    all_results = [[] for _ in frames]
+    if not states:
+        return all_results
+
+    recognizer = pipelines[states[0]['idx']].recognizer
+
+    start = time.perf_counter()
+    pending_states = [state for state in states if state['pending']]
+    if pending_states:
+        batch_results = recognizer.recognize_faces_in_frames(
+            [frames[state['idx']] for state in pending_states],
+            [[state['locations'][i] for i in state['pending']] for state in pending_states],
+            [[state['landmarks'][i] for i in state['pending']] for state in pending_states]
+        )
+
+        for state, frame_results in zip(pending_states, batch_results):
+            pipeline = pipelines[state['idx']]
+            pipeline.faces_recognized += len(state['pending'])
+            pipeline.recognition_calls += 1
+            with pipeline.lock:
+                for face_idx, (name, confidence) in zip(state['pending'], frame_results):
+                    track_id = state['track_ids'][face_idx]
+                    pipeline.in_flight.discard(track_id)
+                    if pipeline.tracker.is_active(track_id):
+                        state['recognitions'][face_idx] = pipeline.identity_cache.update(
+                            track_id, state['locations'][face_idx], name, confidence
+                        )
+                    else:
+                        # Track sudah dihapus detect_stage batch berikutnya: jangan buat entry cache baru
+                        state['recognitions'][face_idx] = (name, confidence)
+
+    # Wajah yang di-recognize batch sebelumnya (sudah selesai, stage diproses berurutan)
+    for state in states:
+        if state['deferred']:
+            pipeline = pipelines[state['idx']]
+            with pipeline.lock:
+                for face_idx in state['deferred']:
+                    state['recognitions'][face_idx] = pipeline.identity_cache.latest(state['track_ids'][face_idx])
+
+    recognize_time = time.perf_counter() - start
+    if pending_states:
+        metrics.observe('recognize', recognize_time)
+
+    # Susun hasil
+    for state in states:
+        pipelines[state['idx']].last_timings = {'detect': state['detect_time'], 'recognize': recognize_time}
+        all_results[state['idx']] = [
+            {
+                'location': face_location,
+                'track_id': track_id,
+                'name': name,
+                'confidence': confidence,
+                'status': 'recognized' if name != "Unknown" else 'unknown'
+            }
+            for face_location, track_id, (name, confidence)
+            in zip(state['locations'], state['track_ids'], state['recognitions'])
+        ]
+
+    return all_results
+
+
+def process_batch(pipelines, frames, timestamps=None):
+    """
+    Proses beberapa frame sekaligus, satu frame per pipeline (mis. per kamera)
+
+    Setiap pipeline punya tracker, cache identitas & motion gate sendiri,
+    tetapi deteksi YOLO dan embedding ArcFace dijalankan satu kali untuk
+    semua frame (detector & recognizer dipakai bersama).
+
+    Args:
+        pipelines: List FacePipeline dengan detector & recognizer yang sama
+        frames: List frame BGR, sejajar dengan pipelines
+        timestamps: Optional list waktu frame
+
+    Returns:
+        List (per frame) of list dict hasil seperti FacePipeline.process()
+    """
+    return recognize_stage(pipelines, frames, detect_stage(pipelines, frames, timestamps))
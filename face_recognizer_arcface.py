@@ -7,19 +7,31 @@ Menggunakan cosine similarity untuk perbandingan
 import numpy as np
 import config
 from face_encoder_arcface import ArcFaceEncoder
+from face_matcher import FaceMatcher
+from face_index import create_index
 
 class ArcFaceRecognizer:
     """Class untuk mengenali wajah menggunakan ArcFace"""
     
-    def __init__(self):
-        self.encoder = ArcFaceEncoder()
+    def __init__(self, num_threads=None):
+        self.encoder = ArcFaceEncoder(num_threads=num_threads)
         self.known_embeddings = []
         self.known_names = []
         self.threshold = config.FACE_RECOGNITION_THRESHOLD
+        self.use_alignment = config.USE_LANDMARK_ALIGNMENT
+        self.matcher = FaceMatcher()
         
     def load_model(self, filepath=config.MODEL_FILE):
         """Load model yang sudah dilatih"""
         self.known_embeddings, self.known_names = self.encoder.load_encodings(filepath)
+        
+        # Matriks galeri di store sudah ternormalisasi & terurut per orang (memmap, tanpa copy)
+        store = self.encoder.store
+        self.matcher.load_prepared(store.matrix, store.labels, store.person_names)
+        if len(self.matcher) > 0 and config.FACE_INDEX_TYPE != "exact":
+            self.matcher.set_index(create_index(
+                self.matcher.matrix, config.FACE_INDEX_TYPE, filepath, fingerprint=store.header['gallery_id']
+            ))
         return len(self.known_embeddings) > 0
     
     def cosine_similarity(self, embedding1, embedding2):
@@ -36,19 +48,10 @@ class ArcFaceRecognizer:
         similarity = dot_product / (norm1 * norm2)
         return similarity
     
-    def recognize_face(self, face_img, bbox=None):
-        """
-        Mengenali satu wajah dari gambar
-        
-        Args:
-            face_img: Full frame (BGR format) atau cropped face
-            bbox: Optional (top, right, bottom, left) - jika provided, akan di-crop dari face_img
-            
-        Returns:
-            (name, confidence) tuple
-        """
-        if len(self.known_embeddings) == 0:
-            return ("Unknown", 0.0)
+    def _get_embedding(self, face_img, bbox=None, landmarks=None):
+        """Ambil embedding: alignment langsung jika ada landmark, jika tidak deteksi ulang"""
+        if landmarks is not None and self.use_alignment:
+            return self.encoder.get_embedding_aligned(face_img, landmarks)
         
         # Jika ada bbox, crop dari frame
         if bbox is not None:
@@ -68,32 +71,47 @@ class ArcFaceRecognizer:
             face_crop = face_img
         
         # Get embedding (skip_detection=False, biarkan InsightFace detect ulang)
-        embedding = self.encoder.get_embedding(face_crop, skip_detection=False)
+        return self.encoder.get_embedding(face_crop, skip_detection=False)
+    
+    def recognize_face(self, face_img, bbox=None, landmarks=None):
+        """
+        Mengenali satu wajah dari gambar
+        
+        Args:
+            face_img: Full frame (BGR format) atau cropped face
+            bbox: Optional (top, right, bottom, left) - jika provided, akan di-crop dari face_img
+            landmarks: Optional array (5, 2) keypoint wajah di face_img - jika provided
+                       (dan USE_LANDMARK_ALIGNMENT aktif), wajah di-align langsung tanpa deteksi ulang
+            
+        Returns:
+            (name, confidence) tuple
+        """
+        if len(self.known_embeddings) == 0:
+            return ("Unknown", 0.0)
+        
+        embedding = self._get_embedding(face_img, bbox, landmarks)
         
         if embedding is None:
             return ("Unknown", 0.0)
         
-        # Hitung similarity dengan semua wajah yang dikenal
-        similarities = []
-        for known_embedding in self.known_embeddings:
-            sim = self.cosine_similarity(embedding, known_embedding)
-            similarities.append(sim)
-        
-        # Cari yang paling mirip
-        best_match_idx = np.argmax(similarities)
-        best_similarity = similarities[best_match_idx]
-        
-        # Cek threshold - cosine similarity langsung (0-1, semakin tinggi semakin mirip)
-        # Threshold adalah minimum similarity yang diterima
-        if best_similarity >= self.threshold:
-            name = self.known_names[best_match_idx]
-            confidence = best_similarity
-        else:
-            name = "Unknown"
-            confidence = best_similarity  # Tetap return similarity untuk debugging
+        # Cocokkan dengan seluruh galeri dalam satu perkalian matriks
+        name, confidence = self.matcher.match(embedding, self.threshold)[0]
         
         return (name, confidence)
     
+    def search_face(self, embedding, k=5):
+        """
+        Cari top-k orang paling mirip untuk satu atau beberapa embedding
+        
+        Args:
+            embedding: Embedding (D,) atau (M, D)
+            k: Jumlah kandidat orang
+            
+        Returns:
+            List per query berisi list of (name, score)
+        """
+        return self.matcher.search(embedding, k=k)
+    
     def recognize_faces(self, face_images):
         """
         Mengenali multiple wajah
@@ -111,6 +129,74 @@ class ArcFaceRecognizer:
         
         return results
     
+    def recognize_faces_in_frame(self, frame, face_locations, landmarks=None):
+        """
+        Mengenali semua wajah dalam satu frame sekaligus (batch)
+        
+        Wajah yang punya landmark di-align lalu di-embed dengan satu kali
+        inference, kemudian dicocokkan dengan galeri dalam satu perkalian
+        matriks. Wajah tanpa landmark memakai jalur deteksi ulang per wajah.
+        
+        Args:
+            frame: Full frame (BGR format)
+            face_locations: List (top, right, bottom, left)
+            landmarks: Optional list array (5, 2), sejajar dengan face_locations
+            
+        Returns:
+            List of (name, confidence) tuples, urutan sama dengan face_locations
+        """
+        return self.recognize_faces_in_frames([frame], [face_locations], [landmarks])[0]
+    
+    def recognize_faces_in_frames(self, frames, face_locations_list, landmarks_list=None):
+        """
+        Mengenali wajah dari beberapa frame sekaligus (mis. dari beberapa kamera)
+        
+        Semua wajah ber-landmark dari semua frame di-align lalu di-embed dengan
+        satu kali inference dan dicocokkan dengan satu perkalian matriks.
+        
+        Args:
+            frames: List frame (BGR format)
+            face_locations_list: List (per frame) of list (top, right, bottom, left)
+            landmarks_list: Optional list (per frame) of list array (5, 2)
+            
+        Returns:
+            List (per frame) of list (name, confidence)
+        """
+        if landmarks_list is None:
+            landmarks_list = [None] * len(frames)
+        landmarks_list = [
+            landmarks if landmarks is not None else [None] * len(face_locations)
+            for face_locations, landmarks in zip(face_locations_list, landmarks_list)
+        ]
+        
+        if len(self.known_embeddings) == 0:
+            return [[("Unknown", 0.0)] * len(face_locations) for face_locations in face_locations_list]
+        
+        results = [[None] * len(face_locations) for face_locations in face_locations_list]
+        
+        # Batch untuk wajah yang bisa di-align langsung (dari semua frame)
+        batch_idx = []
+        aligned_faces = []
+        if self.use_alignment:
+            for frame_idx, (frame, landmarks) in enumerate(zip(frames, landmarks_list)):
+                for face_idx, kps in enumerate(landmarks):
+                    if kps is not None:
+                        batch_idx.append((frame_idx, face_idx))
+                        aligned_faces.append(self.encoder.align_face(frame, kps))
+        
+        if batch_idx:
+            embeddings = self.encoder.embed_aligned_faces(aligned_faces)
+            for (frame_idx, face_idx), result in zip(batch_idx, self.matcher.match(embeddings, self.threshold)):
+                results[frame_idx][face_idx] = result
+        
+        # Sisanya satu per satu
+        for frame, face_locations, frame_results in zip(frames, face_locations_list, results):
+            for face_idx, face_location in enumerate(face_locations):
+                if frame_results[face_idx] is None:
+                    frame_results[face_idx] = self.recognize_face(frame, bbox=face_location)
+        
+        return results
+    
     def get_person_count(self):
         """Mendapatkan jumlah orang yang dikenal"""
-        return len(set(self.known_names))
+        return self.matcher.get_person_count()
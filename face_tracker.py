@@ -0,0 +1,154 @@
+"""
+Face Tracker
+Modul multi-object tracking wajah antar frame (gaya SORT)
+Setiap deteksi mendapat track ID yang stabil selama wajah masih terlihat:
+- Prediksi posisi dengan model gerak kecepatan konstan
+- Matching deteksi ke track dengan IoU (matriks IoU dihitung tervektorisasi)
+"""
+
+import time
+import numpy as np
+import config
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Hitung IoU semua pasangan box
+
+    Args:
+        boxes_a: Array (A, 4) format (x1, y1, x2, y2)
+        boxes_b: Array (B, 4) format (x1, y1, x2, y2)
+
+    Returns:
+        Array (A, B) IoU
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return intersection / np.maximum(union, 1e-6)
+
+
+def locations_to_boxes(face_locations):
+    """Convert list (top, right, bottom, left) ke array (N, 4) (x1, y1, x2, y2)"""
+    if len(face_locations) == 0:
+        return np.zeros((0, 4), dtype=np.float32)
+    locations = np.asarray(face_locations, dtype=np.float32)
+    return locations[:, [3, 0, 1, 2]]
+
+
+class FaceTracker:
+    """Class untuk memberi track ID stabil pada wajah yang terdeteksi"""
+
+    def __init__(self, iou_threshold=config.TRACK_IOU_THRESHOLD, timeout=config.TRACK_TIMEOUT):
+        self.iou_threshold = iou_threshold
+        self.timeout = timeout  # Detik tanpa deteksi sebelum track dihapus
+        self.smoothing = 0.5  # Bobot kecepatan baru pada model gerak
+
+        # State track disimpan sebagai array supaya prediksi & matching tervektorisasi
+        self.track_ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)  # Box terakhir (x1, y1, x2, y2)
+        self.velocities = np.zeros((0, 4), dtype=np.float32)  # Perubahan box per update
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.hits = np.zeros(0, dtype=np.int64)
+
+        self.next_id = 1
+        self.removed_ids = []  # Track yang dihapus pada update terakhir
+
+    def __len__(self):
+        return len(self.track_ids)
+
+    def predict(self):
+        """Prediksi box setiap track pada frame berikutnya (kecepatan konstan)"""
+        return self.boxes + self.velocities
+
+    def _match(self, predicted, detections):
+        """
+        Greedy matching berdasarkan IoU tertinggi
+
+        Returns:
+            List of (track_idx, detection_idx)
+        """
+        if len(predicted) == 0 or len(detections) == 0:
+            return []
+
+        ious = iou_matrix(predicted, detections)
+        track_idx, det_idx = np.nonzero(ious >= self.iou_threshold)
+        order = np.argsort(-ious[track_idx, det_idx], kind='stable')
+
+        matches = []
+        used_tracks = set()
+        used_dets = set()
+        for t, d in zip(track_idx[order], det_idx[order]):
+            if t in used_tracks or d in used_dets:
+                continue
+            used_tracks.add(t)
+            used_dets.add(d)
+            matches.append((int(t), int(d)))
+        return matches
+
+    def update(self, face_locations, timestamp=None):
+        """
+        Update tracker dengan deteksi frame saat ini
+
+        Args:
+            face_locations: List (top, right, bottom, left)
+            timestamp: Waktu frame (default time.time())
+
+        Returns:
+            List track ID, sejajar dengan face_locations
+        """
+        now = time.time() if timestamp is None else timestamp
+        detections = locations_to_boxes(face_locations)
+        assigned = np.zeros(len(detections), dtype=np.int64)
+
+        matches = self._match(self.predict(), detections)
+        matched_dets = np.zeros(len(detections), dtype=bool)
+
+        for t, d in matches:
+            delta = detections[d] - self.boxes[t]
+            self.velocities[t] = self.smoothing * delta + (1 - self.smoothing) * self.velocities[t]
+            self.boxes[t] = detections[d]
+            self.last_seen[t] = now
+            self.hits[t] += 1
+            assigned[d] = self.track_ids[t]
+            matched_dets[d] = True
+
+        # Deteksi tanpa pasangan -> track baru
+        new_dets = np.flatnonzero(~matched_dets)
+        if len(new_dets) > 0:
+            new_ids = np.arange(self.next_id, self.next_id + len(new_dets), dtype=np.int64)
+            self.next_id += len(new_dets)
+            assigned[new_dets] = new_ids
+
+            self.track_ids = np.r_[self.track_ids, new_ids]
+            self.boxes = np.vstack([self.boxes, detections[new_dets]])
+            self.velocities = np.vstack([self.velocities, np.zeros((len(new_dets), 4), dtype=np.float32)])
+            self.last_seen = np.r_[self.last_seen, np.full(len(new_dets), now)]
+            self.hits = np.r_[self.hits, np.ones(len(new_dets), dtype=np.int64)]
+
+        # Hapus track yang sudah lama tidak terlihat
+        expired = now - self.last_seen > self.timeout
+        self.removed_ids = self.track_ids[expired].tolist()
+        if expired.any():
+            keep = ~expired
+            self.track_ids = self.track_ids[keep]
+            self.boxes = self.boxes[keep]
+            self.velocities = self.velocities[keep]
+            self.last_seen = self.last_seen[keep]
+            self.hits = self.hits[keep]
+
+        return assigned.tolist()
+
+    def is_active(self, track_id):
+        """Cek apakah track masih aktif"""
+        return bool(np.any(self.track_ids == track_id))
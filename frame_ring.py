@@ -0,0 +1,188 @@
+"""
+Frame Ring
+Modul ring buffer frame di shared memory (multiprocessing.shared_memory)
+Frame kamera ditulis sekali ke slot tetap (cv2.VideoCapture.read langsung ke
+slot), lalu diteruskan antar tahap dan ke proses worker sebagai view NumPy
+tanpa copy maupun pickle. Setiap frame punya nomor urut (seq) dan waktu
+capture. Konsumen yang lambat selalu mendapat frame terbaru
+(latest-frame-wins): frame lama yang belum diambil ditimpa frame baru.
+"""
+
+from multiprocessing import shared_memory
+from threading import Lock
+import numpy as np
+import config
+
+# Ring milik proses ini {nama shm: SharedFrameRing}, untuk mengenali frame di shared memory
+_local_rings = {}
+
+# Shared memory yang di-attach proses worker {nama shm: SharedMemory}
+_attached = {}
+
+
+class FrameRef(tuple):
+    """Referensi frame di shared memory: (nama shm, offset, shape, dtype) - dikirim ke worker ganti frame"""
+
+
+def frame_ref(frame):
+    """
+    Buat FrameRef jika frame berada di ring milik proses ini
+
+    Returns:
+        FrameRef, atau None jika frame bukan view ring (harus dikirim biasa)
+    """
+    if not isinstance(frame, np.ndarray) or not frame.flags['C_CONTIGUOUS']:
+        return None
+
+    address = frame.__array_interface__['data'][0]
+    for ring in _local_rings.values():
+        offset = address - ring.base_address
+        if 0 <= offset and offset + frame.nbytes <= ring.total_bytes:
+            return FrameRef((ring.name, offset, frame.shape, frame.dtype.str))
+    return None
+
+
+def resolve_frame(ref):
+    """View NumPy dari FrameRef (di proses worker, shared memory di-attach sekali per ring)"""
+    name, offset, shape, dtype = ref
+    shm = _attached.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+
+def to_shared(frames):
+    """Ganti frame yang berada di ring dengan FrameRef (sebelum dikirim ke worker)"""
+    return [frame_ref(frame) or frame for frame in frames]
+
+
+def from_shared(frames):
+    """Kebalikan to_shared() di proses worker"""
+    return [resolve_frame(frame) if isinstance(frame, FrameRef) else frame for frame in frames]
+
+
+class SharedFrameRing:
+    """
+    Class ring buffer slot frame berukuran tetap di shared memory
+
+    Metadata slot (seq, timestamp, pin) hanya ada di proses pemilik dan
+    dilindungi lock; proses worker cukup menerima FrameRef selama pemilik
+    menahan (pin) slot tersebut. Slot yang di-pin tidak pernah ditimpa,
+    jadi view tetap valid sampai release().
+    """
+
+    def __init__(self, frame_shape, slots=config.FRAME_RING_SLOTS):
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.slot_bytes = int(np.prod(self.frame_shape))
+        self.total_bytes = self.slot_bytes * slots
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.total_bytes)
+        self.name = self.shm.name
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.base_address = self.frames.__array_interface__['data'][0]
+
+        self.seqs = [-1] * slots  # Seq frame di slot (-1 = kosong / sedang ditulis)
+        self.timestamps = [0.0] * slots
+        self.pins = [0] * slots  # Jumlah pemakai slot (penulis / frame yang sedang diproses)
+        self.lock = Lock()
+        self.next_seq = 0
+        self.last_read_seq = -1
+
+        # Statistik
+        self.frames_read = 0
+        self.frames_rejected = 0  # Tidak ada slot bebas (semua sedang diproses)
+
+        _local_rings[self.name] = self
+
+    def acquire(self):
+        """
+        Ambil slot untuk ditulis: slot kosong, atau frame tertua yang tidak di-pin
+
+        Returns:
+            (slot, view frame) atau None jika semua slot sedang dipakai
+        """
+        with self.lock:
+            free = [slot for slot in range(self.slots) if self.pins[slot] == 0]
+            if not free:
+                self.frames_rejected += 1
+                return None
+
+            slot = min(free, key=lambda s: self.seqs[s])
+            self.seqs[slot] = -1
+            self.pins[slot] = 1
+        return slot, self.frames[slot]
+
+    def publish(self, slot, timestamp):
+        """Tandai slot selesai ditulis, return seq frame"""
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.seqs[slot] = seq
+            self.timestamps[slot] = timestamp
+            self.pins[slot] = 0
+        return seq
+
+    def cancel(self, slot):
+        """Batalkan penulisan slot (mis. read kamera gagal)"""
+        with self.lock:
+            self.seqs[slot] = -1
+            self.pins[slot] = 0
+
+    def write(self, frame, timestamp):
+        """Copy frame ke slot berikutnya, return seq atau None jika semua slot sedang dipakai"""
+        acquired = self.acquire()
+        if acquired is None:
+            return None
+        slot, view = acquired
+        np.copyto(view, frame)
+        return self.publish(slot, timestamp)
+
+    def latest(self):
+        """
+        Ambil frame terbaru yang belum diambil dan pin slotnya (wajib release())
+
+        Returns:
+            (view frame, seq, timestamp) atau None jika belum ada frame baru
+        """
+        with self.lock:
+            slot = max(range(self.slots), key=lambda s: self.seqs[s])
+            seq = self.seqs[slot]
+            if seq <= self.last_read_seq:
+                return None
+            self.last_read_seq = seq
+            self.frames_read += 1
+            self.pins[slot] += 1
+            timestamp = self.timestamps[slot]
+        return self.frames[slot], seq, timestamp
+
+    def pending(self):
+        """1 jika ada frame baru yang belum diambil, selain itu 0"""
+        with self.lock:
+            return int(max(self.seqs) > self.last_read_seq)
+
+    def frames_dropped(self):
+        """Frame yang tidak pernah diambil konsumen (dilewati / ditimpa) + ditolak karena ring penuh"""
+        with self.lock:
+            waiting = int(max(self.seqs) > self.last_read_seq)
+            return self.next_seq - self.frames_read - waiting + self.frames_rejected
+
+    def release(self, frame):
+        """Lepas pin slot frame dari latest() setelah selesai dipakai"""
+        offset = frame.__array_interface__['data'][0] - self.base_address
+        if not 0 <= offset < self.total_bytes:
+            return
+        slot = offset // self.slot_bytes
+        with self.lock:
+            self.pins[slot] = max(0, self.pins[slot] - 1)
+
+    def close(self):
+        """Hapus shared memory (view yang masih dipegang tetap bisa dibaca sampai dilepas)"""
+        _local_rings.pop(self.name, None)
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Masih ada view frame yang dipegang, mapping dilepas saat view dibuang
+        self.shm.unlink()
@@ -0,0 +1,143 @@
+"""
+Frame Skip Controller
+Modul pengatur frame skip otomatis berdasarkan latency pipeline yang terukur
+Menggantikan pengaturan manual +/- untuk kiosk headless
+"""
+
+import math
+import time
+from threading import Lock
+import config
+
+
+class AdaptiveFrameSkip:
+    """
+    Class untuk mengatur rasio frame skip (dan opsional resolusi deteksi)
+
+    Setiap interval kontrol, controller menghitung:
+    - capacity skip: skip minimum agar thread processing tidak tertinggal
+      (capture_fps x latency / utilisasi maksimum)
+    - target skip: skip agar laju frame diproses mendekati TARGET_PROCESSING_FPS
+    Skip yang dipakai adalah yang terbesar dari keduanya, berubah maksimal
+    satu langkah per interval supaya tidak berosilasi.
+    """
+
+    def __init__(self, initial_skip=2,
+                 target_fps=config.TARGET_PROCESSING_FPS,
+                 latency_budget_ms=config.LATENCY_BUDGET_MS,
+                 max_skip=config.MAX_FRAME_SKIP,
+                 interval=config.FRAME_SKIP_CONTROL_INTERVAL,
+                 resolution_levels=None,
+                 on_resolution_change=None):
+        self.skip = initial_skip
+        self.target_fps = target_fps
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.max_skip = max_skip
+        self.interval = interval
+        self.max_utilization = 0.8  # Sisakan ruang untuk lonjakan jumlah wajah
+
+        # Resolusi deteksi opsional: list ukuran dari besar ke kecil
+        self.resolution_levels = resolution_levels or []
+        self.resolution_index = 0
+        self.on_resolution_change = on_resolution_change
+
+        # Pengukuran (EMA)
+        self.alpha = 0.2
+        self.latency = None
+        self.stage_latency = {}
+        self.queue_depth = 0.0
+        self.captured_frames = 0  # Ditambah dari semua thread capture kamera
+        self.capture_lock = Lock()
+        self.capture_fps = 0.0
+
+        self.last_decision = time.monotonic()
+        self.decisions = []  # Riwayat keputusan (untuk tuning)
+
+    def _ema(self, old, new):
+        return new if old is None else (1 - self.alpha) * old + self.alpha * new
+
+    def record_capture(self):
+        """Dipanggil thread capture setiap frame diterima dari kamera"""
+        with self.capture_lock:
+            self.captured_frames += 1
+
+    def record_processing(self, latency, queue_depth=0, stage_latency=None):
+        """
+        Catat hasil satu frame yang diproses
+
+        Args:
+            latency: Total waktu proses frame (detik)
+            queue_depth: Jumlah frame menunggu di queue saat frame diambil
+            stage_latency: Optional dict {stage: detik}, mis. detect/recognize
+
+        Returns:
+            Frame skip yang harus dipakai
+        """
+        self.latency = self._ema(self.latency, latency)
+        self.queue_depth = self._ema(self.queue_depth, queue_depth)
+        for stage, value in (stage_latency or {}).items():
+            self.stage_latency[stage] = self._ema(self.stage_latency.get(stage), value)
+
+        now = time.monotonic()
+        elapsed = now - self.last_decision
+        if elapsed >= self.interval:
+            with self.capture_lock:
+                captured, self.captured_frames = self.captured_frames, 0
+            self.capture_fps = captured / elapsed
+            self.last_decision = now
+            self._decide()
+
+        return self.skip
+
+    def _decide(self):
+        """Hitung skip baru (dan resolusi) lalu log jika berubah"""
+        if self.latency is None or self.capture_fps <= 0:
+            return
+
+        capacity_skip = math.ceil(self.capture_fps * self.latency / self.max_utilization)
+        target_skip = math.ceil(self.capture_fps / self.target_fps) if self.target_fps else 1
+        desired = max(1, min(self.max_skip, max(capacity_skip, target_skip)))
+
+        # Queue menumpuk -> processing tertinggal walau perhitungan bilang cukup
+        if self.queue_depth >= 1.5:
+            desired = min(self.max_skip, max(desired, self.skip + 1))
+
+        old_skip = self.skip
+        if desired > self.skip:
+            self.skip += 1
+        elif desired < self.skip:
+            self.skip -= 1
+
+        old_resolution = self.resolution_index
+        if self.resolution_levels:
+            # Latency per frame di atas budget tidak bisa diatasi dengan skip -> turunkan resolusi
+            if self.latency > self.latency_budget and self.resolution_index < len(self.resolution_levels) - 1:
+                self.resolution_index += 1
+            elif self.latency < self.latency_budget * 0.5 and self.resolution_index > 0:
+                self.resolution_index -= 1
+
+            if self.resolution_index != old_resolution and self.on_resolution_change:
+                self.on_resolution_change(self.resolution_levels[self.resolution_index])
+
+        if self.skip != old_skip or self.resolution_index != old_resolution:
+            self._log(old_skip, capacity_skip, target_skip)
+
+    def _log(self, old_skip, capacity_skip, target_skip):
+        stages = " ".join(f"{stage}={value * 1000:.0f}ms" for stage, value in self.stage_latency.items())
+        decision = {
+            'time': time.time(),
+            'skip': self.skip,
+            'latency_ms': self.latency * 1000,
+            'capture_fps': self.capture_fps,
+            'queue_depth': self.queue_depth,
+            'resolution': self.resolution_levels[self.resolution_index] if self.resolution_levels else None
+        }
+        self.decisions.append(decision)
+        del self.decisions[:-100]
+
+        message = (f"[AutoSkip] skip {old_skip}->{self.skip} | latency={decision['latency_ms']:.0f}ms "
+                   f"({stages}) capture={self.capture_fps:.1f}fps queue={self.queue_depth:.1f} "
+                   f"| capacity={capacity_skip} target={target_skip}")
+        if self.resolution_levels:
+            message += f" | resolusi deteksi={decision['resolution']}"
+        print(message)
@@ -0,0 +1,124 @@
+"""
+Identity Cache
+Modul cache identitas per track wajah
+Track yang sudah dikonfirmasi sebagai seseorang tidak perlu di-embed ulang
+setiap frame; cukup diverifikasi ulang setiap N frame atau saat geometri
+box berubah tajam (wajah berganti / tracker salah sambung)
+"""
+
+import config
+from face_tracker import iou_matrix, locations_to_boxes
+
+
+class TrackIdentityCache:
+    """Class untuk menyimpan identitas yang sudah dikonfirmasi per track ID"""
+
+    def __init__(self, reverify_interval=config.IDENTITY_REVERIFY_INTERVAL,
+                 confirm_count=config.IDENTITY_CONFIRM_COUNT,
+                 min_iou=config.IDENTITY_MIN_IOU,
+                 revoke_count=config.IDENTITY_REVOKE_COUNT):
+        self.reverify_interval = reverify_interval  # Verifikasi ulang setiap N frame diproses
+        self.confirm_count = confirm_count  # Jumlah recognition berturut-turut untuk konfirmasi
+        self.min_iou = min_iou  # IoU minimum box saat ini vs box saat verifikasi terakhir
+        self.revoke_count = revoke_count  # Verifikasi ulang "Unknown" berturut-turut sebelum identitas dicabut
+
+        # {track_id: {'name', 'confidence', 'box', 'streak', 'unknown_streak', 'age'}}
+        self.entries = {}
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+
+    def _geometry_changed(self, entry, box):
+        """Cek perubahan box yang tajam dibanding verifikasi terakhir"""
+        if iou_matrix(entry['box'][None, :], box[None, :])[0, 0] < self.min_iou:
+            return True
+
+        area_old = (entry['box'][2] - entry['box'][0]) * (entry['box'][3] - entry['box'][1])
+        area_new = (box[2] - box[0]) * (box[3] - box[1])
+        ratio = area_new / max(area_old, 1e-6)
+        return ratio < 0.5 or ratio > 2.0
+
+    def lookup(self, track_id, face_location):
+        """
+        Ambil identitas track dari cache
+
+        Args:
+            track_id: Track ID dari FaceTracker
+            face_location: (top, right, bottom, left) saat ini
+
+        Returns:
+            (name, confidence) jika cache valid, None jika perlu recognition
+        """
+        entry = self.entries.get(track_id)
+        if entry is None or entry['streak'] < self.confirm_count:
+            self.misses += 1
+            return None
+
+        box = locations_to_boxes([face_location])[0]
+        entry['age'] += 1
+        if entry['age'] >= self.reverify_interval or self._geometry_changed(entry, box):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry['name'], entry['confidence']
+
+    def update(self, track_id, face_location, name, confidence):
+        """
+        Simpan hasil recognition untuk track
+
+        Returns:
+            (name, confidence) yang dipakai - identitas yang sudah dikonfirmasi
+            dipertahankan jika verifikasi ulang sesekali menghasilkan "Unknown",
+            tetapi dicabut jika box berubah tajam (kemungkinan orang lain) atau
+            "Unknown" berulang revoke_count kali berturut-turut
+        """
+        box = locations_to_boxes([face_location])[0]
+        entry = self.entries.get(track_id)
+
+        if name == "Unknown":
+            if (entry is not None and entry['streak'] >= self.confirm_count
+                    and not self._geometry_changed(entry, box)):
+                entry['unknown_streak'] += 1
+                if entry['unknown_streak'] < self.revoke_count:
+                    # Wajah sempat menoleh/blur: tetap orang yang sama, verifikasi lagi nanti
+                    entry['box'] = box
+                    entry['age'] = 0
+                    return entry['name'], entry['confidence']
+            self.entries.pop(track_id, None)
+            return name, confidence
+
+        if entry is not None and entry['name'] == name:
+            entry['streak'] += 1
+        else:
+            entry = {'name': name, 'streak': 1}
+            self.entries[track_id] = entry
+
+        entry['unknown_streak'] = 0
+        entry['confidence'] = confidence
+        entry['box'] = box
+        entry['age'] = 0
+        return name, confidence
+
+    def latest(self, track_id):
+        """Identitas dari update() terakhir track ini (belum tentu dikonfirmasi)"""
+        entry = self.entries.get(track_id)
+        if entry is None:
+            return "Unknown", 0
+        return entry['name'], entry['confidence']
+
+    def remove(self, track_ids):
+        """Hapus entry untuk track yang sudah tidak aktif"""
+        for track_id in track_ids:
+            self.entries.pop(track_id, None)
+
+    def get_stats(self):
+        """Statistik cache: hits, misses, hit rate"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0,
+            'tracks': len(self.entries)
+        }
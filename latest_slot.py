@@ -0,0 +1,70 @@
+"""
+Latest Slot
+Modul hand-off antar thread tanpa busy-polling
+LatestValueSlot menyimpan satu nilai terbaru per key (mis. per kamera):
+put() menimpa nilai lama yang belum diambil (dikembalikan ke pemanggil agar
+resource-nya bisa dilepas), get() memblok pada Condition sampai ada nilai
+baru, wake() atau close(), jadi thread konsumen tidur saat sistem idle.
+"""
+
+from threading import Condition
+
+
+class LatestValueSlot:
+    """Class slot nilai terbaru per key dengan notifikasi Condition"""
+
+    def __init__(self):
+        self.condition = Condition()
+        self.values = {}  # {key: nilai}, urutan dict = urutan tiba
+        self.closed = False
+        self.woken = False
+
+        # Statistik
+        self.values_put = 0
+        self.values_overwritten = 0  # Ditimpa nilai baru sebelum diambil
+
+    def put(self, value, key=None):
+        """
+        Simpan nilai terbaru untuk key dan bangunkan konsumen
+
+        Returns:
+            Nilai lama key ini yang belum diambil (ditimpa), atau None
+        """
+        with self.condition:
+            previous = self.values.pop(key, None)
+            self.values[key] = value
+            self.values_put += 1
+            if previous is not None:
+                self.values_overwritten += 1
+            self.condition.notify()
+        return previous
+
+    def get(self, timeout=None):
+        """
+        Ambil nilai yang paling lama menunggu, blok sampai ada nilai
+
+        Returns:
+            Nilai, atau None jika timeout, wake() atau close()
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.values or self.woken or self.closed, timeout)
+            self.woken = False
+            if not self.values:
+                return None
+            return self.values.pop(next(iter(self.values)))
+
+    def wake(self):
+        """Bangunkan get() yang sedang menunggu tanpa nilai (mis. ada perintah baru)"""
+        with self.condition:
+            self.woken = True
+            self.condition.notify_all()
+
+    def close(self):
+        """Bangunkan semua konsumen untuk berhenti; get() tidak memblok lagi"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        with self.condition:
+            return len(self.values)
@@ -0,0 +1,302 @@
+"""
+Metrics
+Modul instrumentasi latency per tahap (capture, deteksi, embedding,
+matching, presensi, Supabase, render) untuk mencari bottleneck di perangkat
+Setiap tahap menyimpan N sampel terakhir (rolling window) sehingga persentil
+p50/p95/p99 mencerminkan kondisi terkini. Persentil baru dihitung saat
+di-scrape / di-log, jadi biaya per pengukuran hanya dua perf_counter() dan
+satu penulisan ke list. Diekspos dalam format teks Prometheus (/metrics)
+dan baris log [Metrics] periodik.
+"""
+
+import functools
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+import config
+
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "attendance"
+
+# Urutan tahap di baris log (tahap lain menyusul sesuai urutan pertama kali diukur)
+LOG_ORDER = ('capture', 'detect', 'embed', 'match', 'recognize', 'render', 'mark_attendance', 'save_kehadiran',
+             'glass_to_decision', 'glass_to_display')
+
+# Timer no-op saat metrics nonaktif (nullcontext bisa dipakai ulang)
+NULL_TIMER = nullcontext()
+
+
+class RollingHistogram:
+    """Class jendela N sampel terakhir (detik) + total count & sum sejak start"""
+
+    def __init__(self, window=config.METRICS_WINDOW):
+        self.window = window
+        self.samples = [0.0] * window
+        self.count = 0
+        self.sum = 0.0
+        self.lock = Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.samples[self.count % self.window] = value
+            self.count += 1
+            self.sum += value
+
+    def recent(self, n):
+        """n sampel terakhir (maksimal window), urut dari yang terlama"""
+        with self.lock:
+            n = min(n, self.count, self.window)
+            end = self.count % self.window
+            if n <= end:
+                return self.samples[end - n:end]
+            return self.samples[self.window - (n - end):] + self.samples[:end]
+
+    def snapshot(self, quantiles=QUANTILES):
+        """{'count', 'sum', 'quantiles': {q: detik}} dari sampel di window"""
+        with self.lock:
+            count, total = self.count, self.sum
+            values = sorted(self.samples[:min(count, self.window)])
+        return {
+            'count': count,
+            'sum': total,
+            'quantiles': {q: values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+                          for q in quantiles}
+        }
+
+
+class _Timer:
+    """Context manager pengukur durasi satu tahap"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class MetricsRegistry:
+    """
+    Class kumpulan timer, counter dan gauge
+
+    Proses worker (PIPELINE_MODE = "process") punya registry sendiri;
+    sampelnya ditarik lewat export() / absorb() oleh collector yang
+    didaftarkan proxy worker, sehingga endpoint & log tetap satu.
+    """
+
+    def __init__(self, enabled=config.METRICS_ENABLED, window=config.METRICS_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.collectors = []
+        self.lock = Lock()
+        self._exported_counts = {}
+        self._exported_counters = {}
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, RollingHistogram(self.window))
+        return histogram
+
+    def timer(self, name):
+        """
+        Context manager untuk mengukur satu tahap
+
+        Usage:
+            with metrics.timer('detect'):
+                ...
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self._histogram(name))
+
+    def timed(self, name):
+        """Decorator: ukur setiap pemanggilan fungsi sebagai tahap name"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds):
+        """Catat durasi (detik) yang sudah diukur sendiri"""
+        if self.enabled:
+            self._histogram(name).observe(seconds)
+
+    def increment(self, name, value=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+
+    def add_collector(self, collector):
+        """Callable tanpa argumen yang dipanggil sebelum snapshot (mis. tarik sampel worker)"""
+        self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def export(self):
+        """Sampel & counter baru sejak export() sebelumnya (dipanggil di proses worker)"""
+        timers = {}
+        for name, histogram in list(self.histograms.items()):
+            new = histogram.count - self._exported_counts.get(name, 0)
+            if new > 0:
+                timers[name] = histogram.recent(new)
+                self._exported_counts[name] = histogram.count
+
+        with self.lock:
+            counters = {name: value - self._exported_counters.get(name, 0)
+                        for name, value in self.counters.items()
+                        if value != self._exported_counters.get(name, 0)}
+            self._exported_counters = dict(self.counters)
+        return {'timers': timers, 'counters': counters}
+
+    def absorb(self, exported):
+        """Gabungkan hasil export() dari proses lain"""
+        for name, samples in exported['timers'].items():
+            histogram = self._histogram(name)
+            for value in samples:
+                histogram.observe(value)
+        for name, value in exported['counters'].items():
+            self.increment(name, value)
+
+    def collect(self):
+        for collector in list(self.collectors):
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠ Collector metrics gagal: {e}")
+
+    def snapshot(self):
+        """
+        Returns:
+            {'timers': {nama: snapshot histogram}, 'counters': {...}, 'gauges': {...}}
+        """
+        self.collect()
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            'timers': {name: histogram.snapshot() for name, histogram in list(self.histograms.items())},
+            'counters': counters,
+            'gauges': dict(self.gauges)
+        }
+
+    def prometheus_text(self):
+        """Semua metrics dalam format teks Prometheus"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_stage_seconds Latency per tahap (persentil dari {self.window} sampel terakhir)",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds summary"
+        ]
+        for name, timer in sorted(snapshot['timers'].items()):
+            for q, value in timer['quantiles'].items():
+                lines.append(f'{METRIC_PREFIX}_stage_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{name}"}} {timer["sum"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{name}"}} {timer["count"]}')
+
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+            lines.append(f"{METRIC_PREFIX}_{name}_total {value}")
+
+        for name, value in sorted(snapshot['gauges'].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {float(value):.6g}")
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self):
+        """Satu baris ringkasan p50/p95 (ms) per tahap untuk log"""
+        snapshot = self.snapshot()
+        timers = snapshot['timers']
+        names = [name for name in LOG_ORDER if name in timers] + sorted(set(timers) - set(LOG_ORDER))
+
+        parts = []
+        for name in names:
+            quantiles = timers[name]['quantiles']
+            parts.append(f"{name} {quantiles[0.5] * 1000:.1f}/{quantiles[0.95] * 1000:.1f}")
+        parts += [f"{name} {value:.1f}" for name, value in sorted(snapshot['gauges'].items())]
+        return "[Metrics] p50/p95 ms: " + (" | ".join(parts) if parts else "belum ada sampel")
+
+
+# Registry global (satu per proses)
+metrics = MetricsRegistry()
+
+
+class MetricsServer:
+    """Class server HTTP lokal: GET /metrics (format teks Prometheus)"""
+
+    def __init__(self, registry=metrics, port=config.METRICS_PORT, host=config.METRICS_HOST):
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Tanpa log per scrape
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return MetricsHandler
+
+    def start(self):
+        """Jalankan server di background thread"""
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"✓ Metrics: http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class MetricsReporter:
+    """Class thread yang mencetak MetricsRegistry.summary_line() setiap interval detik"""
+
+    def __init__(self, registry=metrics, interval=config.METRICS_LOG_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self.stop_event = Event()
+        self.thread = None
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            print(self.registry.summary_line())
+
+    def start(self):
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
@@ -0,0 +1,100 @@
+"""
+Model Quantizer
+Modul kuantisasi INT8 model ONNX (YOLO face & ArcFace recognition)
+dengan ONNX Runtime quantization
+- dynamic: bobot INT8, aktivasi dikuantisasi saat runtime (tanpa kalibrasi)
+- static: bobot + aktivasi INT8 (QDQ), skala aktivasi dari gambar kalibrasi
+"""
+
+import os
+import cv2
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                      quantize_dynamic, quantize_static)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+from face_detector_onnx import letterbox
+
+
+class BlobCalibrationReader(CalibrationDataReader):
+    """Data reader kalibrasi dari list blob NCHW yang sudah di-preprocess"""
+
+    def __init__(self, input_name, blobs):
+        self.input_name = input_name
+        self.iterator = iter(blobs)
+
+    def get_next(self):
+        blob = next(self.iterator, None)
+        return None if blob is None else {self.input_name: blob}
+
+
+def detector_blobs(images, input_size):
+    """
+    Preprocess gambar untuk model YOLO face (letterbox sama dengan ONNXFaceDetector)
+
+    Args:
+        images: List gambar BGR
+        input_size: (tinggi, lebar) input model
+
+    Returns:
+        List blob (1, 3, H, W)
+    """
+    return [letterbox(image, input_size)[0] for image in images]
+
+
+def recognition_blobs(rec_model, aligned_faces):
+    """
+    Preprocess wajah ter-align untuk model recognition (sama dengan get_feat InsightFace)
+
+    Args:
+        rec_model: Model recognition InsightFace (input_mean, input_std, input_size)
+        aligned_faces: List wajah 112x112
+
+    Returns:
+        Blob (N, 3, 112, 112)
+    """
+    return cv2.dnn.blobFromImages(
+        aligned_faces, 1.0 / rec_model.input_std, rec_model.input_size,
+        (rec_model.input_mean,) * 3, swapRB=True
+    )
+
+
+def quantize_model(input_path, output_path, mode="dynamic", input_name=None, calibration_blobs=None):
+    """
+    Kuantisasi satu model ONNX ke INT8
+
+    Args:
+        input_path: Model FP32 (.onnx)
+        output_path: Path model INT8
+        mode: "dynamic" atau "static"
+        input_name: Nama input model (wajib untuk static)
+        calibration_blobs: List blob kalibrasi (wajib untuk static)
+    """
+    if mode not in ("dynamic", "static"):
+        raise ValueError(f"Mode kuantisasi tidak dikenal: {mode}")
+    if mode == "static" and not calibration_blobs:
+        raise ValueError("Kuantisasi static membutuhkan gambar kalibrasi")
+
+    # Pre-processing (shape inference + optimasi graph) yang disarankan ONNX Runtime
+    preprocessed_path = output_path + ".prep.onnx"
+    try:
+        quant_pre_process(input_path, preprocessed_path, skip_symbolic_shape=True)
+        source_path = preprocessed_path
+    except Exception as e:
+        print(f"⚠ Pre-processing kuantisasi gagal, pakai model asli: {e}")
+        source_path = input_path
+
+    try:
+        if mode == "dynamic":
+            # ConvInteger di CPU ONNX Runtime hanya mendukung bobot uint8
+            quantize_dynamic(source_path, output_path, weight_type=QuantType.QUInt8)
+        else:
+            quantize_static(
+                source_path, output_path,
+                BlobCalibrationReader(input_name, calibration_blobs),
+                quant_format=QuantFormat.QDQ,
+                per_channel=True,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8
+            )
+    finally:
+        if os.path.exists(preprocessed_path):
+            os.remove(preprocessed_path)
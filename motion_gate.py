@@ -0,0 +1,93 @@
+"""
+Motion Gate
+Modul gating murah sebelum inference YOLO
+Frame diperkecil ke grayscale resolusi rendah lalu dibandingkan dengan
+background (running average). YOLO hanya dijalankan jika ada perubahan
+scene, masih ada wajah yang di-track, atau sudah waktunya refresh paksa.
+"""
+
+import time
+import cv2
+import numpy as np
+import config
+
+
+class MotionGate:
+    """Class untuk memutuskan apakah frame perlu dideteksi YOLO"""
+
+    def __init__(self, width=config.MOTION_GATE_WIDTH,
+                 pixel_threshold=config.MOTION_PIXEL_THRESHOLD,
+                 min_area=config.MOTION_MIN_AREA,
+                 refresh_interval=config.MOTION_REFRESH_INTERVAL):
+        self.width = width  # Lebar frame kecil untuk differencing
+        self.pixel_threshold = pixel_threshold  # Selisih intensitas minimum per pixel
+        self.min_area = min_area  # Fraksi pixel berubah minimum agar dianggap ada gerakan
+        self.refresh_interval = refresh_interval  # Detik maksimum tanpa YOLO
+        self.learning_rate = 0.05  # Kecepatan adaptasi background
+
+        self.background = None
+        self.last_detection = 0.0
+        self.last_motion_area = 0.0
+
+        # Statistik
+        self.frames_checked = 0
+        self.frames_gated = 0
+
+    def _preprocess(self, frame):
+        height, width = frame.shape[:2]
+        small_height = max(1, int(height * self.width / width))
+        small = cv2.resize(frame, (self.width, small_height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def motion_area(self, frame):
+        """
+        Hitung fraksi pixel yang berubah terhadap background dan update background
+
+        Returns:
+            Fraksi pixel berubah (0-1)
+        """
+        gray = self._preprocess(frame)
+
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return 1.0
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        return changed
+
+    def should_process(self, frame, has_active_tracks=False, now=None):
+        """
+        Putuskan apakah YOLO perlu dijalankan pada frame ini
+
+        Args:
+            frame: Frame BGR
+            has_active_tracks: True jika masih ada wajah yang di-track
+                               (orang berdiri diam di depan kamera)
+            now: Waktu sekarang (default time.monotonic())
+
+        Returns:
+            True jika frame perlu dideteksi
+        """
+        now = time.monotonic() if now is None else now
+        self.frames_checked += 1
+        self.last_motion_area = self.motion_area(frame)
+
+        if (has_active_tracks
+                or self.last_motion_area >= self.min_area
+                or now - self.last_detection >= self.refresh_interval):
+            self.last_detection = now
+            return True
+
+        self.frames_gated += 1
+        return False
+
+    def get_stats(self):
+        """Statistik gating"""
+        return {
+            'frames_checked': self.frames_checked,
+            'frames_gated': self.frames_gated,
+            'gated_ratio': self.frames_gated / self.frames_checked if self.frames_checked else 0.0
+        }
@@ -0,0 +1,110 @@
+"""
+Overlay Renderer
+Modul untuk menggambar kotak & label wajah di frame tampilan
+Semua wajah digambar dalam satu pass; background label semi-transparent
+hanya di-blend pada area label (ROI), bukan copy + blend satu frame penuh
+per wajah. Ukuran teks per label di-cache.
+"""
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_PADDING = 8
+LABEL_OPACITY = 0.85
+
+# Warna per status: (warna box, warna aksen/label)
+STATUS_COLORS = {
+    'recognized': ((46, 204, 113), (39, 174, 96)),  # Green modern
+    'capturing': ((52, 152, 219), (41, 128, 185)),  # Blue modern
+    'unknown': ((231, 76, 60), (192, 57, 43))  # Red modern
+}
+
+
+class OverlayRenderer:
+    """Class untuk menggambar anotasi wajah - Modern & Clean UI"""
+
+    def __init__(self, corner_length=20, corner_thickness=2, max_cached_labels=1024):
+        self.corner_length = corner_length  # Panjang corner highlight
+        self.corner_thickness = corner_thickness  # Ketebalan corner
+        self.max_cached_labels = max_cached_labels
+        self.text_metrics = {}  # Cache {(label, font_scale): ((lebar, tinggi), baseline)}
+
+    def _label_style(self, name, status):
+        """Teks label dan ukuran font sesuai status"""
+        if status == "capturing":
+            return f"Capturing: {name}", 0.5
+        if name == "Unknown":
+            return "Unknown", 0.5
+        return f"{name}", 0.6
+
+    def _text_size(self, label, font_scale):
+        key = (label, font_scale)
+        metrics = self.text_metrics.get(key)
+        if metrics is None:
+            if len(self.text_metrics) >= self.max_cached_labels:
+                self.text_metrics.clear()
+            metrics = cv2.getTextSize(label, FONT, font_scale, 1)
+            self.text_metrics[key] = metrics
+        return metrics
+
+    def _draw_box(self, frame, face_location, color, accent_color):
+        """Bounding box tipis dengan corner highlights"""
+        top, right, bottom, left = face_location
+        length = self.corner_length
+        thickness = self.corner_thickness
+
+        for x, y, dx, dy in ((left, top, 1, 1), (right, top, -1, 1), (left, bottom, 1, -1), (right, bottom, -1, -1)):
+            cv2.line(frame, (x, y), (x + dx * length, y), accent_color, thickness)
+            cv2.line(frame, (x, y), (x, y + dy * length), accent_color, thickness)
+
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 1)
+
+    def _draw_label(self, frame, face_location, label, font_scale, accent_color):
+        """Label dengan background semi-transparent (blend hanya di area label)"""
+        top, _, bottom, left = face_location
+        (text_width, text_height), _ = self._text_size(label, font_scale)
+
+        label_top = top - text_height - LABEL_PADDING * 2 - 5
+        if label_top < 0:
+            label_top = bottom + 5
+        label_bottom = label_top + text_height + LABEL_PADDING * 2
+        label_right = left + text_width + LABEL_PADDING * 2
+
+        # Area label yang berada di dalam frame (sama dengan cv2.rectangle yang ter-clip)
+        height, width = frame.shape[:2]
+        y0, y1 = max(0, label_top), min(height, label_bottom + 1)
+        x0, x1 = max(0, left), min(width, label_right + 1)
+        if y0 < y1 and x0 < x1:
+            roi = frame[y0:y1, x0:x1]
+            background = np.empty_like(roi)
+            background[:] = accent_color
+            cv2.addWeighted(background, LABEL_OPACITY, roi, 1 - LABEL_OPACITY, 0, dst=roi)
+
+        # Text putih bersih
+        cv2.putText(
+            frame,
+            label,
+            (left + LABEL_PADDING, label_top + text_height + LABEL_PADDING),
+            FONT,
+            font_scale,
+            (255, 255, 255),  # White text
+            1,  # Thickness 1 untuk clean look
+            cv2.LINE_AA  # Anti-aliased
+        )
+
+    def draw(self, frame, annotations):
+        """
+        Gambar semua wajah di frame (in-place)
+
+        Args:
+            frame: Frame BGR
+            annotations: List (face_location, name, confidence, status)
+        """
+        for face_location, name, _, status in annotations:
+            color, accent_color = STATUS_COLORS.get(status, STATUS_COLORS['unknown'])
+            face_location = tuple(int(v) for v in face_location)
+            label, font_scale = self._label_style(name, status)
+
+            self._draw_box(frame, face_location, color, accent_color)
+            self._draw_label(frame, face_location, label, font_scale, accent_color)
@@ -0,0 +1,288 @@
+"""
+Pipeline Workers
+Modul proses worker untuk deteksi (YOLO) dan recognition (ArcFace)
+Dipakai jika config.PIPELINE_MODE = "process": model berjalan di proses
+terpisah sehingga pre/post-processing Python-nya tidak berebut GIL dengan
+thread capture & tampilan. DetectorWorker dan RecognizerWorker punya
+interface yang sama dengan YOLOFaceDetector dan ArcFaceRecognizer, jadi
+FacePipeline tidak perlu tahu modelnya berjalan di proses lain.
+Komunikasi lewat multiprocessing.Queue berukuran terbatas; frame yang
+berada di ring shared memory (frame_ring) dikirim sebagai FrameRef, bukan
+di-pickle. Worker yang crash atau hang di-restart otomatis. Metrics latency
+worker ditarik ke registry proses utama saat di-scrape / di-log.
+"""
+
+import multiprocessing
+import os
+import time
+from queue import Empty
+from threading import Lock
+import config
+from frame_ring import from_shared, to_shared
+from metrics import metrics
+
+
+class WorkerCrashed(RuntimeError):
+    """Proses worker mati atau tidak menjawab dalam batas waktu"""
+
+
+def _build_component(kind, num_threads):
+    """Buat komponen model di dalam proses worker"""
+    if kind == "detector":
+        from face_detector_yolo import YOLOFaceDetector
+        return YOLOFaceDetector(num_threads=num_threads)
+    if kind == "recognizer":
+        from face_recognizer_arcface import ArcFaceRecognizer
+        return ArcFaceRecognizer(num_threads=num_threads)
+    raise ValueError(f"Jenis worker tidak dikenal: {kind}")
+
+
+def _worker_main(kind, num_threads, request_queue, response_queue):
+    """
+    Loop proses worker: jalankan method komponen sesuai request
+
+    Request: (call_id, method, args), None untuk berhenti; argumen list
+    frame boleh berisi FrameRef (di-resolve menjadi view shared memory)
+    Response: (call_id, ok, hasil atau pesan error)
+    Method 'export_metrics' mengembalikan metrics.export() milik proses worker
+    """
+    import cv2
+    cv2.setNumThreads(1)  # Resize & warpAffine cukup 1 thread, core dipakai model
+
+    component = _build_component(kind, num_threads)
+    response_queue.put(('ready', True, None))
+
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+
+        call_id, method, args = request
+        args = [from_shared(arg) if isinstance(arg, list) else arg for arg in args]
+        try:
+            if method == 'export_metrics':
+                result = metrics.export()
+            else:
+                result = getattr(component, method)(*args)
+            response_queue.put((call_id, True, result))
+        except Exception as e:
+            response_queue.put((call_id, False, f"{type(e).__name__}: {e}"))
+
+
+class WorkerProcess:
+    """Class untuk satu proses worker dengan queue request/response terbatas"""
+
+    def __init__(self, kind, num_threads=None, queue_size=config.WORKER_QUEUE_SIZE,
+                 call_timeout=config.WORKER_CALL_TIMEOUT, start_timeout=config.WORKER_START_TIMEOUT):
+        self.kind = kind
+        self.num_threads = num_threads
+        self.queue_size = queue_size
+        self.call_timeout = call_timeout
+        self.start_timeout = start_timeout
+
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.request_queue = None
+        self.response_queue = None
+        self.lock = Lock()  # Satu panggilan berjalan pada satu waktu per worker
+        self.next_call_id = 0
+        self.restarts = 0
+
+    def start(self):
+        """Start proses worker dan tunggu sampai model selesai di-load"""
+        self.request_queue = self.context.Queue(maxsize=self.queue_size)
+        self.response_queue = self.context.Queue(maxsize=self.queue_size)
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.kind, self.num_threads, self.request_queue, self.response_queue),
+            name=f"{self.kind}-worker",
+            daemon=True
+        )
+        self.process.start()
+        self._wait_response('ready', self.start_timeout)
+
+    def _wait_response(self, call_id, timeout):
+        """Tunggu response untuk call_id; response lama (sebelum restart/timeout) dibuang"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WorkerCrashed(f"worker {self.kind} tidak menjawab dalam {timeout}s")
+            try:
+                response = self.response_queue.get(timeout=min(0.5, remaining))
+            except Empty:
+                if not self.process.is_alive():
+                    raise WorkerCrashed(f"worker {self.kind} berhenti (exit code {self.process.exitcode})")
+                continue
+            if response[0] == call_id:
+                return response
+
+    def call(self, method, *args):
+        """
+        Jalankan method komponen di proses worker
+
+        Raises:
+            WorkerCrashed: Worker mati / hang (perlu restart)
+            RuntimeError: Method melempar exception di worker
+        """
+        with self.lock:
+            self.next_call_id += 1
+            call_id = self.next_call_id
+            try:
+                self.request_queue.put((call_id, method, args), timeout=self.call_timeout)
+            except Exception:
+                raise WorkerCrashed(f"queue worker {self.kind} penuh")
+            _, ok, result = self._wait_response(call_id, self.call_timeout)
+
+        if not ok:
+            raise RuntimeError(f"Worker {self.kind}: {result}")
+        return result
+
+    def _terminate(self):
+        """Matikan proses paksa dan tutup queue"""
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+        for queue in (self.request_queue, self.response_queue):
+            if queue is not None:
+                queue.cancel_join_thread()
+                queue.close()
+
+    def restart(self):
+        """Restart worker (setelah crash / hang)"""
+        with self.lock:
+            self.restarts += 1
+            self._terminate()
+            self.start()
+
+    def stop(self, timeout=5):
+        """Hentikan worker dengan rapi: kirim sinyal berhenti, paksa jika tidak selesai"""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.request_queue.put(None, timeout=1)
+            except Exception:
+                pass
+            self.process.join(timeout=timeout)
+        self._terminate()
+        self.process = None
+
+
+def default_worker_threads():
+    """Thread inference per worker: core CPU dibagi rata ke worker deteksi & recognition"""
+    return config.WORKER_NUM_THREADS or max(1, (os.cpu_count() or 1) // 2)
+
+
+class _WorkerProxy:
+    """Dasar proxy komponen di proses worker: restart otomatis jika worker crash"""
+
+    kind = None
+
+    def __init__(self, num_threads=None):
+        self.worker = WorkerProcess(self.kind, num_threads or default_worker_threads())
+        self.stopping = False
+        self.worker.start()
+        metrics.add_collector(self.collect_metrics)
+
+    def _restore_state(self):
+        """Kembalikan state komponen setelah worker di-restart"""
+
+    def _call(self, method, *args):
+        """Panggil method di worker, return None jika worker crash (worker di-restart)"""
+        if self.stopping:
+            return None
+        try:
+            return self.worker.call(method, *args)
+        except WorkerCrashed as e:
+            if self.stopping:
+                return None
+            print(f"⚠ {e}, restart worker...")
+            self.worker.restart()
+            self._restore_state()
+            print(f"✓ Worker {self.kind} berjalan lagi (restart ke-{self.worker.restarts})")
+            return None
+
+    def collect_metrics(self):
+        """Tarik sampel metrics worker ke registry proses ini (worker crash ditangani _call tahap)"""
+        if self.stopping or not metrics.enabled:
+            return
+        try:
+            metrics.absorb(self.worker.call('export_metrics'))
+        except (WorkerCrashed, RuntimeError):
+            pass
+
+    @property
+    def restarts(self):
+        return self.worker.restarts
+
+    def stop(self):
+        """Hentikan proses worker"""
+        self.stopping = True
+        metrics.remove_collector(self.collect_metrics)
+        self.worker.stop()
+
+
+class DetectorWorker(_WorkerProxy):
+    """Proxy YOLOFaceDetector yang berjalan di proses worker"""
+
+    kind = "detector"
+
+    def __init__(self, num_threads=None):
+        self.detection_size = None
+        super().__init__(num_threads)
+
+    def _restore_state(self):
+        if self.detection_size is not None:
+            self._call('set_detection_size', self.detection_size)
+
+    def set_detection_size(self, size):
+        self.detection_size = size
+        self._call('set_detection_size', size)
+
+    def detect_faces_with_landmarks_batch(self, frames):
+        """Sama dengan YOLOFaceDetector; frame dilewati (tanpa wajah) jika worker crash"""
+        result = self._call('detect_faces_with_landmarks_batch', to_shared(frames))
+        return result if result is not None else [([], []) for _ in frames]
+
+    def detect_faces_with_landmarks(self, frame):
+        return self.detect_faces_with_landmarks_batch([frame])[0]
+
+    def detect_faces(self, frame):
+        return self.detect_faces_with_landmarks(frame)[0]
+
+
+class RecognizerWorker(_WorkerProxy):
+    """Proxy ArcFaceRecognizer yang berjalan di proses worker"""
+
+    kind = "recognizer"
+
+    def __init__(self, num_threads=None):
+        self.model_file = None
+        self.model_loaded = False
+        self.person_count = 0
+        super().__init__(num_threads)
+
+    def _restore_state(self):
+        if self.model_file is not None:
+            self._call('load_model', self.model_file)
+
+    def load_model(self, filepath=config.MODEL_FILE):
+        """Load galeri di worker, return True jika ada wajah yang dikenal"""
+        self.model_file = filepath
+        self.model_loaded = bool(self._call('load_model', filepath))
+        self.person_count = self._call('get_person_count') or 0
+        return self.model_loaded
+
+    def get_person_count(self):
+        return self.person_count
+
+    def recognize_faces_in_frames(self, frames, face_locations_list, landmarks_list=None):
+        """Sama dengan ArcFaceRecognizer; semua wajah 'Unknown' jika worker crash"""
+        result = self._call('recognize_faces_in_frames', to_shared(frames), face_locations_list, landmarks_list)
+        if result is None:
+            return [[("Unknown", 0.0)] * len(face_locations) for face_locations in face_locations_list]
+        return result
+
+    def recognize_faces_in_frame(self, frame, face_locations, landmarks=None):
+        return self.recognize_faces_in_frames([frame], [face_locations], [landmarks])[0]
@@ -0,0 +1,183 @@
+"""
+Preview Server
+Modul server HTTP lokal untuk kiosk headless (tanpa layar)
+- /        : halaman preview
+- /stream  : preview MJPEG ter-anotasi (FPS rendah)
+- /stats   : status sistem (JSON)
+- /metrics : latency per tahap (format teks Prometheus, lihat metrics.py)
+- /control : perintah pengganti keyboard (POST ?cmd=stats|faster|slower|auto|quit)
+Frame hanya digambar & di-encode JPEG jika ada client yang menonton stream.
+"""
+
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Condition, Thread
+from urllib.parse import parse_qs, urlparse
+import cv2
+import config
+from metrics import metrics
+
+PREVIEW_PAGE = b"""<!DOCTYPE html>
+<html><head><title>GKI Karawaci - Attendance Preview</title></head>
+<body style="margin:0;background:#111;text-align:center">
+<img src="/stream" style="max-width:100%">
+</body></html>
+"""
+
+
+class PreviewServer:
+    """Class server preview MJPEG + status & kontrol sistem"""
+
+    def __init__(self, port=config.PREVIEW_PORT, host=config.PREVIEW_HOST, fps=config.PREVIEW_FPS,
+                 width=config.PREVIEW_WIDTH, quality=config.PREVIEW_JPEG_QUALITY,
+                 status_provider=None, command_handler=None):
+        """
+        Args:
+            status_provider: Callable tanpa argumen -> dict status (untuk /stats)
+            command_handler: Callable(cmd) -> True jika perintah dikenal (untuk /control)
+        """
+        self.interval = 1.0 / fps
+        self.width = width
+        self.quality = quality
+        self.status_provider = status_provider
+        self.command_handler = command_handler
+
+        self.condition = Condition()  # Notifikasi JPEG baru ke semua client stream
+        self.jpeg = None
+        self.frame_id = 0
+        self.clients = 0
+        self.last_publish = 0.0
+        self.frames_encoded = 0
+        self.stopped = False
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class PreviewHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Tanpa log per request
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+        return PreviewHandler
+
+    def start(self):
+        """Jalankan server di background thread"""
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.httpd.server_address[:2]
+        print(f"✓ Preview & kontrol: http://{host}:{port}/")
+        print(f"  Kontrol: curl -X POST 'http://{host}:{port}/control?cmd=stats'")
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def wants_frame(self):
+        """True jika ada client stream dan sudah waktunya frame preview berikutnya"""
+        return self.clients > 0 and time.monotonic() - self.last_publish >= self.interval
+
+    def publish(self, frame):
+        """Encode frame (sudah digambar) ke JPEG dan kirim ke semua client stream"""
+        self.last_publish = time.monotonic()
+
+        height, width = frame.shape[:2]
+        if width > self.width:
+            frame = cv2.resize(frame, (self.width, int(height * self.width / width)), interpolation=cv2.INTER_AREA)
+        with metrics.timer('preview_encode'):
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+
+        with self.condition:
+            self.jpeg = buffer.tobytes()
+            self.frame_id += 1
+            self.frames_encoded += 1
+            self.condition.notify_all()
+
+    def _send_json(self, handler, data, status=200):
+        body = json.dumps(data, default=float).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handle(self, handler, method):
+        url = urlparse(handler.path)
+
+        if url.path == '/' and method == 'GET':
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/html')
+            handler.send_header('Content-Length', str(len(PREVIEW_PAGE)))
+            handler.end_headers()
+            handler.wfile.write(PREVIEW_PAGE)
+        elif url.path == '/stream' and method == 'GET':
+            self._stream(handler)
+        elif url.path == '/stats' and method == 'GET':
+            self._send_json(handler, self._status())
+        elif url.path == '/metrics' and method == 'GET':
+            body = metrics.prometheus_text().encode()
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/plain; version=0.0.4')
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        elif url.path == '/control' and method == 'POST':
+            length = int(handler.headers.get('Content-Length') or 0)
+            params = parse_qs(url.query)
+            params.update(parse_qs(handler.rfile.read(length).decode()) if length else {})
+            command = params.get('cmd', [''])[0]
+            if self.command_handler is None or not self.command_handler(command):
+                self._send_json(handler, {'ok': False, 'error': f"Perintah tidak dikenal: {command}"}, 400)
+            else:
+                self._send_json(handler, {'ok': True, 'cmd': command})
+        else:
+            self._send_json(handler, {'ok': False, 'error': "Not found"}, 404)
+
+    def _status(self):
+        status = self.status_provider() if self.status_provider is not None else {}
+        status['preview'] = {'clients': self.clients, 'frames_encoded': self.frames_encoded}
+        return status
+
+    def _stream(self, handler):
+        """Kirim JPEG terbaru setiap kali ada yang baru (multipart MJPEG) sampai client putus"""
+        with self.condition:
+            self.clients += 1
+            last_id = self.frame_id
+        try:
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+            handler.send_header('Cache-Control', 'no-cache')
+            handler.end_headers()
+
+            while True:
+                with self.condition:
+                    self.condition.wait_for(lambda: self.frame_id != last_id or self.stopped, timeout=5)
+                    if self.stopped:
+                        break
+                    if self.frame_id == last_id:
+                        continue
+                    jpeg, last_id = self.jpeg, self.frame_id
+
+                handler.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n"
+                                    b"Content-Length: %d\r\n\r\n" % len(jpeg))
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client menutup preview
+        finally:
+            with self.condition:
+                self.clients -= 1
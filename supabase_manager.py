@@ -9,6 +9,7 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 import uuid
+from metrics import metrics
 
 # Load environment variables
 load_dotenv()
@@ -38,8 +39,8 @@ class SupabaseManager:
             print(f"✗ Error creating connection pool: {e}")
             self.pool = None
         
-        # Cache untuk ibadah hari ini
-        self.today_ibadah_id = None
+        # Cache id_ibadah per tanggal {date: id_ibadah}
+        self.ibadah_ids = {}
     
     def get_connection(self):
         """Mendapatkan koneksi dari pool"""
@@ -53,15 +54,25 @@ class SupabaseManager:
             self.pool.putconn(conn)
     
     def get_or_create_ibadah_today(self):
+        """Mendapatkan atau membuat Ibadah untuk hari ini"""
+        return self.get_or_create_ibadah(datetime.now())
+    
+    def get_or_create_ibadah(self, waktu):
         """
-        Mendapatkan atau membuat Ibadah untuk hari ini
+        Mendapatkan atau membuat Ibadah untuk tanggal waktu
+        (footage offline dicatat ke ibadah tanggal rekaman, bukan hari ini)
         
+        Args:
+            waktu: datetime presensi
+            
         Returns:
             id_ibadah atau None jika gagal
         """
+        tanggal = waktu.date()
+        
         # Return cached jika sudah ada
-        if self.today_ibadah_id:
-            return self.today_ibadah_id
+        if tanggal in self.ibadah_ids:
+            return self.ibadah_ids[tanggal]
         
         conn = self.get_connection()
         if not conn:
@@ -73,46 +84,46 @@ class SupabaseManager:
             # Ambil konfigurasi dari .env
             jenis_kebaktian = os.getenv('JENIS_KEBAKTIAN', 'Minggu Pagi')
             sesi_ibadah = int(os.getenv('SESI_IBADAH', '1'))
-            today = datetime.now().date()
             
-            # Cari ibadah untuk hari ini
+            # Cari ibadah untuk tanggal ini
             cur.execute("""
                 SELECT id_ibadah FROM "Ibadah" 
                 WHERE DATE(tanggal_ibadah) = %s 
                 AND jenis_kebaktian = %s 
                 AND sesi_ibadah = %s
                 LIMIT 1
-            """, (today, jenis_kebaktian, sesi_ibadah))
+            """, (tanggal, jenis_kebaktian, sesi_ibadah))
             
             result = cur.fetchone()
             
             if result:
-                self.today_ibadah_id = result[0]
-                print(f"  ✓ Ibadah ditemukan: {jenis_kebaktian} Sesi {sesi_ibadah} - {today}")
+                id_ibadah = result[0]
+                print(f"  ✓ Ibadah ditemukan: {jenis_kebaktian} Sesi {sesi_ibadah} - {tanggal}")
             else:
-                # Buat ibadah baru untuk hari ini
-                self.today_ibadah_id = str(uuid.uuid4())
+                # Buat ibadah baru untuk tanggal ini
+                id_ibadah = str(uuid.uuid4())
                 
                 cur.execute("""
                     INSERT INTO "Ibadah" 
                     (id_ibadah, jenis_kebaktian, sesi_ibadah, tanggal_ibadah)
                     VALUES (%s, %s, %s, %s)
                 """, (
-                    self.today_ibadah_id,
+                    id_ibadah,
                     jenis_kebaktian,
                     sesi_ibadah,
-                    datetime.now()
+                    waktu
                 ))
                 
                 conn.commit()
-                print(f"  ✓ Ibadah baru dibuat: {jenis_kebaktian} Sesi {sesi_ibadah} - {today}")
-                print(f"     ID: {self.today_ibadah_id}")
+                print(f"  ✓ Ibadah baru dibuat: {jenis_kebaktian} Sesi {sesi_ibadah} - {tanggal}")
+                print(f"     ID: {id_ibadah}")
             
             cur.close()
-            return self.today_ibadah_id
+            self.ibadah_ids[tanggal] = id_ibadah
+            return id_ibadah
             
         except Exception as e:
-            print(f"  ✗ Error get_or_create_ibadah_today: {e}")
+            print(f"  ✗ Error get_or_create_ibadah: {e}")
             conn.rollback()
             return None
         finally:
@@ -201,10 +212,11 @@ class SupabaseManager:
         finally:
             self.return_connection(conn)
     
+    @metrics.timed('save_kehadiran')
     def save_kehadiran(self, name, waktu_presensi=None):
         """
         Menyimpan kehadiran ke database Supabase
-        Workflow: Auto-create Ibadah hari ini → Sync User→Jemaat → Save Kehadiran
+        Workflow: Auto-create Ibadah tanggal presensi → Sync User→Jemaat → Save Kehadiran
         
         Args:
             name: Nama user (dari face recognition)
@@ -217,8 +229,8 @@ class SupabaseManager:
         if not waktu_presensi:
             waktu_presensi = datetime.now()
         
-        # 1. Get atau buat Ibadah untuk hari ini
-        id_ibadah = self.get_or_create_ibadah_today()
+        # 1. Get atau buat Ibadah untuk tanggal presensi
+        id_ibadah = self.get_or_create_ibadah(waktu_presensi)
         if not id_ibadah:
             print("  ✗ Gagal mendapatkan/membuat Ibadah")
             return False
@@ -0,0 +1,157 @@
+"""
+Tracing
+Modul profiling mode --trace: span per thread (capture, inference,
+recognition, presensi, tampilan) direkam ke buffer memori terbatas lalu
+ditulis sebagai JSON Chrome trace (buka di https://ui.perfetto.dev atau
+chrome://tracing) saat keluar atau saat menerima SIGUSR1.
+Setiap frame kamera punya flow (panah) dari capture sampai ditampilkan
+berdasarkan nomor urut (seq) frame, jadi terlihat di mana frame menunggu.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+import config
+
+
+def frame_id(camera_id, seq):
+    """Id flow unik per frame kamera"""
+    return (camera_id << 32) | seq
+
+
+class _NullSpan:
+    """Span no-op saat tracing nonaktif"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def set(self, frames=None, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Context manager satu span; event ditulis ke buffer saat span selesai"""
+
+    __slots__ = ('tracer', 'name', 'args', 'frames', 'flow', 'start')
+
+    def __init__(self, tracer, name, args, frames, flow):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.frames = frames
+        self.flow = flow
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._record(self.name, self.start, time.perf_counter(), self.args, self.frames, self.flow)
+
+    def set(self, frames=None, **args):
+        """Tambah frame / argumen span yang baru diketahui di tengah span (mis. seq frame hasil capture)"""
+        if frames is not None:
+            self.frames = frames
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Class perekam span ke ring buffer (deque berukuran tetap)
+
+    Span direkam sebagai complete event ("X") saat selesai, jadi event
+    tertua yang terbuang dari buffer tidak meninggalkan pasangan begin/end
+    yang putus. Append ke deque atomic di CPython, tanpa lock.
+    """
+
+    def __init__(self, max_events=config.TRACE_BUFFER_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.thread_names = {}
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+
+    def enable(self, max_events=config.TRACE_BUFFER_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def span(self, name, frames=(), flow=None, **args):
+        """
+        Context manager untuk satu span di thread saat ini
+
+        Args:
+            name: Nama span
+            frames: Id frame (frame_id()) yang sedang dikerjakan span ini
+            flow: 's' (frame mulai), 't' (lanjut) atau 'f' (frame selesai) untuk panah flow
+            **args: Argumen tambahan yang tampil di detail span
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, args, frames, flow)
+
+    def instant(self, name, **args):
+        """Event sesaat (mis. frame di-drop)"""
+        if self.enabled:
+            now = time.perf_counter()
+            self._record(name, now, None, args, (), None)
+
+    def _record(self, name, start, end, args, frames, flow):
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        self.events.append((name, start, end, thread.ident, args, frames, flow))
+
+    def _to_us(self, seconds):
+        return round((seconds - self.origin) * 1e6, 1)
+
+    def chrome_events(self):
+        """Event buffer dalam format Chrome trace (list dict)"""
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in list(self.thread_names.items())
+        ]
+        for name, start, end, tid, args, frames, flow in list(self.events):
+            ts = self._to_us(start)
+            if end is None:
+                events.append({'name': name, 'ph': 'i', 's': 't', 'ts': ts, 'pid': self.pid, 'tid': tid, 'args': args})
+                continue
+
+            event_args = dict(args)
+            if frames:
+                event_args['frames'] = [f"{fid >> 32}:{fid & 0xFFFFFFFF}" for fid in frames]
+            events.append({'name': name, 'ph': 'X', 'ts': ts, 'dur': self._to_us(end) - ts,
+                           'pid': self.pid, 'tid': tid, 'args': event_args})
+
+            # Panah flow frame, diikat ke span ini
+            if flow is not None:
+                for fid in frames:
+                    event = {'name': 'frame', 'cat': 'frame', 'ph': flow, 'id': fid, 'ts': ts,
+                             'pid': self.pid, 'tid': tid}
+                    if flow == 'f':
+                        event['bp'] = 'e'
+                    events.append(event)
+        return events
+
+    def dump(self, path):
+        """Tulis buffer sebagai JSON Chrome trace, return jumlah event"""
+        events = self.chrome_events()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"✓ Trace {len(events)} event disimpan: {path} (buka di https://ui.perfetto.dev)")
+        return len(events)
+
+
+# Tracer global (nonaktif sampai enable(), mis. dari --trace)
+tracer = Tracer()
@@ -0,0 +1,246 @@
+"""
+Video Processor
+Modul proses rekaman video (DVR) secara offline tanpa kamera & GUI
+Setiap video dibagi menjadi segmen yang diproses paralel oleh beberapa
+proses; setiap proses punya YOLOFaceDetector + ArcFaceRecognizer sendiri dan
+men-decode segmennya sendiri, sehingga decode, deteksi dan recognition
+berjalan di semua core. Hasilnya waktu pertama setiap orang terlihat
+dalam rekaman (dipakai sebagai waktu presensi).
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import cv2
+import config
+
+# Komponen milik proses worker (dibuat sekali per proses oleh _init_video_worker)
+_worker_detector = None
+_worker_recognizer = None
+_worker_model_loaded = False
+
+
+def _init_video_worker(num_threads):
+    """Initializer ProcessPoolExecutor: setiap worker load model sendiri"""
+    global _worker_detector, _worker_recognizer, _worker_model_loaded
+    from face_detector_yolo import YOLOFaceDetector
+    from face_recognizer_arcface import ArcFaceRecognizer
+
+    cv2.setNumThreads(1)  # Decode & resize cukup 1 thread per proses
+    _worker_detector = YOLOFaceDetector(num_threads=num_threads)
+    _worker_recognizer = ArcFaceRecognizer(num_threads=num_threads)
+    _worker_model_loaded = _worker_recognizer.load_model()
+
+
+def _process_segment_in_worker(segment):
+    """Task worker: proses satu segmen video"""
+    return process_segment(_worker_detector, _worker_recognizer, _worker_model_loaded, segment)
+
+
+def get_video_info(video_path):
+    """
+    Baca metadata video
+
+    Returns:
+        Dict {'path', 'fps', 'frame_count', 'duration'} atau None jika gagal dibuka
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or config.FPS
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return {
+        'path': video_path,
+        'fps': fps,
+        'frame_count': frame_count,
+        'duration': frame_count / fps
+    }
+
+
+def video_start_time(video_path, duration, start=None):
+    """
+    Waktu mulai rekaman (untuk mengubah posisi frame menjadi waktu presensi)
+
+    Args:
+        video_path: Path video
+        duration: Durasi video (detik)
+        start: datetime mulai rekaman jika diketahui; default waktu modifikasi
+               file dikurangi durasi (DVR menulis file sampai rekaman selesai)
+    """
+    if start is not None:
+        return start
+    return datetime.fromtimestamp(os.path.getmtime(video_path)) - timedelta(seconds=duration)
+
+
+def plan_segments(video_info, segment_seconds, process_fps):
+    """
+    Bagi video menjadi segmen (start_frame, end_frame)
+
+    Returns:
+        List dict segmen {'path', 'start_frame', 'end_frame', 'fps', 'sample_every'}
+    """
+    fps = video_info['fps']
+    segment_frames = max(1, int(segment_seconds * fps))
+    sample_every = max(1, int(round(fps / process_fps)))
+
+    segments = []
+    for start_frame in range(0, video_info['frame_count'], segment_frames):
+        segments.append({
+            'path': video_info['path'],
+            'start_frame': start_frame,
+            'end_frame': min(start_frame + segment_frames, video_info['frame_count']),
+            'fps': fps,
+            'sample_every': sample_every
+        })
+    return segments
+
+
+def process_segment(detector, recognizer, model_loaded, segment):
+    """
+    Deteksi & recognition pada satu segmen video
+
+    Frame yang tidak dianalisis hanya di-grab (tanpa konversi ke BGR).
+    Tracker & cache identitas dibuat baru per segmen; waktu frame memakai
+    posisi dalam video supaya timeout tracker sesuai waktu rekaman.
+
+    Returns:
+        Dict {'path', 'start_frame', 'sightings', 'frames_processed', 'faces'}
+        sightings: list (name, confidence, detik dalam video)
+    """
+    from face_pipeline import FacePipeline
+
+    pipeline = FacePipeline(detector, recognizer, model_loaded)
+    cap = cv2.VideoCapture(segment['path'])
+    cap.set(cv2.CAP_PROP_POS_FRAMES, segment['start_frame'])
+
+    sightings = []
+    faces = 0
+    frames_processed = 0
+
+    for frame_index in range(segment['start_frame'], segment['end_frame']):
+        if (frame_index - segment['start_frame']) % segment['sample_every'] != 0:
+            if not cap.grab():
+                break
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        video_time = frame_index / segment['fps']
+        results = pipeline.process(frame, video_time)
+        frames_processed += 1
+        faces += len(results)
+
+        for result in results:
+            if result['status'] == 'recognized':
+                sightings.append((result['name'], float(result['confidence']), video_time))
+
+    cap.release()
+    return {
+        'path': segment['path'],
+        'start_frame': segment['start_frame'],
+        'sightings': sightings,
+        'frames_processed': frames_processed,
+        'faces': faces
+    }
+
+
+class VideoBatchProcessor:
+    """Class untuk memproses beberapa file video secara paralel"""
+
+    def __init__(self, workers=config.OFFLINE_WORKERS,
+                 segment_seconds=config.OFFLINE_SEGMENT_SECONDS,
+                 process_fps=config.OFFLINE_PROCESS_FPS,
+                 min_sightings=config.IDENTITY_CONFIRM_COUNT):
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds
+        self.process_fps = process_fps
+        self.min_sightings = min_sightings  # Frame minimum orang terlihat sebelum dicatat hadir
+
+        # Statistik & metadata video proses terakhir
+        self.stats = {}
+        self.infos = {}
+
+    def _run_segments(self, segments):
+        """Jalankan semua segmen (paralel jika workers > 1), yield hasil per segmen"""
+        if self.workers <= 1:
+            _init_video_worker(None)
+            for segment in segments:
+                yield _process_segment_in_worker(segment)
+            return
+
+        # Bagi core CPU rata ke setiap worker
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_video_worker,
+                                 initargs=(threads_per_worker,)) as pool:
+            futures = [pool.submit(_process_segment_in_worker, segment) for segment in segments]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def process(self, video_paths):
+        """
+        Proses semua video
+
+        Returns:
+            Dict {video_path: {name: {'first_seen', 'confidence', 'sightings'}}}
+            first_seen dalam detik sejak awal video
+        """
+        infos = []
+        for video_path in video_paths:
+            info = get_video_info(video_path)
+            if info is None or info['frame_count'] <= 0:
+                print(f"⚠ Video tidak bisa dibuka, dilewati: {video_path}")
+                continue
+            infos.append(info)
+
+        segments = []
+        for info in infos:
+            segments.extend(plan_segments(info, self.segment_seconds, self.process_fps))
+
+        total_duration = sum(info['duration'] for info in infos)
+        print(f"✓ {len(infos)} video ({total_duration / 60:.1f} menit), "
+              f"{len(segments)} segmen, {self.workers} worker\n")
+
+        start = time.perf_counter()
+        raw = {info['path']: {} for info in infos}
+        frames_processed = 0
+        faces = 0
+
+        for done, result in enumerate(self._run_segments(segments), 1):
+            frames_processed += result['frames_processed']
+            faces += result['faces']
+
+            persons = raw[result['path']]
+            for name, confidence, video_time in result['sightings']:
+                person = persons.setdefault(name, {'first_seen': video_time, 'confidence': confidence, 'sightings': 0})
+                person['first_seen'] = min(person['first_seen'], video_time)
+                person['confidence'] = max(person['confidence'], confidence)
+                person['sightings'] += 1
+
+            elapsed = time.perf_counter() - start
+            print(f"  [{done}/{len(segments)}] {os.path.basename(result['path'])} "
+                  f"frame {result['start_frame']} - {len(result['sightings'])} wajah dikenali ({elapsed:.0f}s)")
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'videos': len(infos),
+            'video_seconds': total_duration,
+            'elapsed_seconds': elapsed,
+            'realtime_factor': total_duration / elapsed if elapsed > 0 else 0.0,
+            'frames_processed': frames_processed,
+            'faces': faces
+        }
+        self.infos = {info['path']: info for info in infos}
+
+        # Orang yang hanya terlihat sekilas (kemungkinan salah kenal) diabaikan
+        return {
+            path: {name: person for name, person in persons.items() if person['sightings'] >= self.min_sightings}
+            for path, persons in raw.items()
+        }